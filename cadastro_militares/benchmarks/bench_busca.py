@@ -0,0 +1,59 @@
+# benchmarks/bench_busca.py
+# buscar_texto() (FTS5) x filtro em Python sobre buscar_todos() com N militares.
+# Meta: buscar_texto abaixo de 10 ms com 200 mil registros.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_busca [quantidade]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from database import db
+
+NOMES = ("JOÃO", "JOSÉ", "MARIA", "ANTÔNIO", "FRANCISCO", "ANA", "LUÍS", "PAULO",
+         "CARLOS", "MÁRCIA", "CONCEIÇÃO", "ÍTALO")
+SOBRENOMES = ("SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "FERREIRA",
+              "ARAÚJO", "GONÇALVES", "RIBEIRO", "ALMEIDA", "CAVALCÂNTI")
+TERMOS = ("joao", "JOAO silva", "araujo", "conceicao gon", "a", "000.001.234", "00000012345")
+
+def _registros(n, rnd):
+    for i in range(n):
+        nome = f"{rnd.choice(NOMES)} {rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        yield (
+            "3º Sargento", nome, nome.split()[0],
+            f"{i:011d}", f"{i:09d}", f"{i:010d}",
+            "001 - Banco do Brasil S.A", "1234", f"{i:08d}", "",
+            "2015", "01/01/1995", "01/03/2015", "Rua X", "20000000",
+            "Não", "0", "Não", "0.00", "Não",
+        )
+
+def _ms(fn, repeticoes=10):
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        r = fn()
+    return (time.perf_counter() - t0) / repeticoes * 1e3, r
+
+def main(n: int = 200000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configurar(os.path.join(tmp, "busca.db"))
+        db.init()
+        t0 = time.perf_counter()
+        db.inserir_militares_lote(_registros(n, random.Random(1)))
+        db.analisar()
+        print(f"carga de {n} militares: {time.perf_counter() - t0:.1f} s\n")
+
+        todos = db.buscar_todos()
+        print(f"{'termo':18s} {'buscar_texto':>14s} {'Python (in)':>12s}")
+        for termo in TERMOS:
+            t_fts, achados = _ms(lambda: db.buscar_texto(termo, 100))
+            q = termo.lower()
+            t_py, _ = _ms(lambda: [m for m in todos if q in m.nome.lower()
+                                   or q in m.nome_guerra.lower()], 3)
+            print(f"{termo!r:18s} {t_fts:11.2f} ms {t_py:9.1f} ms   ({len(achados)} achados)")
+        db.fechar_conexao()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
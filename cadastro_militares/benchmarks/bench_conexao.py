@@ -0,0 +1,52 @@
+# benchmarks/bench_conexao.py
+# Compara o custo por chamada: conexão nova a cada consulta (padrão antigo)
+# x conexão persistente da thread (database.db.conectar).
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_conexao [repeticoes]
+
+import os
+import sys
+import tempfile
+import time
+
+from database import db
+
+def _por_chamada(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6  # µs
+
+def main(n: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configurar(os.path.join(tmp, "bench.db"))
+        db.init()
+        db.atualizar_soldo_posto("2º Sargento", 4985.0)
+
+        def antigo():
+            con = db.CONFIG.conectar()
+            cur = con.cursor()
+            cur.execute("SELECT soldo FROM soldos_por_posto WHERE posto = ?", ("2º Sargento",))
+            cur.fetchone()
+            con.close()
+
+        def antigo_escrita():
+            con = db.CONFIG.conectar()
+            con.execute("UPDATE soldos_por_posto SET soldo = soldo WHERE posto = ?", ("2º Sargento",))
+            con.commit()
+            con.close()
+
+        casos = [
+            ("leitura  (conexão nova)", antigo),
+            ("leitura  (persistente)", lambda: db.obter_soldo_por_posto("2º Sargento")),
+            ("escrita  (conexão nova)", antigo_escrita),
+            ("escrita  (persistente)", lambda: db.atualizar_soldo_posto("2º Sargento", 4985.0)),
+        ]
+        for nome, fn in casos:
+            fn()  # aquece
+            print(f"{nome:28s} {_por_chamada(fn, n):9.1f} µs/chamada")
+        db.fechar_conexao()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,54 @@
+# benchmarks/bench_folha.py
+# Folha do efetivo inteiro (servicos/folha.py): carga em colunas, cálculo
+# vetorizado (NumPy) x linha a linha, totais por posto e por banco, e a
+# conferência de que os dois caminhos dão os mesmos centavos.
+# Meta: abaixo de 1 s para 50 mil militares, carga incluída.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_folha [quantidade]
+
+import sys
+import time
+
+from benchmarks.fixtures import banco_em_memoria
+from benchmarks.gerador import popular
+from servicos import folha
+
+DATA = "05/06/2025"
+
+def _medir(rotulo, fn):
+    t0 = time.perf_counter()
+    r = fn()
+    print(f"{rotulo:38s} {(time.perf_counter() - t0) * 1e3:9.1f} ms")
+    return r
+
+def _folha(efetivo, vetorizado):
+    n = len(efetivo.ids)
+    preta = [i % 3 for i in range(n)]
+    vermelha = [i % 2 for i in range(n)]
+    f = folha.calcular_folha(efetivo, dias=9, preta=preta, vermelha=vermelha, vetorizado=vetorizado)
+    return f, folha.totais_por_posto(f), folha.totais_por_banco(f)
+
+def main(n: int = 50000):
+    with banco_em_memoria():
+        popular(n)
+        folha.carregar_efetivo(DATA)  # aquece conexão e cache de páginas
+        efetivo = _medir(f"carregar_efetivo x{n}", lambda: folha.carregar_efetivo(DATA))
+
+        caminhos = [("linha a linha", False)]
+        if folha.NUMPY_DISPONIVEL:
+            caminhos.insert(0, ("vetorizado (NumPy)", True))
+        else:
+            print("NumPy não instalado: só o cálculo linha a linha")
+        resultados = {}
+        for rotulo, vetorizado in caminhos:
+            resultados[rotulo] = _medir(f"calcular + totais, {rotulo}", lambda: _folha(efetivo, vetorizado))
+
+        (_, *totais), *outros = resultados.values()
+        for _, *t in outros:
+            print("mesmos totais:", t == totais)
+        geral = folha.total_geral(next(iter(resultados.values()))[0])
+        print("total geral (R$):", {k: f"{v / 100:,.2f}" for k, v in geral.items()})
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,69 @@
+# benchmarks/bench_inicio.py
+# Custo do init() na abertura do app (conexão nova a cada repetição, como ao
+# iniciar o programa):
+#   - base nova: migrações/DDL/dados iniciais numa transação só;
+#   - base em dia: só a leitura de PRAGMA user_version;
+#   - padrão antigo: todas as etapas de novo, cada uma com conexão e commit próprios.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_inicio [repeticoes]
+
+import os
+import sys
+import tempfile
+import time
+
+from database import db, diagnostico
+
+def _init_antigo():
+    # o que o init() fazia a cada abertura, uma conexão por etapa
+    etapas = (
+        db.criar_tabela_catalogos, db.criar_tabela_militares, db.criar_indices,
+        db.criar_busca_texto, db.criar_tabela_soldos_por_posto, db.criar_controle_versao,
+        lambda: db.garantir_catalogos(list(db.POSTOS_PADRAO), list(db.BANCOS_PADRAO)),
+        lambda: db.garantir_soldos_para_postos(db.listar_postos()),
+    )
+    for etapa in etapas:
+        etapa()
+        db.fechar_conexao()
+
+def _medir(fn, n, preparar=None):
+    """(ms por chamada, instruções SQL por chamada)"""
+    total = 0.0
+    diagnostico.ativar()
+    diagnostico.zerar()
+    for _ in range(n):
+        if preparar:
+            preparar()
+        db.fechar_conexao()
+        t0 = time.perf_counter()
+        fn()
+        total += time.perf_counter() - t0
+    db.fechar_conexao()
+    instrucoes = sum(diagnostico.instrucoes_sql().values())
+    diagnostico.desativar()
+    return total / n * 1e3, instrucoes / n
+
+def main(n: int = 50):
+    with tempfile.TemporaryDirectory() as tmp:
+        contador = iter(range(10 ** 9))
+
+        def base_nova():
+            db.configurar(os.path.join(tmp, f"nova{next(contador)}.db"))
+
+        casos = [
+            ("base nova", db.init, base_nova),
+            ("base em dia (init atual)", db.init, None),
+            ("base em dia (padrão antigo)", _init_antigo, None),
+        ]
+        existente = db.configurar(os.path.join(tmp, "existente.db"))
+        db.init()
+        print(f"{'caso':30s} {'tempo':>12s} {'SQL':>8s}")
+        for nome, fn, preparar in casos:
+            if preparar is None:
+                db.configurar(existente)
+            ms, sql = _medir(fn, n, preparar)
+            print(f"{nome:30s} {ms:9.2f} ms {sql:8.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
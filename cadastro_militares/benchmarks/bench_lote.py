@@ -0,0 +1,59 @@
+# benchmarks/bench_lote.py
+# Importação de N militares: um inserir_militar() (commit) por linha
+# x inserir_militares_lote() / atualizar_militares_lote() numa transação só.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_lote [quantidade]
+
+import os
+import sys
+import tempfile
+import time
+
+from database import db
+
+def _registros(n, inicio=0):
+    for i in range(inicio, inicio + n):
+        yield (
+            "3º Sargento", f"MILITAR {i:06d}", f"Guerra{i}",
+            f"{i:011d}", f"{i:09d}", f"{i:010d}",
+            "001 - Banco do Brasil S.A", "1234", f"{i:08d}", "",
+            "2015", "01/01/1995", "01/03/2015", "Rua X", "20000000",
+            "Não", "0", "Sim", "286.66", "Não",
+        )
+
+def _medir(rotulo, fn):
+    t0 = time.perf_counter()
+    r = fn()
+    print(f"{rotulo:38s} {time.perf_counter() - t0:8.3f} s")
+    return r
+
+def main(n: int = 20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configurar(os.path.join(tmp, "bench.db"))
+        db.init()
+
+        def um_a_um():
+            for d in _registros(n):
+                db.inserir_militar(d)
+        _medir(f"inserir_militar x{n}", um_a_um)
+
+        _, erros = _medir(f"inserir_militares_lote ({n})",
+                          lambda: db.inserir_militares_lote(_registros(n, inicio=n)))
+        assert not erros
+
+        ids = [r[0] for r in db.buscar_todos()]
+        _, erros = _medir(f"atualizar_militares_lote ({len(ids)})",
+                          lambda: db.atualizar_militares_lote(zip(ids, _registros(len(ids), inicio=3 * n))))
+        assert not erros
+
+        # 1% de duplicados (já gravados acima): as linhas válidas entram, as outras são reportadas
+        linhas = list(_registros(n, inicio=5 * n))
+        linhas[::100] = list(_registros(len(linhas[::100]), inicio=3 * n))
+        ok, erros = _medir("inserir_militares_lote (1% duplicados)",
+                           lambda: db.inserir_militares_lote(linhas))
+        print(f"  gravados={ok} erros={len(erros)}")
+        db.fechar_conexao()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
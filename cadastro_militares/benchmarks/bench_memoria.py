@@ -0,0 +1,53 @@
+# benchmarks/bench_memoria.py
+# Memória por registro carregado: tupla de 21 campos + dict por janela (antes)
+# x Militar com __slots__ consumido direto pelas janelas (agora).
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.bench_memoria [quantidade]
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from database import db
+from benchmarks.bench_lote import _registros
+
+def _bytes_por_linha(carregar, n):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    antes = tracemalloc.get_traced_memory()[0]
+    dados = carregar()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(dados) == n
+    return (depois - antes) / n
+
+def main(n: int = 20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configurar(os.path.join(tmp, "bench.db"))
+        db.init()
+        db.inserir_militares_lote(_registros(n))
+
+        def tuplas_e_dicts():
+            linhas = db.conectar().execute(db._SQL_SELECIONAR_MILITARES).fetchall()
+            # cópia que gratificação/AT faziam em _carregar_militares()
+            copias = [{"ID": it[0], "Posto": it[1], "Nome": it[2], "CPF": it[4], "PREC": it[5],
+                       "recebe_aux_transporte": it[18], "valor_aux_transporte": it[19]}
+                      for it in linhas]
+            return list(zip(linhas, copias))
+
+        def so_tuplas():
+            return db.conectar().execute(db._SQL_SELECIONAR_MILITARES).fetchall()
+
+        casos = [
+            ("tupla + dict por janela (antes)", tuplas_e_dicts),
+            ("só tupla", so_tuplas),
+            ("Militar (__slots__)", db.buscar_todos),
+        ]
+        for nome, fn in casos:
+            print(f"{nome:34s} {_bytes_por_linha(fn, n):8.0f} bytes/registro")
+        db.fechar_conexao()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,61 @@
+# benchmarks/fixtures.py
+# Bancos em memória prontos para testes e medições isolados: esquema atual,
+# catálogos e soldos padrão (o que o init() cria), mais o que o teste pedir.
+# O esquema é criado uma vez por processo num banco-modelo e copiado (API de
+# backup do SQLite) para cada banco novo: poucos milissegundos, sem tocar o disco.
+#
+#     from benchmarks.fixtures import banco_em_memoria
+#     with banco_em_memoria(militares=registros, soldos={"Capitão": 9000.0}):
+#         ...   # todo db.* usa o banco novo; ao sair, volta o anterior
+
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+from database import db
+from database.configuracao import MEMORIA, Configuracao
+
+_modelo: Optional[Configuracao] = None
+
+def _banco_modelo() -> Configuracao:
+    global _modelo
+    if _modelo is None:
+        anterior = db.CONFIG
+        modelo = db.configurar(MEMORIA)
+        try:
+            db.init()
+        finally:
+            db.configurar(anterior)
+        _modelo = modelo
+    return _modelo
+
+def novo_banco_em_memoria() -> Configuracao:
+    """Banco em memória com o esquema e os catálogos padrão (ative com db.configurar())."""
+    novo = Configuracao(MEMORIA)
+    origem, destino = _banco_modelo().conectar(), novo.conectar()
+    try:
+        origem.backup(destino)
+    finally:
+        origem.close()
+        destino.close()
+    return novo
+
+@contextmanager
+def banco_em_memoria(militares: Iterable[Tuple] = (), soldos: Optional[Dict[str, float]] = None):
+    """
+    Ativa um banco novo em memória durante o bloco e devolve a Configuracao dele.
+    militares: tuplas no formato de db.inserir_militar() (gravadas em lote);
+    soldos: posto -> soldo, valendo desde sempre (VIGENCIA_INICIAL).
+    """
+    anterior = db.CONFIG
+    config = db.configurar(novo_banco_em_memoria())
+    try:
+        for posto, soldo in (soldos or {}).items():
+            db.atualizar_soldo_posto(posto, soldo, vigencia=db.VIGENCIA_INICIAL)
+        _inseridos, erros = db.inserir_militares_lote(militares)
+        if erros:
+            pos, _dados, msg = erros[0]
+            raise ValueError(f"{len(erros)} militar(es) recusado(s); o primeiro (posição {pos}): {msg}")
+        yield config
+    finally:
+        db.configurar(anterior)
+        config.fechar()
@@ -0,0 +1,182 @@
+# benchmarks/gerador.py
+# Efetivo sintético para testes de carga: militares com CPF válido (dígitos
+# verificadores), PREC-CP e IDT únicos, distribuição realista pelos dez postos
+# padrão, datas coerentes com o posto, AT e pré-escolar — mais bancos e soldos
+# de referência. Mesma semente = mesmos dados, então todo benchmark mede a mesma base.
+#
+#     from benchmarks.gerador import gerar_militares, popular
+#     popular(50_000)                                  # no banco em uso (db.CONFIG)
+#     with banco_em_memoria(militares=gerar_militares(1000)): ...
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.gerador 50k --banco /tmp/carga.db [--semente 42]
+# Tamanhos prontos: 1k, 50k, 500k (ou um número qualquer).
+
+import argparse
+import bisect
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Iterator, Optional, Tuple
+
+from database import db
+
+SEMENTE_PADRAO = 42
+TAMANHOS = {"1k": 1_000, "50k": 50_000, "500k": 500_000}
+
+# posto -> (peso no efetivo, idade mínima e máxima na data de hoje, soldo de referência)
+# Pirâmide típica de uma OM; soldos aproximados, só para carga (não são a tabela oficial).
+PERFIS_POSTOS = {
+    "Capitão":                      (2, 27, 40, 11451.00),
+    "1º Tenente":                   (3, 24, 32, 10468.00),
+    "2º Tenente":                   (4, 22, 28, 9432.00),
+    "Subtenente":                   (3, 40, 50, 7588.00),
+    "1º Sargento":                  (5, 35, 48, 6723.00),
+    "2º Sargento":                  (8, 28, 42, 5787.00),
+    "3º Sargento":                  (14, 21, 35, 4593.00),
+    "Cabo Efetivo Profissional":    (15, 21, 40, 2995.00),
+    "Soldado Efetivo Profissional": (18, 20, 30, 2627.00),
+    "Soldado Efetivo Variável":     (28, 18, 21, 1177.00),
+}
+BANCOS_EXTRAS = ("260 - Nu Pagamentos S.A", "077 - Banco Inter S.A", "756 - Banco Cooperativo Sicoob S.A")
+PESOS_BANCOS = (30, 12, 8, 15, 20, 8, 4, 3)  # BANCOS_PADRAO + BANCOS_EXTRAS
+
+NOMES = (
+    "JOÃO", "JOSÉ", "ANTÔNIO", "FRANCISCO", "CARLOS", "PAULO", "PEDRO", "LUCAS", "LUIZ", "MARCOS",
+    "GABRIEL", "RAFAEL", "DANIEL", "MARCELO", "BRUNO", "EDUARDO", "FELIPE", "RODRIGO", "MATHEUS",
+    "GUSTAVO", "THIAGO", "DIEGO", "LEONARDO", "VINÍCIUS", "ANDRÉ", "FERNANDO", "FÁBIO", "ANA",
+    "MARIA", "JULIANA", "FERNANDA", "PATRÍCIA", "ALINE", "CAMILA", "AMANDA", "LETÍCIA", "BEATRIZ",
+)
+SOBRENOMES = (
+    "SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "RODRIGUES", "FERREIRA", "ALVES", "PEREIRA", "LIMA",
+    "GOMES", "COSTA", "RIBEIRO", "MARTINS", "CARVALHO", "ALMEIDA", "LOPES", "SOARES", "FERNANDES",
+    "VIEIRA", "BARBOSA", "ROCHA", "DIAS", "NASCIMENTO", "ANDRADE", "MOREIRA", "NUNES", "MARQUES",
+    "MACHADO", "MENDES", "FREITAS", "CARDOSO", "RAMOS", "GONÇALVES", "SANTANA", "TEIXEIRA", "ARAÚJO",
+)
+LOGRADOUROS = ("Rua", "Avenida", "Travessa", "Rua", "Estrada", "Alameda")
+
+# i -> (i * passo + deslocamento) mod 10^k é uma bijeção quando o passo não tem
+# fatores 2 nem 5: números únicos sem guardar os já sorteados (importa com 500k).
+_PASSO_UNICO = 387_420_489  # 3^18
+
+def _unico(i: int, deslocamento: int, digitos: int) -> int:
+    return (i * _PASSO_UNICO + deslocamento) % (10 ** digitos)
+
+_PESOS_DV1 = range(10, 1, -1)  # primeiro dígito verificador: pesos 10..2 sobre a base
+_PESOS_DV2 = range(11, 2, -1)  # segundo: 11..3 sobre a base, 2 sobre o primeiro
+
+def digitos_cpf(base: str) -> str:
+    """Os 9 dígitos de `base` seguidos dos 2 dígitos verificadores do CPF."""
+    d = [ord(c) - 48 for c in base]
+    dv1 = sum(x * p for x, p in zip(d, _PESOS_DV1)) * 10 % 11 % 10
+    dv2 = (sum(x * p for x, p in zip(d, _PESOS_DV2)) + dv1 * 2) * 10 % 11 % 10
+    return f"{base}{dv1}{dv2}"
+
+def cpf_valido(cpf: str) -> bool:
+    """CPF com 11 dígitos, não repetidos, e verificadores corretos."""
+    return len(cpf) == 11 and cpf.isdigit() and len(set(cpf)) > 1 and digitos_cpf(cpf[:9]) == cpf
+
+def _data_br(d: date) -> str:
+    return f"{d.day:02d}/{d.month:02d}/{d.year}"
+
+def _valor_br(centavos: int) -> str:
+    return f"{centavos // 100},{centavos % 100:02d}"
+
+def _acumulados(pesos):
+    total, acumulados = 0, []
+    for p in pesos:
+        total += p
+        acumulados.append(total)
+    return [a / total for a in acumulados]
+
+def gerar_militares(quantidade: int, semente: int = SEMENTE_PADRAO,
+                    hoje: Optional[date] = None) -> Iterator[Tuple]:
+    """
+    `quantidade` militares no formato de db.inserir_militar() (valores e datas como
+    a tela digita), gerados sob demanda. Mesma semente (e mesmo `hoje`) = mesmas tuplas.
+    """
+    rnd = random.Random(semente)
+    aleatorio = rnd.random  # um sorteio por campo: várias vezes mais rápido que randint/choices
+
+    def sorteio(n):  # 0 <= sorteio(n) < n
+        return int(aleatorio() * n)
+
+    hoje = hoje or date(2025, 1, 1)  # fixo: a idade não muda com o dia em que se roda
+    postos = list(PERFIS_POSTOS)
+    acum_postos = _acumulados(PERFIS_POSTOS[p][0] for p in postos)
+    bancos = db.BANCOS_PADRAO + BANCOS_EXTRAS
+    acum_bancos = _acumulados(PESOS_BANCOS)
+    desl_cpf, desl_prec, desl_idt = (rnd.randrange(10 ** 9) for _ in range(3))
+    for i in range(quantidade):
+        posto = postos[bisect.bisect(acum_postos, aleatorio())]
+        _peso, idade_min, idade_max, _soldo = PERFIS_POSTOS[posto]
+        sobrenome1 = SOBRENOMES[sorteio(len(SOBRENOMES))]
+        sobrenome2 = SOBRENOMES[sorteio(len(SOBRENOMES))]
+        nome = NOMES[sorteio(len(NOMES))]
+        if aleatorio() < 0.4:
+            nome += " " + NOMES[sorteio(len(NOMES))]
+        nome = f"{nome} {sobrenome1} {sobrenome2}" if sobrenome1 != sobrenome2 else f"{nome} {sobrenome1}"
+        nascimento = hoje - timedelta(days=idade_min * 365 + sorteio((idade_max - idade_min + 1) * 365))
+        praca = nascimento + timedelta(days=18 * 365 + sorteio((min(idade_min, 24) - 18) * 365 + 1))
+        base_cpf = f"{_unico(i, desl_cpf, 9):09d}"
+        if len(set(base_cpf)) == 1:  # 000000000, 111111111...: CPF inválido mesmo com verificadores
+            base_cpf = base_cpf[:-1] + str((int(base_cpf[-1]) + 1) % 10)
+        recebe_pre = aleatorio() < 0.15
+        recebe_at = aleatorio() < 0.40
+        yield (
+            posto, nome, sobrenome2 if aleatorio() < 0.5 else sobrenome1,
+            digitos_cpf(base_cpf),
+            f"{_unico(i, desl_prec, 9):09d}",
+            f"{_unico(i, desl_idt, 10):010d}",
+            bancos[bisect.bisect(acum_bancos, aleatorio())],
+            f"{sorteio(10_000):04d}",
+            f"{100_000 + sorteio(900_000)}-{sorteio(10)}",
+            "",
+            str(praca.year),
+            _data_br(nascimento),
+            _data_br(praca),
+            f"{LOGRADOUROS[sorteio(len(LOGRADOUROS))]} {SOBRENOMES[sorteio(len(SOBRENOMES))].title()}, "
+            f"{1 + sorteio(3000)}",
+            f"{10_000_000 + sorteio(90_000_000):08d}",
+            "Sim" if recebe_pre else "Não",
+            _valor_br((1 + sorteio(2)) * 32_100 if recebe_pre else 0),
+            "Sim" if recebe_at else "Não",
+            _valor_br(8_000 + sorteio(52_001) if recebe_at else 0),
+            "Sim" if aleatorio() < 0.10 else "Não",
+        )
+
+def popular(quantidade: int, semente: int = SEMENTE_PADRAO,
+            tamanho_lote: int = db.LOTE_PADRAO) -> Tuple[int, list]:
+    """
+    Garante postos, bancos e soldos de referência e insere `quantidade` militares
+    no banco em uso (caminho em lote). Retorna (inseridos, erros) como inserir_militares_lote().
+    """
+    db.init()
+    db.garantir_catalogos(list(PERFIS_POSTOS), list(db.BANCOS_PADRAO + BANCOS_EXTRAS))
+    db.garantir_soldos_para_postos()
+    for posto, (_peso, _min, _max, soldo) in PERFIS_POSTOS.items():
+        db.atualizar_soldo_posto(posto, soldo, vigencia=db.VIGENCIA_INICIAL)
+    return db.inserir_militares_lote(gerar_militares(quantidade, semente), tamanho_lote)
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(description="Gera um efetivo sintético para testes de carga.")
+    p.add_argument("quantidade", help=f"{', '.join(TAMANHOS)} ou um número")
+    p.add_argument("--banco", required=True, metavar="CAMINHO",
+                   help="banco a popular (obrigatório: nunca o militares.db por engano)")
+    p.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    return p.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    quantidade = TAMANHOS.get(args.quantidade.lower()) or int(args.quantidade)
+    db.configurar(args.banco)
+    t0 = time.perf_counter()
+    inseridos, erros = popular(quantidade, args.semente)
+    print(f"{inseridos} militares em {time.perf_counter() - t0:.1f} s ({db.CONFIG.caminho})")
+    for pos, _dados, msg in erros[:10]:
+        print(f"  posição {pos}: {msg}", file=sys.stderr)
+    return 1 if erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
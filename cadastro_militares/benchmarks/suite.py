@@ -0,0 +1,334 @@
+# benchmarks/suite.py
+# Suíte de medições sem tela: leitura (buscar_todos), inserções uma a uma e em
+# lote, todas as buscas, importação e exportação de planilhas, a Relação Pessoal
+# e os textos dos boletins, sobre um efetivo sintético (benchmarks/gerador.py).
+# Grava o resultado em JSON, com os dados da máquina, e compara com uma base:
+# sai com erro se algum caso ficar mais lento que a base além do limite.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.suite                          # 10k militares; planilhas de 10k e 100k
+#     python -m benchmarks.suite --base base.json         # compara (cria a base se não existir)
+#     python -m benchmarks.suite --quantidade 50k --planilhas 10k --apenas buscar
+# Sem openpyxl, os casos de planilha ficam de fora (e aparecem em "ignorados").
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks.gerador import SEMENTE_PADRAO, TAMANHOS, gerar_militares, popular
+from database import db
+
+try:
+    import openpyxl
+    from impor_export import gravar_planilha, importar_planilha
+    from relatorios.relacao_pessoal import gerar_relacao_pessoal
+except ImportError as e:
+    openpyxl = None
+    SEM_PLANILHAS = f"{e.name or e} ausente"
+else:
+    SEM_PLANILHAS = None
+
+from servicos import auxilio_transporte, folha, gratificacao
+from servicos.boletim import BOLETINS_PADRAO, texto_boletim
+
+LIMITE_PADRAO = 0.25  # 25% mais lento que a base = regressão
+FOLGA_MS = 0.5        # ...desde que a diferença passe disto (casos de microssegundos oscilam)
+INSERCOES_UNITARIAS = 1000
+SAIDA, RETORNO = datetime(2025, 6, 5), datetime(2025, 6, 13)  # deslocamento da gratificação
+
+class Caso(NamedTuple):
+    nome: str
+    medir: Callable[[], object]
+    preparar: Optional[Callable[[], None]] = None  # roda antes de cada repetição, fora do tempo
+    repeticoes: int = 5
+
+# ==============================================
+# Bancos de trabalho
+# ==============================================
+class _Bancos:
+    """Um banco-modelo com o efetivo e cópias descartáveis dele para os casos que gravam."""
+
+    def __init__(self, pasta: str, quantidade: int, semente: int):
+        self.pasta = pasta
+        self.quantidade = quantidade
+        self.semente = semente
+        self._copias = 0
+        self.modelo = db.configurar(os.path.join(pasta, "modelo.db"))
+        popular(quantidade, semente)
+        db.analisar()
+        self.vazio = db.configurar(os.path.join(pasta, "vazio.db"))
+        db.init()
+
+    def _copia(self, origem) -> None:
+        self._copias += 1
+        destino = db.configurar(os.path.join(self.pasta, f"copia{self._copias}.db"))
+        de, para = origem.conectar(), destino.conectar()
+        try:
+            de.backup(para)
+        finally:
+            de.close()
+            para.close()
+
+    def usar_modelo(self):
+        db.configurar(self.modelo)
+
+    def copia_do_modelo(self):
+        self._copia(self.modelo)
+
+    def copia_vazia(self):
+        self._copia(self.vazio)
+
+    def planilha(self, quantidade: int) -> str:
+        """Planilha no layout da exportação com `quantidade` militares (gerada uma vez)."""
+        caminho = os.path.join(self.pasta, f"planilha{quantidade}.xlsx")
+        if not os.path.exists(caminho):
+            if quantidade == self.quantidade:
+                self.usar_modelo()
+            else:
+                db.configurar(os.path.join(self.pasta, f"planilha{quantidade}.db"))
+                popular(quantidade, self.semente)
+            gravar_planilha(caminho)
+        return caminho
+
+# ==============================================
+# Casos
+# ==============================================
+def _casos_leitura(b: _Bancos) -> List[Caso]:
+    ids = [m.id for m in db.buscar_campos(("id",))]
+    meio = ids[len(ids) // 2] if ids else 1
+    ordem = ("id", "posto", "nome")
+    # início do CPF de um militar que está no banco-modelo (os números são sorteados)
+    numero = next(gerar_militares(1, b.semente))[3][:4]
+    modelo_boletim = next(iter(BOLETINS_PADRAO.values()))
+
+    def todas_as_paginas():
+        chave, total = None, 0
+        while True:
+            pagina, chave = db.buscar_pagina(chave)
+            total += len(pagina)
+            if chave is None:
+                return total
+
+    def boletim():
+        militares = db.buscar_campos(ordem, order=db.ORDEM_HIERARQUIA)
+        return texto_boletim(modelo_boletim, militares, db.abreviaturas_postos())
+
+    def boletim_gratificacao():
+        militares = db.buscar_campos(("id", "posto", "nome", "cpf", "prec_cp"), order=db.ORDEM_HIERARQUIA)
+        linhas = gratificacao.calcular_gratificacao(militares, db.obter_soldos_em(SAIDA), 9)
+        return gratificacao.boletim_gratificacao(linhas, SAIDA, RETORNO, db.siglas_postos(), "", "", "")
+
+    def despesa_a_anular():
+        linhas = auxilio_transporte.linhas_auxilio(db.buscar_recebem_aux_transporte())
+        itens = ((linha, i % 3, i % 2) for i, linha in enumerate(linhas))
+        return auxilio_transporte.boletim_despesa_a_anular(itens, db.abreviaturas_postos())
+
+    def folha_completa():
+        f = folha.calcular_folha(folha.carregar_efetivo(SAIDA), dias=9, preta=1, vermelha=0)
+        return folha.totais_por_posto(f), folha.totais_por_banco(f)
+
+    return [
+        Caso("buscar_todos", db.buscar_todos),
+        Caso("buscar_campos(ORDEM_HIERARQUIA)", lambda: db.buscar_campos(ordem, order=db.ORDEM_HIERARQUIA)),
+        Caso("buscar_por_id", lambda: db.buscar_por_id(meio), repeticoes=200),
+        Caso("buscar_por_posto", lambda: db.buscar_por_posto("3º Sargento")),
+        Caso("buscar_recebem_aux_transporte", db.buscar_recebem_aux_transporte),
+        Caso("buscar_por_nome", lambda: db.buscar_por_nome("MARIA"), repeticoes=20),
+        Caso("buscar_por_periodo(data_nascimento)",
+             lambda: db.buscar_por_periodo("data_nascimento", "01/01/1990", "31/12/1994")),
+        Caso("buscar_por_periodo(data_praca)",
+             lambda: db.buscar_por_periodo("data_praca", "01/01/2015", "31/12/2015")),
+        Caso("buscar_texto(nome)", lambda: db.buscar_texto("joao sil"), repeticoes=50),
+        Caso("buscar_texto(numero)", lambda: db.buscar_texto(numero), repeticoes=50),
+        Caso("ids_por_texto", lambda: db.ids_por_texto("silva"), repeticoes=20),
+        Caso("buscar_pagina(primeira)", db.buscar_pagina, repeticoes=50),
+        Caso("buscar_pagina(todas)", todas_as_paginas),
+        Caso("buscar_pagina(filtro texto)", lambda: db.buscar_pagina(filtros={"texto": "ana"}), repeticoes=20),
+        Caso("contar_militares(filtro texto)", lambda: db.contar_militares({"texto": "ana"}), repeticoes=20),
+        Caso("contar_por_posto", db.contar_por_posto, repeticoes=50),
+        Caso("listar_postos_em_uso", db.listar_postos_em_uso, repeticoes=50),
+        Caso("buscar_alterados_desde(0)", lambda: db.buscar_alterados_desde(0)),
+        Caso("historico_militar", lambda: db.historico_militar(meio), repeticoes=200),
+        Caso("buscar_auditoria", db.buscar_auditoria, repeticoes=20),
+        Caso("texto_boletim", boletim),
+        Caso("boletim_gratificacao", boletim_gratificacao),
+        Caso("folha(carregar+calcular+totais)", folha_completa),
+        Caso("boletim_despesa_a_anular", despesa_a_anular),
+    ]
+
+def _sem_erros(rotulo: str, resultado):
+    """(gravados, erros) de uma operação em lote; RuntimeError se alguma linha falhou."""
+    gravados, erros = resultado
+    if erros:
+        pos, _dados, msg = erros[0]
+        raise RuntimeError(f"{rotulo}: {len(erros)} linha(s) com erro (posição {pos}: {msg})")
+    return gravados
+
+def _casos_escrita(b: _Bancos) -> List[Caso]:
+    extras = list(gerar_militares(b.quantidade + INSERCOES_UNITARIAS, b.semente))
+    novos, lote = extras[b.quantidade:], extras[:b.quantidade]
+    # lote é o efetivo do banco-modelo: cada militar atualizado com o próprio registro
+    # (CPF, PREC-CP e IDT iguais), mudando só endereço e valor do AT
+    id_por_cpf = {m.cpf: m.id for m in db.buscar_campos(("id", "cpf"))}
+    atualizacoes = [(id_por_cpf[d[3]], d[:13] + (d[13] + " - fundos",) + d[14:18] + ("200,00",) + d[19:])
+                    for d in lote]
+
+    def um_a_um():
+        for dados in novos:
+            db.inserir_militar(dados)
+
+    return [
+        Caso(f"inserir_militar x{INSERCOES_UNITARIAS}", um_a_um, b.copia_do_modelo, repeticoes=3),
+        Caso(f"inserir_militares_lote({b.quantidade})",
+             lambda: _sem_erros("inserir_militares_lote", db.inserir_militares_lote(lote)),
+             b.copia_vazia, repeticoes=3),
+        Caso(f"atualizar_militares_lote({b.quantidade})",
+             lambda: _sem_erros("atualizar_militares_lote", db.atualizar_militares_lote(atualizacoes)),
+             b.copia_do_modelo, repeticoes=3),
+    ]
+
+def _casos_planilhas(b: _Bancos, planilhas: List[int]) -> List[Caso]:
+    saida = os.path.join(b.pasta, "saida.xlsx")
+    casos = [
+        Caso(f"exportar_para_excel({b.quantidade})", lambda: gravar_planilha(saida), b.usar_modelo, 3),
+        Caso(f"gerar_relacao_pessoal({b.quantidade})",
+             lambda: gerar_relacao_pessoal(caminho_arquivo=saida), b.usar_modelo, 3),
+    ]
+    for qtd in planilhas:
+        casos.append(Caso(f"importar_de_excel({qtd})",
+                          lambda arq=b.planilha(qtd): importar_planilha(arq),
+                          b.copia_vazia, repeticoes=3 if qtd <= 10_000 else 1))
+    return casos
+
+# ==============================================
+# Execução e resultado
+# ==============================================
+def medir(caso: Caso) -> Dict:
+    tempos = []
+    for _ in range(caso.repeticoes):
+        if caso.preparar:
+            caso.preparar()
+        t0 = time.perf_counter()
+        caso.medir()
+        tempos.append((time.perf_counter() - t0) * 1e3)
+    return {
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "min_ms": round(min(tempos), 4),
+        "repeticoes": caso.repeticoes,
+    }
+
+def maquina() -> Dict:
+    return {
+        "sistema": platform.platform(),
+        "arquitetura": platform.machine(),
+        "processador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "sqlite": sqlite3.sqlite_version,
+        "openpyxl": getattr(openpyxl, "__version__", None),
+    }
+
+def executar(quantidade: int, planilhas: List[int], semente: int = SEMENTE_PADRAO,
+             apenas: Optional[str] = None, mostrar=print) -> Dict:
+    """Roda a suíte num diretório temporário e devolve o resultado (o mesmo dicionário do JSON)."""
+    resultado = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "maquina": maquina(),
+        "parametros": {"quantidade": quantidade, "planilhas": planilhas, "semente": semente},
+        "casos": {},
+        "ignorados": {},
+    }
+    anterior = db.CONFIG
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            mostrar(f"preparando {quantidade} militares…")
+            b = _Bancos(tmp, quantidade, semente)
+            # leitura no modelo; os casos que gravam preparam a própria cópia
+            grupos = [_casos_leitura, _casos_escrita]
+            if SEM_PLANILHAS:
+                resultado["ignorados"]["planilhas"] = SEM_PLANILHAS
+            else:
+                grupos.append(lambda b: _casos_planilhas(b, planilhas))
+            for montar in grupos:
+                b.usar_modelo()
+                for caso in [c for c in montar(b) if not apenas or apenas in c.nome]:
+                    r = medir(caso)
+                    resultado["casos"][caso.nome] = r
+                    mostrar(f"{caso.nome:40s} {r['mediana_ms']:12.3f} ms")
+        finally:
+            db.configurar(anterior)
+    return resultado
+
+def comparar(atual: Dict, base: Dict, limite: float = LIMITE_PADRAO,
+             folga_ms: float = FOLGA_MS) -> List[tuple]:
+    """(caso, base_ms, atual_ms, regrediu) dos casos presentes nos dois resultados."""
+    linhas = []
+    for nome, r in atual["casos"].items():
+        if nome not in base.get("casos", {}):
+            continue
+        antes, agora = base["casos"][nome]["mediana_ms"], r["mediana_ms"]
+        regrediu = agora > antes * (1 + limite) and agora - antes > folga_ms
+        linhas.append((nome, antes, agora, regrediu))
+    return linhas
+
+def _tamanho(texto: str) -> int:
+    """ "10k" -> 10000; também os TAMANHOS do gerador e números simples."""
+    t = texto.strip().lower()
+    return TAMANHOS.get(t) or (int(t[:-1]) * 1000 if t.endswith("k") else int(t))
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(description="Suíte de medições (sem tela) do cadastro de militares.")
+    p.add_argument("--quantidade", default="10k", type=_tamanho, help="militares na base (padrão 10k)")
+    p.add_argument("--planilhas", default="10k,100k",
+                   type=lambda s: [_tamanho(t) for t in s.split(",") if t.strip()],
+                   help="linhas das planilhas importadas, separadas por vírgula (padrão 10k,100k)")
+    p.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    p.add_argument("--apenas", metavar="TEXTO", help="só os casos cujo nome contém TEXTO")
+    p.add_argument("--saida", default="bench_suite.json", metavar="ARQ", help="JSON do resultado")
+    p.add_argument("--base", metavar="ARQ", help="resultado de referência (criado se não existir)")
+    p.add_argument("--limite", type=float, default=LIMITE_PADRAO,
+                   help=f"fração de piora tolerada (padrão {LIMITE_PADRAO})")
+    return p.parse_args(argv)
+
+def _gravar_json(caminho: str, dados: Dict):
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2)
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    resultado = executar(args.quantidade, args.planilhas, args.semente, args.apenas)
+    _gravar_json(args.saida, resultado)
+    print(f"\nresultado em {args.saida}")
+    if not args.base:
+        return 0
+    if not os.path.exists(args.base):
+        _gravar_json(args.base, resultado)
+        print(f"base criada em {args.base}")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("maquina") != resultado["maquina"]:
+        print("atenção: a base foi medida em outra máquina ou ambiente", file=sys.stderr)
+    if base.get("parametros") != resultado["parametros"]:
+        print("atenção: a base foi medida com outros parâmetros", file=sys.stderr)
+    linhas = comparar(resultado, base, args.limite)
+    print(f"\n{'caso':40s} {'base':>12s} {'agora':>12s}")
+    for nome, antes, agora, regrediu in linhas:
+        marca = "  REGRESSÃO" if regrediu else ""
+        print(f"{nome:40s} {antes:9.3f} ms {agora:9.3f} ms {agora / antes - 1 if antes else 0:+7.0%}{marca}")
+    regressoes = sum(1 for *_x, regrediu in linhas if regrediu)
+    if regressoes:
+        print(f"\n{regressoes} caso(s) acima do limite de {args.limite:.0%}", file=sys.stderr)
+    return 1 if regressoes else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
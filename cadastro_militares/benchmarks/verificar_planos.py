@@ -0,0 +1,71 @@
+# benchmarks/verificar_planos.py
+# Confere (EXPLAIN QUERY PLAN) que as consultas filtradas de militares usam os
+# índices de INDICES_MILITARES — com a base vazia e depois de carga + ANALYZE —
+# e compara o tempo de cada consulta com e sem os índices. Roda num banco em
+# memória (benchmarks/fixtures.py): o plano não depende do disco.
+#
+# Uso (dentro de cadastro_militares/):
+#     python -m benchmarks.verificar_planos [quantidade]
+# Sai com erro se alguma consulta cair para varredura completa.
+
+import sys
+import time
+
+from benchmarks.fixtures import banco_em_memoria
+from database import db
+
+POSTOS = ("Capitão", "1º Tenente", "2º Tenente", "Subtenente", "1º Sargento", "2º Sargento",
+          "3º Sargento", "Cabo Efetivo Profissional", "Soldado Efetivo Profissional",
+          "Soldado Efetivo Variável")
+
+def _registros(n):
+    for i in range(n):
+        at = "Sim" if i % 4 == 0 else "Não"
+        yield (
+            POSTOS[i % len(POSTOS)], f"MILITAR {i:06d}", f"Guerra{i}",
+            f"{i:011d}", f"{i:09d}", f"{i:010d}",
+            "001 - Banco do Brasil S.A", "1234", f"{i:08d}", "",
+            "2015", "01/01/1995", "01/03/2015", "Rua X", "20000000",
+            "Não", "0", at, "286.66" if at == "Sim" else "0.00", "Não",
+        )
+
+CHAMADAS = (
+    ("buscar_por_posto", lambda: db.buscar_por_posto("3º Sargento")),
+    ("buscar_recebem_aux_transporte", db.buscar_recebem_aux_transporte),
+    ("buscar_por_nome", lambda: db.buscar_por_nome("militar 0123")),
+    ("listar_postos_em_uso", db.listar_postos_em_uso),
+    ("buscar_campos(ORDEM_HIERARQUIA)",
+     lambda: db.buscar_campos(("id", "posto", "nome"), order=db.ORDEM_HIERARQUIA)),
+)
+
+def _tempos(repeticoes=20):
+    res = {}
+    for nome, fn in CHAMADAS:
+        t0 = time.perf_counter()
+        for _ in range(repeticoes):
+            fn()
+        res[nome] = (time.perf_counter() - t0) / repeticoes
+    return res
+
+def main(n: int = 20000):
+    with banco_em_memoria():
+        db.verificar_planos()
+        print("planos ok (base vazia)")
+
+        db.inserir_militares_lote(_registros(n))
+        db.analisar()
+        for nome, plano in db.verificar_planos().items():
+            print(f"{nome:32s} {' | '.join(plano)}")
+
+        com = _tempos()
+        con = db.conectar()
+        for nome in db.INDICES_MILITARES:
+            con.execute(f"DROP INDEX {nome}")
+        db.analisar()
+        sem = _tempos()
+        print(f"\n{'consulta':32s} {'sem índice':>12s} {'com índice':>12s}")
+        for nome, _ in CHAMADAS:
+            print(f"{nome:32s} {sem[nome] * 1e3:10.2f} ms {com[nome] * 1e3:10.2f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,143 @@
+# database/auditoria.py
+# Quem mudou o quê em cada militar, sem pesar nas gravações.
+#
+# As funções de gravação de db.py anotam as diferenças por coluna durante a
+# transação (anotar); no commit as anotações vão para uma fila em memória
+# (confirmar) — num rollback, são descartadas. Uma thread própria grava a fila em
+# lotes na tabela auditoria, que só aceita inclusões. Consulta: db.historico_militar()
+# e db.buscar_auditoria().
+#
+# Ao sair do programa a fila é gravada (atexit); descarregar() força a gravação.
+
+import atexit
+import getpass
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+INTERVALO_S = 1.0   # a thread grava o que houver na fila a cada intervalo...
+LOTE_MAXIMO = 500   # ...ou antes, quando a fila chega a este tamanho
+
+def _usuario_padrao() -> str:
+    try:
+        return f"{getpass.getuser()}@{socket.gethostname()}"
+    except Exception:  # sem variável de usuário (serviço, agendador)
+        return socket.gethostname()
+
+USUARIO = _usuario_padrao()
+
+class RegistroAuditoria(NamedTuple):
+    id: int
+    militar_id: int
+    quando: str              # "AAAA-MM-DD HH:MM:SS.mmm" (hora local da estação)
+    usuario: str
+    operacao: str            # "inserir" | "alterar" | "excluir"
+    coluna: Optional[str]
+    valor_antigo: object     # como está no banco (centavos, datas ISO, nome do posto)
+    valor_novo: object
+
+_local = threading.local()
+_cond = threading.Condition()
+_gravando = threading.Lock()
+_fila: List[tuple] = []
+_gravar: Optional[Callable[[List[tuple]], None]] = None
+_thread: Optional[threading.Thread] = None
+_parar = False
+
+def configurar(gravar: Callable[[List[tuple]], None]):
+    """Chamado por db.py: gravar(linhas) insere as linhas na tabela auditoria (numa transação)."""
+    global _gravar
+    _gravar = gravar
+
+# =========================
+# Anotação (thread que grava)
+# =========================
+def _pendentes() -> List[tuple]:
+    p = getattr(_local, "pendentes", None)
+    if p is None:
+        p = _local.pendentes = []
+    return p
+
+def anotar(militar_id: int, operacao: str, coluna: Optional[str] = None,
+           antigo=None, novo=None):
+    """Registra uma alteração da transação em curso (só vale se ela for confirmada)."""
+    quando = datetime.now().isoformat(sep=" ", timespec="milliseconds")
+    _pendentes().append((militar_id, quando, USUARIO, operacao, coluna, antigo, novo))
+
+def confirmar():
+    """Commit da transação: as anotações dela entram na fila de gravação."""
+    pendentes = getattr(_local, "pendentes", None)
+    if not pendentes:
+        return
+    _local.pendentes = []
+    with _cond:
+        _fila.extend(pendentes)
+        _garantir_thread()
+        if len(_fila) >= LOTE_MAXIMO:
+            _cond.notify()
+
+def descartar():
+    """Rollback da transação: as anotações dela somem."""
+    _local.pendentes = []
+
+# =========================
+# Gravação em lotes
+# =========================
+def _garantir_thread():
+    global _thread, _parar
+    if _thread is None or not _thread.is_alive():
+        _parar = False
+        _thread = threading.Thread(target=_laco, name="auditoria", daemon=True)
+        _thread.start()
+
+def _gravar_fila() -> bool:
+    """Grava o que está na fila; False se o banco recusou (o lote volta para a fila)."""
+    with _gravando:  # quem chama descarregar() espera o lote que a thread já tirou da fila
+        with _cond:
+            if _gravar is None:
+                return True
+            lote = _fila[:]
+            _fila.clear()
+        if not lote:
+            return True
+        try:
+            _gravar(lote)
+            return True
+        except Exception:
+            with _cond:
+                _fila[:0] = lote
+            return False
+
+def _laco():
+    while True:
+        with _cond:
+            if not _fila and not _parar:
+                _cond.wait(INTERVALO_S)
+            parar = _parar
+        if not _gravar_fila() and not parar:
+            time.sleep(INTERVALO_S)  # banco indisponível: tenta de novo no próximo ciclo
+        if parar:
+            break
+
+def descarregar() -> bool:
+    """Grava agora, na thread que chamou, o que estiver na fila (ex.: antes de consultar)."""
+    return _gravar_fila()
+
+def na_fila() -> int:
+    with _cond:
+        return len(_fila)
+
+def encerrar(esperar: bool = True):
+    """Para a thread depois de gravar a fila."""
+    global _parar
+    with _cond:
+        _parar = True
+        _cond.notify()
+        t = _thread
+    if esperar and t is not None and t.is_alive() and t is not threading.current_thread():
+        t.join()
+    descarregar()  # o que tiver chegado depois
+
+atexit.register(encerrar)
@@ -0,0 +1,66 @@
+# database/configuracao.py
+# Onde fica o banco. Quem manda, do mais forte para o mais fraco:
+#   db.configurar(...) no código (testes, benchmarks, relatórios de outro ano);
+#   --banco CAMINHO na linha de comando (main.py);
+#   variável de ambiente CADASTRO_BANCO;
+#   militares.db na pasta em que o programa foi aberto.
+#
+# ":memory:" é um banco só em memória, compartilhado por todas as threads do
+# processo (VFS memdb, SQLite 3.36+), que existe enquanto a Configuracao existir.
+# Serve para testes e medições isolados: nada é lido nem gravado em disco.
+
+import itertools
+import os
+import sqlite3
+from typing import Optional
+
+ENV_BANCO = "CADASTRO_BANCO"
+BANCO_PADRAO = "militares.db"
+MEMORIA = ":memory:"
+
+_numeracao = itertools.count(1)
+
+class Configuracao:
+    """
+    caminho: arquivo do banco ou ":memory:" (None = CADASTRO_BANCO ou militares.db).
+    pasta: onde ficam fotos/ e backups/ (padrão: a pasta do arquivo; em memória, a pasta atual).
+    """
+    __slots__ = ("caminho", "pasta", "_uri", "_guardia")
+
+    def __init__(self, caminho: Optional[str] = None, pasta: Optional[str] = None):
+        caminho = caminho or os.environ.get(ENV_BANCO) or BANCO_PADRAO
+        if caminho == MEMORIA:
+            self.caminho = MEMORIA
+            self._uri = f"file:/cadastro-{os.getpid()}-{next(_numeracao)}?vfs=memdb"
+            # o banco em memória some quando fecha a última conexão: esta o mantém vivo
+            self._guardia = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            self.pasta = os.path.abspath(pasta or os.getcwd())
+        else:
+            self.caminho = os.path.abspath(caminho)  # fixo: mudar de pasta depois não troca o banco
+            self._uri = None
+            self._guardia = None
+            self.pasta = os.path.abspath(pasta) if pasta else os.path.dirname(self.caminho)
+
+    @property
+    def em_memoria(self) -> bool:
+        return self._uri is not None
+
+    @property
+    def nome_base(self) -> str:
+        """Nome do banco sem extensão (nome dos arquivos de backup)."""
+        return "memoria" if self.em_memoria else os.path.splitext(os.path.basename(self.caminho))[0]
+
+    def conectar(self, **kwargs) -> sqlite3.Connection:
+        """Conexão nova com este banco (kwargs vão para sqlite3.connect)."""
+        if self.em_memoria:
+            return sqlite3.connect(self._uri, uri=True, **kwargs)
+        return sqlite3.connect(self.caminho, **kwargs)
+
+    def fechar(self):
+        """Banco em memória: descarta o conteúdo quando as demais conexões fecharem."""
+        if self._guardia is not None:
+            self._guardia.close()
+            self._guardia = None
+
+    def __repr__(self):
+        return f"Configuracao({self.caminho!r})"
@@ -1,188 +1,1079 @@
+import bisect
+import functools
+import os
+import random
+import re
 import sqlite3
-from typing import List, Tuple, Dict, Optional
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, List, Tuple, Dict, Optional, Iterable, Set
 
-DB_NOME = "militares.db"
+from database import auditoria, diagnostico, migracoes
+from database.auditoria import RegistroAuditoria
+from database.configuracao import Configuracao
+from database.modelos import CAMPOS_MILITAR, Militar, militar_factory, centavos, data_iso, dados_para_banco
 
 # =========================
 # Conexão
 # =========================
+# Banco em uso: ver database/configuracao.py. Para trocar, use configurar().
+CONFIG = Configuracao()
+
+# Uma conexão persistente por thread: abrir/fechar o arquivo a cada chamada
+# custava mais que a própria consulta (ex.: soldo por linha na gratificação).
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",   # seguro com WAL, evita fsync a cada commit
+    "PRAGMA cache_size = -8000",     # ~8 MB de page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",      # militares.posto_id -> postos.id
+)
+CACHE_INSTRUCOES = 128  # prepared statements mantidos por conexão
+
+# Várias estações no mesmo arquivo (pasta compartilhada): quem encontra o banco travado
+# espera até TEMPO_ESPERA_TRAVA (busy_timeout); se ainda assim não conseguir, as funções
+# de gravação repetem a transação inteira até TENTATIVAS_TRAVA vezes, com pausas
+# crescentes e aleatórias (para duas estações não voltarem juntas).
+TEMPO_ESPERA_TRAVA = 5.0   # s
+TENTATIVAS_TRAVA = 4
+PAUSA_TRAVA = 0.2          # s: base da pausa entre tentativas (dobra a cada uma, ±50%)
+
+MENSAGEM_BANCO_OCUPADO = "O banco de dados está em uso por outra estação. Tente novamente em instantes."
+
+class BancoOcupado(sqlite3.OperationalError):
+    """O banco continuou travado por outra estação mesmo depois das novas tentativas."""
+
+_local = threading.local()
+
+def _abrir_conexao() -> sqlite3.Connection:
+    # isolation_level=None: o controle de transação fica com transacao()
+    con = CONFIG.conectar(isolation_level=None, timeout=TEMPO_ESPERA_TRAVA,
+                          cached_statements=CACHE_INSTRUCOES)
+    for pragma in PRAGMAS_CONEXAO:
+        con.execute(pragma)
+    diagnostico.registrar_conexao(con)
+    return con
+
 def conectar() -> sqlite3.Connection:
-    return sqlite3.connect(DB_NOME)
+    """
+    Devolve a conexão da thread atual (aberta na primeira chamada).
+    Não feche a conexão retornada; use fechar_conexao() se precisar.
+    """
+    con = getattr(_local, "con", None)
+    if con is None or _local.config is not CONFIG:  # configurar() trocou o banco
+        if con is not None:
+            fechar_conexao()
+        con = _abrir_conexao()
+        _local.con, _local.config = con, CONFIG
+    return con
+
+def configurar(banco=None, pasta: Optional[str] = None) -> Configuracao:
+    """
+    Troca o banco em uso e devolve a Configuracao nova:
+        db.configurar(":memory:")             # banco vazio em memória (chame init())
+        db.configurar("D:/dados/2024.db")     # outro arquivo
+        db.configurar(anterior)               # uma Configuracao guardada antes
+    banco=None: variável CADASTRO_BANCO ou militares.db. A fila da auditoria é gravada
+    no banco antigo; as conexões de cada thread são trocadas na próxima chamada.
+    """
+    global CONFIG, FTS_DISPONIVEL
+    nova = banco if isinstance(banco, Configuracao) else Configuracao(banco, pasta)
+    auditoria.descarregar()
+    fechar_conexao()
+    CONFIG = nova
+    FTS_DISPONIVEL = None
+    return nova
+
+def fechar_conexao():
+    """Fecha a conexão da thread atual (a próxima chamada reabre)."""
+    con = getattr(_local, "con", None)
+    if con is not None:
+        _local.con = None
+        diagnostico.esquecer_conexao(con)
+        con.close()
+
+@contextmanager
+def transacao(leitura: bool = False):
+    """
+    Uso:
+        with transacao() as cur:
+            cur.execute(...)
+    Commit ao sair do bloco, rollback se houver exceção.
+    Se já existir transação aberta na thread, apenas participa dela.
+    A trava de escrita é pedida logo no início (BEGIN IMMEDIATE), esperando o
+    busy_timeout se outra estação estiver gravando; leitura=True só lê (BEGIN).
+    """
+    con = conectar()
+    if con.in_transaction:
+        yield con.cursor()
+        return
+    con.execute("BEGIN" if leitura else "BEGIN IMMEDIATE")
+    try:
+        yield con.cursor()
+    except BaseException:
+        con.rollback()
+        auditoria.descartar()
+        _invalidar_cache()  # o cache pode ter lido o que foi desfeito
+        raise
+    con.commit()
+    auditoria.confirmar()  # o que a transação anotou vai para a fila da auditoria
+
+def _travado(erro: sqlite3.OperationalError) -> bool:
+    msg = str(erro).lower()
+    return "database is locked" in msg or "database is busy" in msg
+
+def banco_ocupado(erro: BaseException) -> bool:
+    """
+    True para BancoOcupado e para o banco travado numa gravação que não se repete
+    sozinha (lotes): as telas mostram o mesmo aviso nos dois casos.
+    """
+    return isinstance(erro, BancoOcupado) or (isinstance(erro, sqlite3.OperationalError) and _travado(erro))
+
+def _repetindo_se_travado(fn):
+    """
+    Repete fn (uma função de gravação inteira) quando o banco está travado por outra
+    estação; esgotadas as tentativas, levanta BancoOcupado. Dentro de uma transação
+    já aberta não repete: a falha sobe para quem a abriu.
+    """
+    @functools.wraps(fn)
+    def repetindo(*args, **kwargs):
+        if conectar().in_transaction:
+            return fn(*args, **kwargs)
+        for tentativa in range(TENTATIVAS_TRAVA):
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _travado(e) or isinstance(e, BancoOcupado):
+                    raise
+                if tentativa == TENTATIVAS_TRAVA - 1:
+                    raise BancoOcupado(MENSAGEM_BANCO_OCUPADO) from e
+                time.sleep(PAUSA_TRAVA * (2 ** tentativa) * random.uniform(0.5, 1.5))
+    return repetindo
+
+# -------- Cache de tabelas pequenas --------
+# Soldos e catálogos são consultados a cada linha/tecla e quase nunca mudam: ficam em
+# memória, por thread (como a conexão). Quem grava por esta conexão chama
+# _invalidar_cache(); gravações de outras conexões/processos mudam PRAGMA data_version.
+def _em_cache(nome: str, carregar):
+    """Valor de carregar(con), guardado até a próxima gravação que o afete."""
+    con = conectar()
+    marca = con.execute("PRAGMA data_version").fetchone()[0]
+    caches = getattr(_local, "caches", None)
+    if caches is None:
+        caches = _local.caches = {}
+    item = caches.get(nome)
+    if item is None or item[0] != marca or item[1] is not con:
+        item = caches[nome] = (marca, con, carregar(con))
+    return item[2]
+
+def _invalidar_cache(*nomes: str):
+    """Descarta os caches `nomes` desta thread (todos, se nenhum for passado)."""
+    caches = getattr(_local, "caches", None)
+    if not caches:
+        return
+    for nome in nomes or list(caches):
+        caches.pop(nome, None)
 
 # =========================
 # Tabela MILITARES
 # =========================
 def criar_tabela_militares():
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS militares (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            posto TEXT NOT NULL,
-            nome TEXT NOT NULL,
-            nome_guerra TEXT NOT NULL,
-            cpf TEXT UNIQUE NOT NULL,
-            prec_cp TEXT UNIQUE NOT NULL,
-            idt TEXT UNIQUE NOT NULL,
-            banco TEXT,
-            agencia TEXT,
-            conta TEXT,
-            foto TEXT,
-            ano TEXT,
-            data_nascimento TEXT,
-            data_praca TEXT,
-            endereco TEXT,
-            cep TEXT,
-            recebe_pre_escolar TEXT,
-            valor_pre_escolar TEXT,
-            recebe_aux_transporte TEXT,
-            valor_aux_transporte TEXT,
-            pnr TEXT
-        )
-    """)
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS militares (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                posto_id INTEGER NOT NULL REFERENCES postos (id),
+                nome TEXT NOT NULL,
+                nome_guerra TEXT NOT NULL,
+                cpf TEXT UNIQUE NOT NULL,
+                prec_cp TEXT UNIQUE NOT NULL,
+                idt TEXT UNIQUE NOT NULL,
+                banco TEXT,
+                agencia TEXT,
+                conta TEXT,
+                foto TEXT,
+                ano TEXT,
+                data_nascimento TEXT,           -- ISO-8601 (AAAA-MM-DD)
+                data_praca TEXT,                -- ISO-8601 (AAAA-MM-DD)
+                endereco TEXT,
+                cep TEXT,
+                recebe_pre_escolar TEXT,
+                valor_pre_escolar_centavos INTEGER NOT NULL DEFAULT 0,
+                recebe_aux_transporte TEXT,
+                valor_aux_transporte_centavos INTEGER NOT NULL DEFAULT 0,
+                pnr TEXT,
+                row_version INTEGER NOT NULL DEFAULT 0,   -- ver "Controle de versão"
+                updated_at TEXT
+            )
+        """)
+        cur.execute(_DDL_VW_MILITARES)
 
-def _fmt2(v) -> str:
-    try:
-        return f"{float(v):.2f}"
-    except Exception:
-        return "0.00"
+# Leitura de militares com o nome do posto no lugar do posto_id: as consultas
+# continuam pedindo "posto" e podem ordenar pela hierarquia (posto_ordem).
+_DDL_VW_MILITARES = """
+    CREATE VIEW IF NOT EXISTS vw_militares AS
+    SELECT m.id, p.nome AS posto, m.nome, m.nome_guerra, m.cpf, m.prec_cp, m.idt,
+           m.banco, m.agencia, m.conta, m.foto, m.ano, m.data_nascimento, m.data_praca,
+           m.endereco, m.cep, m.recebe_pre_escolar, m.valor_pre_escolar_centavos,
+           m.recebe_aux_transporte, m.valor_aux_transporte_centavos, m.pnr,
+           m.posto_id, p.ordem AS posto_ordem, m.row_version, m.updated_at
+      FROM militares m JOIN postos p ON p.id = m.posto_id
+"""
+
+# -------- Índices --------
+# Conjunto gerenciado: criar_indices() cria os que faltam e remove idx_militares_*
+# que saíram desta lista. As consultas que dependem deles estão em CONSULTAS_INDEXADAS.
+INDICES_MILITARES = {
+    "idx_militares_posto":
+        "CREATE INDEX IF NOT EXISTS idx_militares_posto ON militares (posto_id, nome COLLATE NOCASE)",
+    "idx_militares_nome":
+        "CREATE INDEX IF NOT EXISTS idx_militares_nome ON militares (nome COLLATE NOCASE)",
+    "idx_militares_nome_guerra":
+        "CREATE INDEX IF NOT EXISTS idx_militares_nome_guerra ON militares (nome_guerra COLLATE NOCASE)",
+    "idx_militares_aux_transporte":
+        "CREATE INDEX IF NOT EXISTS idx_militares_aux_transporte ON militares (posto_id, nome COLLATE NOCASE) "
+        "WHERE recebe_aux_transporte = 'Sim'",
+    "idx_militares_data_nascimento":
+        "CREATE INDEX IF NOT EXISTS idx_militares_data_nascimento ON militares (data_nascimento)",
+    "idx_militares_data_praca":
+        "CREATE INDEX IF NOT EXISTS idx_militares_data_praca ON militares (data_praca)",
+    "idx_militares_row_version":
+        "CREATE INDEX IF NOT EXISTS idx_militares_row_version ON militares (row_version)",
+}
+
+def criar_indices():
+    with transacao() as cur:
+        existentes = [r[0] for r in cur.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'militares' "
+            "AND name LIKE 'idx_militares_%'")]
+        for nome in existentes:
+            if nome not in INDICES_MILITARES:
+                cur.execute(f'DROP INDEX IF EXISTS "{nome}"')
+        for ddl in INDICES_MILITARES.values():
+            cur.execute(ddl)
+
+def analisar():
+    """
+    Atualiza as estatísticas do planejador (sqlite_stat1). Chame depois de cargas em lote.
+    analysis_limit limita as linhas amostradas por índice, então é rápido mesmo com muitos registros.
+    """
+    con = conectar()
+    con.execute("PRAGMA analysis_limit = 1000")
+    con.execute("ANALYZE")
 
 # -------- CRUD militares --------
+_SQL_INSERIR_MILITAR = """
+    INSERT INTO militares (
+        posto_id, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
+        ano, data_nascimento, data_praca, endereco, cep,
+        recebe_pre_escolar, valor_pre_escolar_centavos,
+        recebe_aux_transporte, valor_aux_transporte_centavos, pnr
+    ) VALUES ((SELECT id FROM postos WHERE nome = ?),
+              ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_ATUALIZAR_MILITAR = """
+    UPDATE militares SET
+        posto_id=(SELECT id FROM postos WHERE nome = ?), nome=?, nome_guerra=?, cpf=?, prec_cp=?, idt=?, banco=?, agencia=?, conta=?, foto=?,
+        ano=?, data_nascimento=?, data_praca=?, endereco=?, cep=?,
+        recebe_pre_escolar=?, valor_pre_escolar_centavos=?,
+        recebe_aux_transporte=?, valor_aux_transporte_centavos=?, pnr=?
+    WHERE id=?
+"""
+
+@_repetindo_se_travado
 def inserir_militar(dados: Tuple):
     """
     dados: (posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
             ano, data_nascimento, data_praca, endereco, cep,
             recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr)
+    Valores em reais ("286,66", 286.66) e datas dd/mm/aaaa são convertidos (dados_para_banco).
+    Posto fora do catálogo é incluído nele (ver registrar_posto()).
     """
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        INSERT INTO militares (
-            posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
-            ano, data_nascimento, data_praca, endereco, cep,
-            recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, dados)
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        registrar_posto(cur, dados[0])
+        cur.execute(_SQL_INSERIR_MILITAR, dados_para_banco(dados))
+        auditoria.anotar(cur.lastrowid, "inserir")
 
-def buscar_todos() -> List[Tuple]:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        SELECT id, posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
-               ano, data_nascimento, data_praca, endereco, cep,
-               recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr
-        FROM militares
-    """)
-    rows = cur.fetchall()
-    con.close()
-    return rows
-
-def buscar_por_id(id_militar: int) -> Optional[Tuple]:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        SELECT id, posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
-               ano, data_nascimento, data_praca, endereco, cep,
-               recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr
-        FROM militares
-        WHERE id = ?
-    """, (id_militar,))
-    row = cur.fetchone()
-    con.close()
-    return row
-
-def atualizar_militar(id_militar: int, dados: Tuple):
+_SQL_SELECIONAR_MILITARES = """
+    SELECT id, posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
+           ano, data_nascimento, data_praca, endereco, cep,
+           recebe_pre_escolar, valor_pre_escolar_centavos,
+           recebe_aux_transporte, valor_aux_transporte_centavos, pnr
+    FROM vw_militares
+"""
+
+def _cursor_militares() -> sqlite3.Cursor:
+    """Cursor cujas linhas saem como Militar (ver database/modelos.py)."""
+    cur = conectar().cursor()
+    cur.row_factory = militar_factory
+    return cur
+
+def buscar_todos() -> List[Militar]:
+    return _cursor_militares().execute(_SQL_SELECIONAR_MILITARES).fetchall()
+
+def buscar_por_id(id_militar: int) -> Optional[Militar]:
+    cur = _cursor_militares().execute(_SQL_SELECIONAR_MILITARES + " WHERE id = ?", (id_militar,))
+    return cur.fetchone()
+
+# Ordem hierárquica (postos.ordem), depois nome e id — servida pelos índices
+# idx_postos_ordem e idx_militares_posto, sem ordenação em memória.
+ORDEM_HIERARQUIA = ("posto_ordem", "nome", "id")
+_COLUNAS_FILTRO = CAMPOS_MILITAR + ("posto_id", "posto_ordem")
+_COLLATE_ORDEM = {"nome": " COLLATE NOCASE", "nome_guerra": " COLLATE NOCASE"}  # como nos índices
+
+def buscar_campos(campos: Iterable[str], where: Optional[Dict] = None,
+                  order: Optional[Iterable[str]] = None) -> List[Militar]:
+    """
+    Só as colunas pedidas, para telas que não usam o registro inteiro:
+        buscar_campos(("id", "posto", "nome"), where={"posto": "Capitão"}, order=ORDEM_HIERARQUIA)
+    campos aceita nomes de CAMPOS_MILITAR; where/order também posto_id e posto_ordem
+    (ValueError se não). where: igualdade por coluna (lista/tupla vira IN).
+    order: "-coluna" = decrescente; nome e nome_guerra sem diferenciar maiúsculas.
+    As colunas não pedidas ficam None no Militar.
+    """
+    campos = tuple(dict.fromkeys(campos))
+    if len(campos) == len(CAMPOS_MILITAR):
+        campos = CAMPOS_MILITAR  # linha completa: militar_factory lê por posição
+    sql, params = _sql_campos(campos, CAMPOS_MILITAR, where, order)
+    return _cursor_militares().execute(sql, params).fetchall()
+
+def buscar_colunas(campos: Iterable[str], where: Optional[Dict] = None,
+                   order: Optional[Iterable[str]] = None) -> Tuple[tuple, ...]:
+    """
+    Como buscar_campos(), mas por coluna: uma tupla de valores para cada campo pedido,
+    na ordem pedida (tuplas vazias sem militares). Para cálculos sobre o efetivo
+    inteiro (servicos/folha.py), sem criar um Militar por linha. campos aceita
+    também posto_id e posto_ordem.
+    """
+    campos = tuple(campos)
+    usadas = {*campos, *(where or {}), *(o.lstrip("-") for o in order or ())}
+    # sem posto/posto_ordem, lê a tabela direto: a view junta postos buscando cada linha pelo índice
+    tabela = "vw_militares" if usadas & {"posto", "posto_ordem"} else "militares"
+    sql, params = _sql_campos(campos, _COLUNAS_FILTRO, where, order, tabela)
+    linhas = conectar().execute(sql, params).fetchall()
+    return tuple(zip(*linhas)) if linhas else tuple(() for _ in campos)
+
+def _sql_campos(campos, permitidos, where, order, tabela="vw_militares") -> Tuple[str, list]:
+    invalidos = [c for c in campos if c not in permitidos]
+    invalidos += [c for c in (*(where or {}), *(o.lstrip("-") for o in order or ()))
+                  if c not in _COLUNAS_FILTRO]
+    if invalidos or not campos:
+        raise ValueError(f"Colunas inválidas: {', '.join(invalidos) or '(nenhuma)'}")
+
+    sql = f"SELECT {', '.join(campos)} FROM {tabela}"
+    params = []
+    if where:
+        conds = []
+        for col, valor in where.items():
+            if isinstance(valor, (list, tuple, set, frozenset)):
+                valor = list(valor)
+                conds.append(f"{col} IN ({', '.join('?' * len(valor))})" if valor else "0")
+                params.extend(valor)
+            else:
+                conds.append(f"{col} = ?")
+                params.append(valor)
+        sql += " WHERE " + " AND ".join(conds)
+    if order:
+        sql += " ORDER BY " + ", ".join(
+            o.lstrip("-") + _COLLATE_ORDEM.get(o.lstrip("-"), "") + (" DESC" if o.startswith("-") else "")
+            for o in order)
+    return sql, params
+
+_SQL_POR_POSTO = _SQL_SELECIONAR_MILITARES + " WHERE posto = ? ORDER BY nome COLLATE NOCASE"
+# CROSS JOIN fixa postos como tabela externa (percorrida por ordem): sem estatísticas,
+# numa base nova, o planejador preferia varrer o índice parcial e ordenar depois.
+_SQL_RECEBEM_AT = f"""
+    SELECT {', '.join('v.' + c for c in CAMPOS_MILITAR)}
+      FROM postos p CROSS JOIN vw_militares v ON v.posto_id = p.id
+     WHERE v.recebe_aux_transporte = 'Sim'
+     ORDER BY p.ordem, v.nome COLLATE NOCASE, v.id
+"""
+_SQL_POR_NOME = (_SQL_SELECIONAR_MILITARES +
+                 " WHERE nome LIKE ? ESCAPE '\\' OR nome_guerra LIKE ? ESCAPE '\\'")
+_SQL_POSTOS_EM_USO = """
+    SELECT p.ordem, p.nome, p.id FROM postos p
+     WHERE EXISTS (SELECT 1 FROM militares m WHERE m.posto_id = p.id)
+     ORDER BY p.ordem
+"""
+
+def _prefixo_like(texto: str) -> str:
+    t = (texto or "").strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return t + "%"
+
+def buscar_por_posto(posto: str) -> List[Militar]:
+    return _cursor_militares().execute(_SQL_POR_POSTO, (posto,)).fetchall()
+
+def buscar_recebem_aux_transporte() -> List[Militar]:
+    """Militares com recebe_aux_transporte = 'Sim' (índice parcial), por hierarquia e nome."""
+    return _cursor_militares().execute(_SQL_RECEBEM_AT).fetchall()
+
+def buscar_por_nome(prefixo: str) -> List[Militar]:
+    """Nome ou nome de guerra começando por `prefixo` (sem diferenciar maiúsculas)."""
+    p = _prefixo_like(prefixo)
+    return _cursor_militares().execute(_SQL_POR_NOME, (p, p)).fetchall()
+
+def listar_postos_em_uso() -> List[str]:
+    """Postos com ao menos um militar, na ordem hierárquica."""
+    return [r[1] for r in conectar().execute(_SQL_POSTOS_EM_USO)]
+
+_SQL_POR_PERIODO = _SQL_SELECIONAR_MILITARES + " WHERE {campo} BETWEEN ? AND ? ORDER BY {campo}"
+CAMPOS_DATA = ("data_nascimento", "data_praca")
+
+def buscar_por_periodo(campo: str, inicio, fim) -> List[Militar]:
+    """
+    Militares com `campo` (data_nascimento ou data_praca) entre inicio e fim, inclusive.
+    inicio/fim: dd/mm/aaaa, ISO ou date. Usa o índice da coluna (datas gravadas em ISO).
+    """
+    if campo not in CAMPOS_DATA:
+        raise ValueError(f"Campo de data inválido: {campo}")
+    sql = _SQL_POR_PERIODO.format(campo=campo)
+    return _cursor_militares().execute(sql, (data_iso(inicio), data_iso(fim))).fetchall()
+
+# Consulta -> (sql, parâmetros de exemplo, índice que o plano precisa usar).
+# Ao mudar uma consulta acima, rode verificar_planos() (benchmarks/verificar_planos.py).
+CONSULTAS_INDEXADAS = {
+    "buscar_por_posto": (_SQL_POR_POSTO, ("Capitão",), "idx_militares_posto"),
+    "buscar_recebem_aux_transporte": (_SQL_RECEBEM_AT, (), "idx_militares_aux_transporte"),
+    "buscar_por_nome": (_SQL_POR_NOME, ("SILVA%", "SILVA%"), "idx_militares_nome"),
+    "listar_postos_em_uso": (_SQL_POSTOS_EM_USO, (), "idx_militares_posto"),
+    "buscar_campos(ORDEM_HIERARQUIA)": (
+        "SELECT id, posto, nome FROM vw_militares ORDER BY posto_ordem, nome COLLATE NOCASE, id",
+        (), "idx_militares_posto"),
+    "buscar_por_periodo(data_nascimento)": (_SQL_POR_PERIODO.format(campo="data_nascimento"),
+                                             ("1990-01-01", "1999-12-31"), "idx_militares_data_nascimento"),
+    "buscar_por_periodo(data_praca)": (_SQL_POR_PERIODO.format(campo="data_praca"),
+                                        ("2015-01-01", "2015-12-31"), "idx_militares_data_praca"),
+}
+
+def plano_consulta(sql: str, params: Tuple = ()) -> List[str]:
+    """Linhas de detalhe do EXPLAIN QUERY PLAN de `sql`."""
+    return [r[3] for r in conectar().execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+_VARREDURA_MILITARES = re.compile(r"SCAN (militares|m)\b")  # "m" = alias em vw_militares
+
+def verificar_planos(consultas: Dict[str, Tuple] = None) -> Dict[str, List[str]]:
+    """
+    Confere pelo EXPLAIN QUERY PLAN que cada consulta usa o índice esperado
+    e não faz varredura completa de militares nem ordena em B-tree temporária.
+    Levanta AssertionError listando as consultas com problema; devolve os planos.
+    """
+    planos, falhas = {}, []
+    for nome, (sql, params, indice) in (consultas or CONSULTAS_INDEXADAS).items():
+        plano = plano_consulta(sql, params)
+        planos[nome] = plano
+        texto = "\n".join(plano)
+        if indice not in texto:
+            falhas.append(f"{nome}: não usa {indice}")
+        if any(_VARREDURA_MILITARES.match(l) and "INDEX" not in l for l in plano):
+            falhas.append(f"{nome}: varredura completa de militares")
+        if "USE TEMP B-TREE" in texto:
+            falhas.append(f"{nome}: ordenação sem índice")
+    if falhas:
+        raise AssertionError("Planos de consulta regrediram:\n" + "\n".join(falhas))
+    return planos
+
+class ConflitoDeEdicao(Exception):
+    """
+    Outra estação gravou o militar depois que ele foi carregado para edição e mexeu em
+    colunas que esta edição também altera (ou excluiu o militar: atual=None).
+    colunas: essas colunas; atual: o Militar como está agora no banco.
+    """
+    def __init__(self, id_militar: int, colunas: List[str], atual: Optional[Militar]):
+        self.id_militar = id_militar
+        self.colunas = colunas
+        self.atual = atual
+        if atual is None:
+            msg = f"O militar {id_militar} foi excluído por outra estação."
+        else:
+            msg = f"O militar {id_militar} foi alterado por outra estação em: {', '.join(colunas)}."
+        super().__init__(msg)
+
+_COLUNAS_GRAVACAO = CAMPOS_MILITAR[1:]  # ordem da tupla `dados`, já em formato do banco
+_SQL_COLUNA_POSTO = "posto_id = (SELECT id FROM postos WHERE nome = ?)"
+
+def _mesmo_valor(a, b) -> bool:
+    return a == b or (a in (None, "") and b in (None, ""))
+
+def _anotar_diferencas(id_militar: int, antes: Optional[Militar], novos: Tuple):
+    """Auditoria: uma anotação por coluna de `novos` (formato do banco) diferente de `antes`."""
+    if antes is None:
+        return
+    for col, novo in zip(_COLUNAS_GRAVACAO, novos):
+        antigo = getattr(antes, col)
+        if not _mesmo_valor(novo, antigo):
+            auditoria.anotar(id_militar, "alterar", col, antigo, novo)
+
+def buscar_para_edicao(id_militar: int) -> Tuple[Optional[Militar], int]:
+    """(militar, row_version) lidos juntos — passe os dois para atualizar_militar()."""
+    with transacao(leitura=True) as cur:
+        militar = buscar_por_id(id_militar)
+        linha = cur.execute("SELECT row_version FROM militares WHERE id = ?", (id_militar,)).fetchone()
+    return militar, (linha[0] if linha else 0)
+
+@_repetindo_se_travado
+def atualizar_militar(id_militar: int, dados: Tuple, original: Optional[Militar] = None,
+                      versao: Optional[int] = None) -> List[str]:
     """
     dados: (posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
             ano, data_nascimento, data_praca, endereco, cep,
             recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr)
+    Mesmas conversões de inserir_militar().
+    Com original/versao (de buscar_para_edicao()): grava só as colunas que mudaram e,
+    se outra estação gravou o militar depois de `versao` mexendo nessas mesmas colunas,
+    levanta ConflitoDeEdicao sem gravar nada. Alterações em colunas diferentes convivem.
+    Sem original: regrava todas as colunas. Retorna as colunas gravadas.
     """
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        UPDATE militares SET
-            posto=?, nome=?, nome_guerra=?, cpf=?, prec_cp=?, idt=?, banco=?, agencia=?, conta=?, foto=?,
-            ano=?, data_nascimento=?, data_praca=?, endereco=?, cep=?,
-            recebe_pre_escolar=?, valor_pre_escolar=?, recebe_aux_transporte=?, valor_aux_transporte=?, pnr=?
-        WHERE id=?
-    """, dados + (id_militar,))
-    con.commit()
-    con.close()
+    novos = dados_para_banco(dados)
+    if original is None:
+        with transacao() as cur:
+            registrar_posto(cur, dados[0])
+            antes = buscar_por_id(id_militar)  # só para a auditoria
+            cur.execute(_SQL_ATUALIZAR_MILITAR, novos + (id_militar,))
+            _anotar_diferencas(id_militar, antes, novos)
+        return list(_COLUNAS_GRAVACAO)
 
+    mudadas = [(col, novo, getattr(original, col))
+               for col, novo in zip(_COLUNAS_GRAVACAO, novos)
+               if not _mesmo_valor(novo, getattr(original, col))]
+    if not mudadas:
+        return []
+    sets, conferir, params_set, params_conferir = [], [], [], []
+    for col, novo, antigo in mudadas:
+        if col == "posto":
+            sets.append(_SQL_COLUNA_POSTO)
+            conferir.append("posto_id IS (SELECT id FROM postos WHERE nome = ?)")
+        else:
+            sets.append(f"{col} = ?")
+            conferir.append(f"{col} IS ?")
+        params_set.append(novo)
+        params_conferir.append(antigo)
+    # versão igual: ninguém gravou desde a carga; versão diferente: só grava se as
+    # colunas alteradas aqui ainda têm o valor que a tela carregou
+    sql = (f"UPDATE militares SET {', '.join(sets)} "
+           f"WHERE id = ? AND (row_version = ? OR ({' AND '.join(conferir)}))")
+    with transacao() as cur:
+        if original.posto != dados[0]:
+            registrar_posto(cur, dados[0])
+        cur.execute(sql, params_set + [id_militar, versao if versao is not None else -1] + params_conferir)
+        if cur.rowcount == 0:
+            atual = buscar_por_id(id_militar)
+            colunas = [] if atual is None else [
+                col for col, _novo, antigo in mudadas if not _mesmo_valor(getattr(atual, col), antigo)]
+            raise ConflitoDeEdicao(id_militar, colunas, atual)
+        for col, novo, antigo in mudadas:
+            auditoria.anotar(id_militar, "alterar", col, antigo, novo)
+    return [col for col, _novo, _antigo in mudadas]
+
+@_repetindo_se_travado
 def excluir_militar(id_militar: int):
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("DELETE FROM militares WHERE id=?", (id_militar,))
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        linha = cur.execute("SELECT nome FROM militares WHERE id=?", (id_militar,)).fetchone()
+        cur.execute("DELETE FROM militares WHERE id=?", (id_militar,))
+        if linha:  # o nome fica no histórico para identificar o excluído
+            auditoria.anotar(id_militar, "excluir", "nome", linha[0], None)
 
+@_repetindo_se_travado
 def atualizar_aux_transporte(militar_id: int, total_mensal: float, recebe: str = "Sim") -> bool:
     """
-    Atualiza valor_aux_transporte (total mensal de 22 dias) e marca recebe_aux_transporte.
+    Atualiza valor_aux_transporte (total mensal de 22 dias, em reais) e marca recebe_aux_transporte.
     """
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        UPDATE militares
-           SET valor_aux_transporte = ?, recebe_aux_transporte = ?
-         WHERE id = ?
-    """, (_fmt2(total_mensal), recebe, militar_id))
-    con.commit()
-    ok = cur.rowcount > 0
-    con.close()
-    return ok
+    novos = (centavos(total_mensal) or 0, recebe)
+    with transacao() as cur:
+        antes = cur.execute("""
+            SELECT valor_aux_transporte_centavos, recebe_aux_transporte FROM militares WHERE id = ?
+        """, (militar_id,)).fetchone()
+        if antes is None:
+            return False
+        cur.execute("""
+            UPDATE militares
+               SET valor_aux_transporte_centavos = ?, recebe_aux_transporte = ?
+             WHERE id = ?
+        """, novos + (militar_id,))
+        for col, antigo, novo in zip(("valor_aux_transporte_centavos", "recebe_aux_transporte"), antes, novos):
+            if not _mesmo_valor(novo, antigo):
+                auditoria.anotar(militar_id, "alterar", col, antigo, novo)
+        return True
+
+# -------- Operações em lote --------
+LOTE_PADRAO = 500  # linhas por executemany / savepoint
+
+def _fatiar(linhas: Iterable, tamanho: int):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def _executar_em_lotes(sql: str, linhas: Iterable[Tuple], tamanho_lote: int):
+    """
+    Executa `sql` para cada linha numa única transação, com executemany por lote.
+    Cada lote roda sob um SAVEPOINT: se falhar, é refeito linha a linha para
+    separar os registros com erro sem abortar os demais.
+    Retorna (qtd_afetadas, erros) — erros: lista de (posição, linha, mensagem).
+    """
+    afetadas = 0
+    erros = []
+    pos = 0
+    with transacao() as cur:
+        for lote in _fatiar(linhas, max(1, int(tamanho_lote))):
+            cur.execute("SAVEPOINT lote")
+            try:
+                cur.executemany(sql, lote)
+                afetadas += cur.rowcount
+            except sqlite3.Error:
+                cur.execute("ROLLBACK TO lote")
+                for i, linha in enumerate(lote):
+                    try:
+                        cur.execute(sql, linha)
+                        afetadas += cur.rowcount
+                    except sqlite3.Error as e:
+                        erros.append((pos + i, linha, str(e)))
+            cur.execute("RELEASE lote")
+            pos += len(lote)
+    return afetadas, erros
+
+def _registrando_postos(linhas: Iterable[Tuple]):
+    """
+    Repassa as linhas garantindo no catálogo cada posto (linha[0]) na primeira vez que aparece.
+    _fatiar() consome o gerador antes do SAVEPOINT do lote, então um lote desfeito não desfaz o posto.
+    """
+    vistos = set()
+    cur = conectar().cursor()  # cursor próprio: o do executemany está consumindo este gerador
+    for linha in linhas:
+        if linha[0] not in vistos:
+            vistos.add(linha[0])
+            registrar_posto(cur, linha[0])
+        yield linha
+
+def _convertendo(registros: Iterable, converter: Callable, originais: list):
+    """converter(registro) de cada um, guardando em `originais` o registro como veio (mesma posição)."""
+    for registro in registros:
+        originais.append(registro)
+        yield converter(registro)
+
+def _erros_com_originais(erros: list, originais: list) -> list:
+    """Troca, em cada (posição, linha, mensagem), a linha gravada pelo registro recebido do chamador."""
+    return [(pos, originais[pos], msg) for pos, _linha, msg in erros]
+
+def inserir_militares_lote(registros: Iterable[Tuple], tamanho_lote: int = LOTE_PADRAO):
+    """
+    Insere vários militares numa transação só.
+    registros: tuplas no mesmo formato de inserir_militar().
+    Retorna (inseridos, erros) — erros: lista de (posição, dados, mensagem), com os
+    dados como foram passados (datas e valores sem conversão).
+    """
+    originais = []
+    with transacao() as cur:
+        # As triggers de INSERT (índice de texto e versão) saem durante o lote e as linhas
+        # novas são tratadas de uma vez no fim (várias vezes mais rápido que linha a linha).
+        fts = _fts_disponivel()
+        ultimo_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM militares").fetchone()[0]
+        cur.execute("DROP TRIGGER IF EXISTS militares_versao_ai")
+        if fts:
+            cur.execute("DROP TRIGGER IF EXISTS militares_fts_ai")
+        linhas = _registrando_postos(_convertendo(registros, dados_para_banco, originais))
+        inseridos, erros = _executar_em_lotes(_SQL_INSERIR_MILITAR, linhas, tamanho_lote)
+        if fts:
+            cur.execute("""
+                INSERT INTO militares_fts (rowid, nome, nome_guerra, cpf, prec_cp, idt)
+                SELECT id, nome, nome_guerra, cpf, prec_cp, idt FROM militares WHERE id > ?
+            """, (ultimo_id,))
+            cur.execute(_DDL_TRIGGER_FTS_AI)
+        # o lote inteiro recebe uma versão só
+        cur.execute(_SQL_PROXIMA_VERSAO)
+        cur.execute("""
+            UPDATE militares SET row_version = (SELECT versao FROM versao_dados), updated_at = datetime('now')
+             WHERE id > ?
+        """, (ultimo_id,))
+        cur.execute(_ddl_triggers_versao("militares", "id")[0])
+        for (novo_id,) in cur.execute("SELECT id FROM militares WHERE id > ?", (ultimo_id,)).fetchall():
+            auditoria.anotar(novo_id, "inserir")
+    return inseridos, _erros_com_originais(erros, originais)
+
+def atualizar_militares_lote(registros: Iterable[Tuple[int, Tuple]], tamanho_lote: int = LOTE_PADRAO):
+    """
+    Atualiza vários militares numa transação só.
+    registros: pares (id_militar, dados) — dados no formato de atualizar_militar().
+    Retorna (atualizados, erros) — erros: lista de (posição, (id_militar, dados), mensagem),
+    com o par como foi passado.
+    """
+    originais = []
+    anteriores = []  # (linha, militar como estava), na ordem das linhas: para a auditoria
+
+    def guardando_anteriores(linhas):
+        # _fatiar() consome o gerador antes do executemany do lote: lê o militar ainda sem a alteração
+        cur = _cursor_militares()
+        for linha in linhas:
+            antes = cur.execute(_SQL_SELECIONAR_MILITARES + " WHERE id = ?", (linha[-1],)).fetchone()
+            anteriores.append((linha, antes))
+            yield linha
+
+    with transacao():
+        linhas = _registrando_postos(_convertendo(
+            registros, lambda par: dados_para_banco(par[1]) + (par[0],), originais))
+        atualizados, erros = _executar_em_lotes(_SQL_ATUALIZAR_MILITAR, guardando_anteriores(linhas), tamanho_lote)
+        com_erro = {pos for pos, _linha, _msg in erros}
+        for pos, (linha, antes) in enumerate(anteriores):
+            if pos not in com_erro:
+                _anotar_diferencas(linha[-1], antes, linha[:-1])
+    return atualizados, _erros_com_originais(erros, originais)
+
+# -------- Busca textual (FTS5) --------
+# Índice de texto externo (content='militares'): guarda só os tokens, as triggers
+# mantêm em dia. remove_diacritics: "JOAO" encontra "JOÃO".
+_DDL_TRIGGER_FTS_AI = """
+    CREATE TRIGGER IF NOT EXISTS militares_fts_ai AFTER INSERT ON militares BEGIN
+        INSERT INTO militares_fts (rowid, nome, nome_guerra, cpf, prec_cp, idt)
+        VALUES (new.id, new.nome, new.nome_guerra, new.cpf, new.prec_cp, new.idt);
+    END
+"""
+
+_DDL_BUSCA_TEXTO = (
+    """
+    CREATE VIRTUAL TABLE militares_fts USING fts5(
+        nome, nome_guerra, cpf, prec_cp, idt,
+        content='militares', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """,
+    _DDL_TRIGGER_FTS_AI,
+    """
+    CREATE TRIGGER IF NOT EXISTS militares_fts_ad AFTER DELETE ON militares BEGIN
+        INSERT INTO militares_fts (militares_fts, rowid, nome, nome_guerra, cpf, prec_cp, idt)
+        VALUES ('delete', old.id, old.nome, old.nome_guerra, old.cpf, old.prec_cp, old.idt);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS militares_fts_au AFTER UPDATE OF nome, nome_guerra, cpf, prec_cp, idt
+    ON militares BEGIN
+        INSERT INTO militares_fts (militares_fts, rowid, nome, nome_guerra, cpf, prec_cp, idt)
+        VALUES ('delete', old.id, old.nome, old.nome_guerra, old.cpf, old.prec_cp, old.idt);
+        INSERT INTO militares_fts (rowid, nome, nome_guerra, cpf, prec_cp, idt)
+        VALUES (new.id, new.nome, new.nome_guerra, new.cpf, new.prec_cp, new.idt);
+    END
+    """,
+)
+
+FTS_DISPONIVEL: Optional[bool] = None  # None = ainda não verificado
+
+def criar_busca_texto():
+    """
+    Cria o índice militares_fts (e as triggers) se ainda não existir,
+    populando com os militares já cadastrados.
+    Sem FTS5 no SQLite, buscar_texto() cai para LIKE (sensível a acentos).
+    """
+    global FTS_DISPONIVEL
+    try:
+        with transacao() as cur:
+            existe = cur.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'militares_fts'").fetchone()
+            if not existe:
+                for ddl in _DDL_BUSCA_TEXTO:
+                    cur.execute(ddl)
+                cur.execute("INSERT INTO militares_fts (militares_fts) VALUES ('rebuild')")
+        FTS_DISPONIVEL = True
+    except sqlite3.OperationalError:  # no such module: fts5
+        FTS_DISPONIVEL = False
+        CONSULTAS_INDEXADAS.pop("buscar_texto", None)
+
+def _fts_disponivel() -> bool:
+    global FTS_DISPONIVEL
+    if FTS_DISPONIVEL is None:
+        FTS_DISPONIVEL = conectar().execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'militares_fts'").fetchone() is not None
+    return FTS_DISPONIVEL
+
+def _consulta_fts(termo: str) -> str:
+    """
+    Converte o texto digitado numa consulta FTS5: cada palavra vira prefixo ("joa"*)
+    e todas precisam aparecer. CPF/PREC-CP/IDT digitados com pontuação viram um token só.
+    """
+    tokens = []
+    for parte in (termo or "").split():
+        if re.fullmatch(r"[\d.\-/]+", parte):
+            parte = re.sub(r"\D", "", parte)
+        tokens.extend(re.findall(r"\w+", parte))
+    return " ".join(f'"{t}"*' for t in tokens)
+
+_SQL_BUSCA_TEXTO_IDS = "SELECT rowid FROM militares_fts WHERE militares_fts MATCH ? LIMIT ?"
+_SQL_BUSCA_TEXTO = _SQL_SELECIONAR_MILITARES + f" WHERE id IN ({_SQL_BUSCA_TEXTO_IDS})"
+_SQL_BUSCA_LIKE_IDS = """
+    SELECT id FROM militares
+     WHERE nome LIKE ?1 ESCAPE '\\' OR nome_guerra LIKE ?1 ESCAPE '\\'
+        OR cpf LIKE ?1 ESCAPE '\\' OR prec_cp LIKE ?1 ESCAPE '\\' OR idt LIKE ?1 ESCAPE '\\'
+     LIMIT ?2
+"""
+CONSULTAS_INDEXADAS["buscar_texto"] = (_SQL_BUSCA_TEXTO, ('"silva"*', 100), "militares_fts")
+
+def _sql_busca(termo: str, limite: Optional[int], sql_fts: str, sql_like: str):
+    lim = -1 if limite is None else int(limite)
+    if _fts_disponivel():
+        consulta = _consulta_fts(termo)
+        return (sql_fts, (consulta, lim)) if consulta else (None, None)
+    t = (termo or "").strip()
+    if not t:
+        return None, None
+    return sql_like, ("%" + _prefixo_like(t), lim)
+
+def buscar_texto(termo: str, limite: Optional[int] = 100) -> List[Militar]:
+    """
+    Busca por nome, nome de guerra, CPF, PREC-CP ou IDT, sem diferenciar
+    maiúsculas nem acentos, casando o início das palavras ("joa sil" -> "JOÃO DA SILVA").
+    limite=None devolve todos. A ordem não é garantida (a tela ordena).
+    """
+    sql, params = _sql_busca(termo, limite, _SQL_BUSCA_TEXTO,
+                             _SQL_SELECIONAR_MILITARES + f" WHERE id IN ({_SQL_BUSCA_LIKE_IDS})")
+    if sql is None:
+        return []
+    return _cursor_militares().execute(sql, params).fetchall()
+
+def ids_por_texto(termo: str) -> Set[int]:
+    """Mesma busca de buscar_texto(), só os ids — para filtrar listas já carregadas na tela."""
+    sql, params = _sql_busca(termo, None, _SQL_BUSCA_TEXTO_IDS, _SQL_BUSCA_LIKE_IDS)
+    if sql is None:
+        return set()
+    return {r[0] for r in conectar().execute(sql, params)}
+
+# -------- Paginação por hierarquia (keyset) --------
+# Ordem da listagem: postos.ordem, depois nome e id (a mesma de ORDEM_HIERARQUIA).
+PAGINA_PADRAO = 200
+
+_SQL_PAGINA = (_SQL_SELECIONAR_MILITARES +
+               " WHERE posto_id = ?{filtros} {apos} ORDER BY nome COLLATE NOCASE, id LIMIT ?")
+# o primeiro termo é redundante, mas é o que o planejador usa como faixa do índice
+_SQL_APOS_CHAVE = "AND nome COLLATE NOCASE >= ? AND (nome COLLATE NOCASE, id) > (?, ?)"
+CONSULTAS_INDEXADAS["buscar_pagina"] = (
+    _SQL_PAGINA.format(filtros="", apos=_SQL_APOS_CHAVE), (1, "A", "A", 0, 200), "idx_militares_posto")
+
+def _filtros_sql(filtros: Optional[Dict]) -> Tuple[List[str], List]:
+    """
+    filtros aceitos: {"posto": "3º Sargento", "texto": "joao sil"} (ambos opcionais).
+    Retorna (condições, parâmetros) para o WHERE de militares.
+    """
+    conds, params = [], []
+    filtros = filtros or {}
+    if filtros.get("posto"):
+        conds.append("posto_id = (SELECT id FROM postos WHERE nome = ?)")
+        params.append(filtros["posto"])
+    sql_ids, p = _sql_busca(filtros.get("texto") or "", None, _SQL_BUSCA_TEXTO_IDS, _SQL_BUSCA_LIKE_IDS)
+    if sql_ids is not None:
+        conds.append(f"id IN ({sql_ids})")
+        params.extend(p)
+    return conds, params
+
+def buscar_pagina(apos_chave: Optional[Tuple] = None, limite: int = PAGINA_PADRAO,
+                  filtros: Optional[Dict] = None) -> Tuple[List[Militar], Optional[Tuple]]:
+    """
+    Uma página de militares por hierarquia e nome, sem carregar a tabela inteira.
+    apos_chave: None na primeira página; depois, a chave devolvida pela página anterior.
+    filtros: ver _filtros_sql().
+    Retorna (militares, proxima_chave); proxima_chave é None quando não há mais páginas.
+
+    A continuação é por chave (ordem, posto, nome, id), não OFFSET: cada página custa
+    o mesmo e segue pelo índice (posto_id, nome) posto a posto. Lê uma linha além do
+    limite: só há próxima chave se ela existir (a última página cheia não gera outra consulta).
+    """
+    limite = max(1, int(limite))
+    conds, params = _filtros_sql(filtros)
+    sql_filtros = "".join(" AND " + c for c in conds)
+
+    postos = conectar().execute(_SQL_POSTOS_EM_USO).fetchall()
+    if filtros and filtros.get("posto"):
+        postos = [(o, p, i) for o, p, i in postos if p == filtros["posto"]]
+    if apos_chave is not None:
+        postos = [(o, p, i) for o, p, i in postos if (o, p) >= tuple(apos_chave[:2])]
+
+    cur = _cursor_militares()
+    pagina: List[Militar] = []
+    ordem_por_posto = {}
+    for ordem, posto, posto_id in postos:
+        falta = limite + 1 - len(pagina)
+        if falta <= 0:
+            break
+        ordem_por_posto[posto] = ordem
+        if apos_chave is not None and (ordem, posto) == tuple(apos_chave[:2]):
+            sql = _SQL_PAGINA.format(filtros=sql_filtros, apos=_SQL_APOS_CHAVE)
+            args = [posto_id] + params + [apos_chave[2], apos_chave[2], apos_chave[3], falta]
+        else:
+            sql = _SQL_PAGINA.format(filtros=sql_filtros, apos="")
+            args = [posto_id] + params + [falta]
+        pagina.extend(cur.execute(sql, args).fetchall())
+
+    if len(pagina) <= limite:
+        return pagina, None
+    del pagina[limite:]
+    ultimo = pagina[-1]
+    return pagina, (ordem_por_posto[ultimo.posto], ultimo.posto, ultimo.nome, ultimo.id)
+
+def contar_militares(filtros: Optional[Dict] = None) -> int:
+    conds, params = _filtros_sql(filtros)
+    sql = "SELECT COUNT(*) FROM militares" + (" WHERE " + " AND ".join(conds) if conds else "")
+    return conectar().execute(sql, params).fetchone()[0]
+
+def contar_por_posto() -> Dict[str, int]:
+    """{posto: quantidade} dos postos em uso, na ordem hierárquica (contagem pelo índice de posto)."""
+    return dict(conectar().execute("""
+        SELECT nome, qtd FROM (
+            SELECT p.nome, p.ordem, (SELECT COUNT(*) FROM militares m WHERE m.posto_id = p.id) AS qtd
+              FROM postos p)
+         WHERE qtd > 0 ORDER BY ordem
+    """))
 
 # =========================
 # Catálogos: POSTOS e BANCOS
 # =========================
+# Hierarquia (do mais antigo ao mais moderno): nome, abreviatura (boletins, AT), sigla (P/G).
+# postos.ordem = (posição + 1) * 10; postos fora da lista entram depois de ORDEM_POSTOS_EXTRAS.
+HIERARQUIA_POSTOS = (
+    ("Capitão", "Cap.", "CAP"),
+    ("1º Tenente", "1º Ten.", "1º TEN"),
+    ("2º Tenente", "2º Ten.", "2º TEN"),
+    ("Subtenente", "Sub Ten.", "ST"),
+    ("1º Sargento", "1º Sgt", "1º SGT"),
+    ("2º Sargento", "2º Sgt", "2º SGT"),
+    ("3º Sargento", "3º Sgt", "3º SGT"),
+    ("Aspirante", "Asp.", "ASP"),
+    ("Cabo Efetivo Profissional", "Cb EP", "CB EF PROFL"),
+    ("Soldado Efetivo Profissional", "Sd EP", "SD EF PROFL"),
+    ("Soldado Efetivo Variável", "Sd EV", "SD EF VRV"),
+)
+ORDEM_POSTOS_EXTRAS = 990
+
+def dados_posto(nome: str) -> Tuple[str, Optional[int], str, str]:
+    """(nome, ordem, abreviatura, sigla) de um posto; ordem None = próxima livre após os conhecidos."""
+    for i, (conhecido, abreviatura, sigla) in enumerate(HIERARQUIA_POSTOS):
+        if nome == conhecido:
+            return nome, (i + 1) * 10, abreviatura, sigla
+    return nome, None, nome, nome.upper()
+
+_SQL_REGISTRAR_POSTO = f"""
+    INSERT OR IGNORE INTO postos (nome, ordem, abreviatura, sigla)
+    VALUES (?1, COALESCE(?2, (SELECT MAX(COALESCE(MAX(ordem), 0), {ORDEM_POSTOS_EXTRAS}) + 10 FROM postos)),
+            ?3, ?4)
+"""
+
+def registrar_posto(cur: sqlite3.Cursor, nome: str) -> bool:
+    """
+    Inclui `nome` no catálogo se ainda não estiver (militares.posto_id depende dele),
+    com soldo zerado na mesma transação. True se incluiu.
+    """
+    if nome is None:
+        return False
+    cur.execute(_SQL_REGISTRAR_POSTO, dados_posto(nome))
+    if cur.rowcount <= 0:
+        return False
+    _incluir_no_catalogo(cur, "postos", cur.lastrowid)
+    _soldo_zerado(cur, (nome,))
+    return True
+
+# -------- Cache dos catálogos --------
+# Postos e bancos ficam em memória (_em_cache): listar e testar "existe?" não vão ao
+# banco. Inclusões por esta conexão entram no catálogo já carregado, na posição certa.
+class Catalogo:
+    """
+    Nomes de um catálogo (postos ou bancos) na ordem do banco; `nome in catalogo` é O(1).
+    versao: maior row_version do catálogo (muda quando ele muda).
+    """
+    __slots__ = ("nomes", "versao", "_chaves", "_conjunto")
+
+    def __init__(self, linhas: Iterable[Tuple[str, int, int]]):
+        # linhas: (nome, chave de ordenação, row_version), já ordenadas pela chave
+        self.nomes: List[str] = []
+        self._chaves: List[int] = []
+        self.versao = 0
+        for nome, chave, versao in linhas:
+            self.nomes.append(nome)
+            self._chaves.append(chave)
+            self.versao = max(self.versao, versao or 0)
+        self._conjunto = set(self.nomes)
+
+    def __contains__(self, nome) -> bool:
+        return nome in self._conjunto
+
+    def __iter__(self):
+        return iter(self.nomes)
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def _incluir(self, nome: str, chave: int, versao: int):
+        if nome in self._conjunto:
+            return
+        i = bisect.bisect(self._chaves, chave)
+        self._chaves.insert(i, chave)
+        self.nomes.insert(i, nome)
+        self._conjunto.add(nome)
+        self.versao = max(self.versao, versao or 0)
+
+_COLUNAS_CATALOGO = {  # tabela -> (nome, chave de ordenação, row_version)
+    "postos": ("SELECT nome, ordem, row_version FROM postos", "ordem"),
+    "bancos": ("SELECT nome, id, row_version FROM bancos", "id"),
+}
+
+def _carregar_catalogo(tabela: str):
+    sql, ordem = _COLUNAS_CATALOGO[tabela]
+    return lambda con: Catalogo(con.execute(f"{sql} ORDER BY {ordem}"))
+
+def _incluir_no_catalogo(cur: sqlite3.Cursor, tabela: str, rowid: int):
+    """Acrescenta a linha recém-inserida ao catálogo em cache (se estiver carregado nesta thread)."""
+    item = (getattr(_local, "caches", None) or {}).get(tabela)
+    if item is None:
+        return  # ainda não carregado: a primeira leitura já traz a linha
+    linha = cur.execute(f"{_COLUNAS_CATALOGO[tabela][0]} WHERE id = ?", (rowid,)).fetchone()
+    if linha:
+        item[2]._incluir(*linha)
+
+def catalogo_postos() -> Catalogo:
+    """Postos em cache, na ordem hierárquica. Não altere; para uma lista própria use listar_postos()."""
+    return _em_cache("postos", _carregar_catalogo("postos"))
+
+def catalogo_bancos() -> Catalogo:
+    """Bancos em cache, na ordem de cadastro. Não altere; para uma lista própria use listar_bancos()."""
+    return _em_cache("bancos", _carregar_catalogo("bancos"))
+
 def criar_tabela_catalogos():
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS postos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT UNIQUE NOT NULL
-        )
-    """)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS bancos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT UNIQUE NOT NULL
-        )
-    """)
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS postos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT UNIQUE NOT NULL,
+                ordem INTEGER NOT NULL,         -- posição na hierarquia (ORDER BY)
+                abreviatura TEXT,
+                sigla TEXT,
+                row_version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
+        # UNIQUE e NOT NULL: é o que permite ao SQLite ordenar o JOIN com militares pelo índice
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_postos_ordem ON postos (ordem)")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS bancos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT UNIQUE NOT NULL,
+                row_version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
 
+@_repetindo_se_travado
 def inserir_posto(nome: str) -> bool:
     """
     Insere um posto novo. Retorna True se inseriu, False se já existia.
-    Também garante soldo 0.00 na tabela soldos_por_posto.
+    Também garante soldo 0.00 (ver registrar_posto()).
     """
     nome = (nome or "").strip()
-    if not nome:
+    if not nome or nome in catalogo_postos():
         return False
-    con = conectar()
-    cur = con.cursor()
-    try:
-        cur.execute("INSERT INTO postos (nome) VALUES (?)", (nome,))
-        con.commit()
-        inserted = True
-    except sqlite3.IntegrityError:
-        inserted = False
-    finally:
-        con.close()
-
-    if inserted:
-        try:
-            atualizar_soldo_posto(nome, 0.0)
-        except Exception:
-            pass
-    return inserted
+    with transacao() as cur:
+        return registrar_posto(cur, nome)
 
+@_repetindo_se_travado
 def inserir_banco(nome: str) -> bool:
     """
     Insere um banco novo. Retorna True se inseriu, False se já existia.
@@ -190,149 +1081,508 @@ def inserir_banco(nome: str) -> bool:
     nome = (nome or "").strip()
     if not nome:
         return False
-    con = conectar()
-    cur = con.cursor()
+    if nome in catalogo_bancos():
+        return False
     try:
-        cur.execute("INSERT INTO bancos (nome) VALUES (?)", (nome,))
-        con.commit()
-        inserted = True
+        with transacao() as cur:
+            cur.execute("INSERT INTO bancos (nome) VALUES (?)", (nome,))
+            _incluir_no_catalogo(cur, "bancos", cur.lastrowid)
     except sqlite3.IntegrityError:
-        inserted = False
-    finally:
-        con.close()
-    return inserted
+        return False
+    return True
 
 def listar_postos() -> List[str]:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("SELECT nome FROM postos ORDER BY id ASC")
-    rows = [r[0] for r in cur.fetchall()]
-    con.close()
-    return rows
+    """Todos os postos do catálogo, na ordem hierárquica."""
+    return list(catalogo_postos().nomes)
+
+def abreviaturas_postos() -> Dict[str, str]:
+    """{posto: abreviatura} — "Cap.", "3º Sgt", "Sd EV"..."""
+    return dict(conectar().execute("SELECT nome, COALESCE(abreviatura, nome) FROM postos"))
+
+def nomes_postos() -> Dict[int, str]:
+    """posto_id -> nome, na ordem hierárquica."""
+    return dict(conectar().execute("SELECT id, nome FROM postos ORDER BY ordem"))
+
+def siglas_postos() -> Dict[str, str]:
+    """{posto: sigla de P/G} — "CAP", "3º SGT", "SD EF VRV"..."""
+    return dict(conectar().execute("SELECT nome, COALESCE(sigla, UPPER(nome)) FROM postos"))
 
 def listar_bancos() -> List[str]:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("SELECT nome FROM bancos ORDER BY id ASC")
-    rows = [r[0] for r in cur.fetchall()]
-    con.close()
-    return rows
+    return list(catalogo_bancos().nomes)
 
 def garantir_catalogos(postos_default: List[str] = None, bancos_default: List[str] = None):
     """
     Garante que as tabelas existam e insere defaults mantendo a ordem.
     """
     criar_tabela_catalogos()
-    con = conectar()
-    cur = con.cursor()
-
-    if postos_default:
-        for p in postos_default:
-            try:
-                cur.execute("INSERT OR IGNORE INTO postos (nome) VALUES (?)", (p,))
-            except Exception:
-                pass
-
-    if bancos_default:
-        for b in bancos_default:
-            try:
-                cur.execute("INSERT OR IGNORE INTO bancos (nome) VALUES (?)", (b,))
-            except Exception:
-                pass
-
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        if postos_default:
+            cur.executemany(_SQL_REGISTRAR_POSTO, [dados_posto(p) for p in postos_default])
+            _soldo_zerado(cur, postos_default)
+        if bancos_default:
+            cur.executemany("INSERT OR IGNORE INTO bancos (nome) VALUES (?)",
+                            [(b,) for b in bancos_default])
+        _invalidar_cache("postos", "bancos")
 
 # =========================
 # SOLDOS POR POSTO
 # =========================
 def criar_tabela_soldos_por_posto():
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS soldos_por_posto (
-            posto TEXT PRIMARY KEY,
-            soldo REAL NOT NULL DEFAULT 0
-        )
-    """)
-    con.commit()
-    con.close()
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS soldos_por_posto (
+                posto TEXT PRIMARY KEY,
+                soldo REAL NOT NULL DEFAULT 0,
+                row_version INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+        """)
+
+# Histórico: cada valor de soldo vale a partir de vigencia_inicio (ISO) até a próxima
+# vigência do mesmo posto. A chave primária (posto, vigencia_inicio) é o índice da
+# consulta "soldo em D". soldos_por_posto guarda o valor vigente hoje e serve de
+# reserva para postos sem histórico até a data pedida.
+VIGENCIA_INICIAL = "1900-01-01"  # valores anteriores ao histórico: valem desde sempre
+
+def criar_tabela_soldos_historico():
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS soldos_historico (
+                posto TEXT NOT NULL,
+                vigencia_inicio TEXT NOT NULL,
+                soldo REAL NOT NULL,
+                PRIMARY KEY (posto, vigencia_inicio)
+            ) WITHOUT ROWID
+        """)
+
+# só para posto sem soldo gravado: um soldo que já existe abre o histórico com o próprio valor
+_SQL_HISTORICO_ZERADO = """
+    INSERT OR IGNORE INTO soldos_historico (posto, vigencia_inicio, soldo)
+    SELECT ?1, ?2, 0 WHERE NOT EXISTS (SELECT 1 FROM soldos_por_posto WHERE posto = ?1)
+"""
+
+def _soldo_zerado(cur: sqlite3.Cursor, postos: Iterable[str]):
+    """
+    Soldo 0 (vigente e abrindo o histórico) para os postos que ainda não têm, na
+    transação de `cur`: todo posto do catálogo tem soldo, venha de onde vier.
+    Posto que já tem soldo não é tocado.
+    """
+    postos = list(postos)
+    cur.executemany(_SQL_HISTORICO_ZERADO, [(p, VIGENCIA_INICIAL) for p in postos])
+    cur.executemany("INSERT OR IGNORE INTO soldos_por_posto (posto, soldo) VALUES (?, 0)",
+                    [(p,) for p in postos])
+    _invalidar_cache("soldos", "soldos_em")
+
+_SQL_HISTORICO_INICIAL = """
+    INSERT OR IGNORE INTO soldos_historico (posto, vigencia_inicio, soldo)
+    SELECT posto, ?, soldo FROM soldos_por_posto
+"""
+_SQL_SOLDO_EM = """
+    SELECT soldo FROM soldos_historico
+     WHERE posto = ? AND vigencia_inicio <= ? ORDER BY vigencia_inicio DESC LIMIT 1
+"""
+# uma linha por posto: com MAX(), o SQLite devolve o soldo da linha de maior vigência
+_SQL_SOLDOS_EM = """
+    SELECT posto, soldo, MAX(vigencia_inicio) FROM soldos_historico
+     WHERE vigencia_inicio <= ? GROUP BY posto
+"""
+CONSULTAS_INDEXADAS["atualizar_soldo_posto(vigente)"] = (_SQL_SOLDO_EM, ("Capitão", "2025-06-05"), "PRIMARY KEY")
+
+def _data_vigencia(valor) -> str:
+    """date, "dd/mm/aaaa" ou ISO -> "AAAA-MM-DD"; ValueError se não for uma data válida."""
+    iso = data_iso(valor)
+    try:
+        return date.fromisoformat(iso).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"Data inválida: {valor!r}") from None
+
+def _carregar_soldos(con: sqlite3.Connection) -> Dict[str, float]:
+    cur = con.execute("SELECT posto, soldo FROM soldos_por_posto")
+    return {p: float(s if s is not None else 0.0) for p, s in cur.fetchall()}
+
+def _soldos_em(iso: str) -> Dict[str, float]:
+    # resultado por data guardado até a próxima gravação (a tela de gratificação
+    # pergunta de novo a cada tecla no campo de data)
+    por_data = _em_cache("soldos_em", lambda con: {})
+    soldos = por_data.get(iso)
+    if soldos is None:
+        soldos = dict(_em_cache("soldos", _carregar_soldos))
+        soldos.update((p, float(s)) for p, s, _vig in conectar().execute(_SQL_SOLDOS_EM, (iso,)))
+        por_data[iso] = soldos
+    return soldos
+
+def obter_soldos_em(data) -> Dict[str, float]:
+    """
+    posto -> soldo vigente em `data` (date, "dd/mm/aaaa" ou ISO), numa consulta só
+    ao histórico. Posto sem vigência até a data: valor de soldos_por_posto.
+    ValueError se a data for inválida.
+    """
+    return dict(_soldos_em(_data_vigencia(data)))
+
+def obter_soldo_em(posto: str, data) -> float:
+    """Soldo do posto vigente em `data` (ver obter_soldos_em())."""
+    return _soldos_em(_data_vigencia(data)).get(posto, 0.0)
 
 def obter_soldo_por_posto(posto: str) -> float:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("SELECT soldo FROM soldos_por_posto WHERE posto = ?", (posto,))
-    row = cur.fetchone()
-    con.close()
-    return float(row[0]) if row and row[0] is not None else 0.0
+    """Soldo vigente hoje (0.0 se não cadastrado), lido do cache: sem consulta à tabela por linha."""
+    return _soldos_em(date.today().isoformat()).get(posto, 0.0)
 
 def obter_soldos_dict() -> Dict[str, float]:
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("SELECT posto, soldo FROM soldos_por_posto")
-    data = {p: float(s if s is not None else 0.0) for p, s in cur.fetchall()}
-    con.close()
-    return data
+    """posto -> soldo vigente hoje."""
+    return dict(_soldos_em(date.today().isoformat()))
+
+def historico_soldos(posto: str) -> List[Tuple[str, float]]:
+    """[(vigencia_inicio, soldo)] do posto, da vigência mais antiga para a mais recente."""
+    cur = conectar().execute(
+        "SELECT vigencia_inicio, soldo FROM soldos_historico WHERE posto = ? ORDER BY vigencia_inicio",
+        (posto,))
+    return [(v, float(s)) for v, s in cur.fetchall()]
 
-def atualizar_soldo_posto(posto: str, soldo: float) -> bool:
+@_repetindo_se_travado
+def atualizar_soldo_posto(posto: str, soldo: float, vigencia=None) -> bool:
     """
-    Upsert do soldo por posto.
+    Grava o soldo do posto a partir de `vigencia` (data; padrão: hoje) — substitui o valor
+    se já houver essa mesma vigência — e põe em soldos_por_posto o valor vigente hoje.
+    Vigências futuras ficam no histórico e passam a valer sozinhas na data.
     Requer SQLite 3.24+ (disponível nas versões recentes do Python).
     """
-    con = conectar()
-    cur = con.cursor()
-    cur.execute("""
-        INSERT INTO soldos_por_posto (posto, soldo)
-        VALUES (?, ?)
-        ON CONFLICT(posto) DO UPDATE SET soldo = excluded.soldo
-    """, (posto, float(soldo)))
-    con.commit()
-    ok = cur.rowcount > 0
-    con.close()
-    return ok
+    vigencia = _data_vigencia(vigencia or date.today())
+    with transacao() as cur:
+        # posto ainda sem histórico: o valor atual passa a valer até a nova vigência
+        cur.execute(_SQL_HISTORICO_INICIAL + " WHERE posto = ?", (VIGENCIA_INICIAL, posto))
+        cur.execute("""
+            INSERT INTO soldos_historico (posto, vigencia_inicio, soldo)
+            VALUES (?, ?, ?)
+            ON CONFLICT(posto, vigencia_inicio) DO UPDATE SET soldo = excluded.soldo
+        """, (posto, vigencia, float(soldo)))
+        vigente = cur.execute(_SQL_SOLDO_EM, (posto, date.today().isoformat())).fetchone()
+        cur.execute("""
+            INSERT INTO soldos_por_posto (posto, soldo)
+            VALUES (?, ?)
+            ON CONFLICT(posto) DO UPDATE SET soldo = excluded.soldo
+        """, (posto, vigente[0] if vigente else 0.0))
+        _invalidar_cache("soldos", "soldos_em")
+        return cur.rowcount > 0
 
 def garantir_soldos_para_postos(postos_lista: List[str] = None):
     criar_tabela_soldos_por_posto()
+    criar_tabela_soldos_historico()
     if postos_lista is None:
         try:
             postos_lista = listar_postos()
         except Exception:
             postos_lista = []
+    with transacao() as cur:
+        cur.executemany("INSERT OR IGNORE INTO soldos_por_posto (posto, soldo) VALUES (?, 0)",
+                        [(p,) for p in postos_lista])
+        cur.execute(_SQL_HISTORICO_INICIAL, (VIGENCIA_INICIAL,))
+        _invalidar_cache("soldos", "soldos_em")
+
+# =========================
+# Controle de versão (alterações)
+# =========================
+# versao_dados guarda um contador global; a cada INSERT/UPDATE as triggers somam 1 e
+# carimbam a linha com row_version/updated_at; DELETE vai para exclusoes com a versão.
+# Quem guardou versao_atual() ao carregar pode pedir só o que mudou depois dela.
+TABELAS_VERSIONADAS = {  # tabela -> chave exposta em exclusoes
+    "militares": "id",
+    "postos": "nome",
+    "bancos": "nome",
+    "soldos_por_posto": "posto",
+}
+
+_SQL_PROXIMA_VERSAO = "UPDATE versao_dados SET versao = versao + 1"
+
+def _ddl_triggers_versao(tabela: str, chave: str) -> Tuple[str, str, str]:
+    carimbo = f"""
+        {_SQL_PROXIMA_VERSAO};
+        UPDATE {tabela} SET row_version = (SELECT versao FROM versao_dados), updated_at = datetime('now')
+         WHERE rowid = new.rowid;
+    """
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {tabela}_versao_ai AFTER INSERT ON {tabela} BEGIN {carimbo} END",
+        # o WHEN evita que o próprio carimbo dispare a trigger de novo
+        f"CREATE TRIGGER IF NOT EXISTS {tabela}_versao_au AFTER UPDATE ON {tabela} "
+        f"WHEN new.row_version = old.row_version BEGIN {carimbo} END",
+        f"""CREATE TRIGGER IF NOT EXISTS {tabela}_versao_ad AFTER DELETE ON {tabela} BEGIN
+            {_SQL_PROXIMA_VERSAO};
+            INSERT INTO exclusoes (row_version, tabela, chave, excluido_em)
+            VALUES ((SELECT versao FROM versao_dados), '{tabela}', old.{chave}, datetime('now'));
+        END""",
+    )
+
+def criar_controle_versao():
+    """Contador, tabela de exclusões e triggers de versão (depois das tabelas versionadas)."""
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS versao_dados (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                versao INTEGER NOT NULL
+            )
+        """)
+        cur.execute("INSERT OR IGNORE INTO versao_dados (id, versao) VALUES (1, 0)")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS exclusoes (
+                row_version INTEGER PRIMARY KEY,
+                tabela TEXT NOT NULL,
+                chave NOT NULL,
+                excluido_em TEXT
+            )
+        """)
+        for tabela, chave in TABELAS_VERSIONADAS.items():
+            for ddl in _ddl_triggers_versao(tabela, chave):
+                cur.execute(ddl)
+
+def versao_atual() -> int:
+    """
+    Versão global dos dados (cresce a cada gravação). Barata para chamar a todo refresh:
+    enquanto PRAGMA data_version (gravações de outras conexões) e total_changes
+    (gravações desta) não mudam, devolve o valor guardado sem ler a tabela.
+    """
     con = conectar()
-    cur = con.cursor()
-    for p in postos_lista:
-        cur.execute("INSERT OR IGNORE INTO soldos_por_posto (posto, soldo) VALUES (?, 0)", (p,))
-    con.commit()
-    con.close()
+    marca = (con.execute("PRAGMA data_version").fetchone()[0], con.total_changes)
+    guardada = getattr(_local, "versao", None)
+    if guardada is not None and guardada[0] == marca and guardada[2] is con:
+        return guardada[1]
+    versao = con.execute("SELECT versao FROM versao_dados").fetchone()[0]
+    _local.versao = (marca, versao, con)
+    return versao
+
+_SQL_ALTERADOS_DESDE = _SQL_SELECIONAR_MILITARES + " WHERE row_version > ? ORDER BY row_version"
+CONSULTAS_INDEXADAS["buscar_alterados_desde"] = (_SQL_ALTERADOS_DESDE, (0,), "idx_militares_row_version")
+
+def buscar_alterados_desde(versao: int) -> Tuple[List[Militar], List[int], int]:
+    """
+    Militares gravados e excluídos depois de `versao` (um valor de versao_atual()).
+    Retorna (alterados, ids_excluidos, versao_nova) — guarde versao_nova para a próxima chamada.
+    """
+    with transacao(leitura=True) as cur:  # leitura consistente: as três consultas veem o mesmo estado
+        nova = cur.execute("SELECT versao FROM versao_dados").fetchone()[0]
+        cur_m = _cursor_militares()
+        alterados = cur_m.execute(_SQL_ALTERADOS_DESDE, (versao,)).fetchall()
+        excluidos = [r[0] for r in cur.execute(
+            "SELECT chave FROM exclusoes WHERE row_version > ? AND tabela = 'militares'", (versao,))]
+    return alterados, excluidos, nova
+
+def tabelas_alteradas_desde(versao: int) -> Set[str]:
+    """Quais de TABELAS_VERSIONADAS tiveram gravação ou exclusão depois de `versao`."""
+    con = conectar()
+    alteradas = {r[0] for r in con.execute(
+        "SELECT DISTINCT tabela FROM exclusoes WHERE row_version > ?", (versao,))}
+    for tabela in TABELAS_VERSIONADAS:
+        if tabela not in alteradas and con.execute(
+                f"SELECT 1 FROM {tabela} WHERE row_version > ? LIMIT 1", (versao,)).fetchone():
+            alteradas.add(tabela)
+    return alteradas
+
+# =========================
+# Auditoria
+# =========================
+# Quem mudou o quê: as gravações de militares anotam as diferenças por coluna e
+# database/auditoria.py as grava em lotes, numa thread própria, depois do commit.
+# A tabela só aceita inclusões e não referencia militares (o histórico sobrevive à
+# exclusão).
+def criar_tabela_auditoria():
+    with transacao() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS auditoria (
+                id INTEGER PRIMARY KEY,
+                militar_id INTEGER NOT NULL,
+                quando TEXT NOT NULL,
+                usuario TEXT,
+                operacao TEXT NOT NULL,
+                coluna TEXT,
+                valor_antigo,
+                valor_novo
+            )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_auditoria_militar ON auditoria (militar_id, quando)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_auditoria_quando ON auditoria (quando)")
+        for operacao in ("UPDATE", "DELETE"):
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS auditoria_sem_{operacao.lower()} BEFORE {operacao} ON auditoria
+                BEGIN SELECT RAISE(ABORT, 'auditoria só aceita inclusões'); END
+            """)
+
+_SQL_GRAVAR_AUDITORIA = """
+    INSERT INTO auditoria (militar_id, quando, usuario, operacao, coluna, valor_antigo, valor_novo)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+@_repetindo_se_travado
+def _gravar_auditoria(linhas: List[Tuple]):
+    with transacao() as cur:
+        cur.executemany(_SQL_GRAVAR_AUDITORIA, linhas)
+
+auditoria.configurar(_gravar_auditoria)
+
+_SQL_AUDITORIA = "SELECT id, militar_id, quando, usuario, operacao, coluna, valor_antigo, valor_novo FROM auditoria"
+_ORDEM_AUDITORIA = " ORDER BY quando DESC, id DESC LIMIT ?"  # mais recente primeiro
+_SQL_HISTORICO_MILITAR = _SQL_AUDITORIA + " WHERE militar_id = ?" + _ORDEM_AUDITORIA
+_SQL_AUDITORIA_PERIODO = _SQL_AUDITORIA + " WHERE quando BETWEEN ? AND ?"
+CONSULTAS_INDEXADAS["historico_militar"] = (_SQL_HISTORICO_MILITAR, (1, 200), "idx_auditoria_militar")
+CONSULTAS_INDEXADAS["buscar_auditoria"] = (_SQL_AUDITORIA_PERIODO + _ORDEM_AUDITORIA,
+                                           ("2024-01", "9999", 500), "idx_auditoria_quando")
+
+def _registros_auditoria(sql: str, params: Tuple) -> List[RegistroAuditoria]:
+    auditoria.descarregar()  # o que ainda está na fila também aparece
+    return [RegistroAuditoria(*r) for r in conectar().execute(sql, params)]
+
+def historico_militar(id_militar: int, limite: Optional[int] = 200) -> List[RegistroAuditoria]:
+    """Alterações do militar, da mais recente para a mais antiga (índice idx_auditoria_militar)."""
+    return _registros_auditoria(_SQL_HISTORICO_MILITAR, (id_militar, -1 if limite is None else limite))
+
+def buscar_auditoria(inicio: str = "", fim: str = "9999", coluna: Optional[str] = None,
+                     usuario: Optional[str] = None, limite: Optional[int] = 500) -> List[RegistroAuditoria]:
+    """
+    Alterações de todos os militares entre inicio e fim ("AAAA-MM-DD[ HH:MM...]", como
+    em auditoria.quando), da mais recente para a mais antiga; coluna/usuario filtram.
+    Ex.: quem mexeu em contas bancárias este mês: buscar_auditoria("2024-05", coluna="conta").
+    """
+    sql, params = _SQL_AUDITORIA_PERIODO, [inicio, fim]
+    if coluna is not None:
+        sql += " AND coluna = ?"
+        params.append(coluna)
+    if usuario is not None:
+        sql += " AND usuario = ?"
+        params.append(usuario)
+    params.append(-1 if limite is None else limite)
+    return _registros_auditoria(sql + _ORDEM_AUDITORIA, tuple(params))
+
+# =========================
+# Backup
+# =========================
+# Cópia com o app aberto: uma conexão própria abre uma transação de leitura — no WAL
+# isso fixa um retrato do banco sem bloquear quem grava — e copia as páginas em
+# passos (Connection.backup). Como o retrato não muda, a cópia nunca recomeça;
+# o que for gravado durante ela entra no próximo backup.
+PASTA_BACKUPS = "backups"
+BACKUPS_MANTIDOS = 10
+PAGINAS_POR_PASSO = 256
+
+def pasta_backups() -> str:
+    """backups/ ao lado do arquivo do banco (CONFIG.pasta)."""
+    return os.path.join(CONFIG.pasta, PASTA_BACKUPS)
+
+def _nome_backup(pasta: str) -> str:
+    base = CONFIG.nome_base
+    nome = os.path.join(pasta, f"{base}-{time.strftime('%Y%m%d-%H%M%S')}.db")
+    n = 1
+    while os.path.exists(nome):
+        n += 1
+        nome = os.path.join(pasta, f"{base}-{time.strftime('%Y%m%d-%H%M%S')}-{n}.db")
+    return nome
+
+def _rotacionar_backups(pasta: str, manter: int) -> List[str]:
+    """Apaga os backups gerados mais antigos da pasta, deixando os `manter` mais recentes."""
+    base = re.escape(CONFIG.nome_base)
+    padrao = re.compile(rf"^{base}-\d{{8}}-\d{{6}}(-\d+)?\.db$")
+    gerados = sorted((os.path.join(pasta, f) for f in os.listdir(pasta) if padrao.match(f)),
+                     key=lambda c: (os.path.getmtime(c), c))
+    apagados = gerados[:max(0, len(gerados) - max(1, manter))]
+    for caminho in apagados:
+        os.remove(caminho)
+    return apagados
+
+def backup(destino: Optional[str] = None, paginas_por_passo: int = PAGINAS_POR_PASSO,
+           progresso: Optional[Callable[[int, int], None]] = None,
+           manter: Optional[int] = BACKUPS_MANTIDOS) -> str:
+    """
+    Copia o banco para `destino` (pode ser chamado com o app gravando). Retorna o arquivo gravado.
+    destino: arquivo, ou pasta (nome com data/hora dentro dela); None = pasta_backups().
+    progresso(copiadas, total): páginas, a cada passo, na thread que chamou.
+    manter: com nome gerado, deixa só os `manter` backups mais recentes da pasta (None = todos).
+    O arquivo só aparece completo no destino (a cópia é feita num .tmp ao lado).
+    """
+    gerado = destino is None or os.path.isdir(destino)
+    if gerado:
+        pasta = destino or pasta_backups()
+        os.makedirs(pasta, exist_ok=True)
+        destino = _nome_backup(pasta)
+    temporario = destino + ".tmp"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+
+    def _passo(_status, restantes, total):
+        progresso(total - restantes, total)
+
+    origem = CONFIG.conectar(isolation_level=None)
+    try:
+        origem.execute("BEGIN")
+        origem.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # abre a leitura: fixa o retrato
+        copia = sqlite3.connect(temporario)
+        try:
+            origem.backup(copia, pages=max(1, int(paginas_por_passo)),
+                          progress=_passo if progresso else None)
+            copia.execute("PRAGMA journal_mode = DELETE")  # arquivo único, sem -wal/-shm
+        finally:
+            copia.close()
+        origem.rollback()
+        os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        origem.close()
+    if gerado and manter is not None:
+        _rotacionar_backups(os.path.dirname(destino), manter)
+    return destino
 
 # =========================
 # INIT ÚNICO
 # =========================
-def init(postos_default: List[str] = None, bancos_default: List[str] = None):
+POSTOS_PADRAO = (
+    "Capitão", "1º Tenente", "2º Tenente", "Subtenente",
+    "1º Sargento", "2º Sargento", "3º Sargento",
+    "Cabo Efetivo Profissional", "Soldado Efetivo Profissional", "Soldado Efetivo Variável",
+)
+BANCOS_PADRAO = (
+    "001 - Banco do Brasil S.A", "341 - Itaú Unibanco S.A",
+    "033 - Banco Santander (Brasil) S.A", "237 - Banco Bradesco S.A",
+    "104 - Caixa Econômica Federal",
+)
+
+def _criar_esquema(cur: sqlite3.Cursor, postos_default, bancos_default):
+    # roda dentro da transação de migracoes.migrar(): cada criar_* participa dela
+    criar_tabela_catalogos()  # militares.posto_id referencia postos
+    criar_tabela_militares()
+    criar_indices()
+    criar_busca_texto()
+    criar_tabela_soldos_por_posto()
+    criar_tabela_soldos_historico()
+    criar_controle_versao()
+    criar_tabela_auditoria()
+    # os soldos gravados abrem o histórico antes de qualquer soldo zerado
+    cur.execute(_SQL_HISTORICO_INICIAL, (VIGENCIA_INICIAL,))
+    garantir_catalogos(postos_default or POSTOS_PADRAO, bancos_default or BANCOS_PADRAO)
+    # postos que já estavam no catálogo sem soldo
+    _soldo_zerado(cur, [nome for (nome,) in cur.execute("SELECT nome FROM postos").fetchall()])
+
+def init(postos_default: List[str] = None, bancos_default: List[str] = None) -> bool:
     """
     Chame no início do app:
         from database.db import init
         init(postos_default=[...], bancos_default=[...])
+    Base já na versão atual (PRAGMA user_version): só essa leitura.
+    Senão, migrações, tabelas, índices, triggers e dados iniciais numa transação só
+    (tudo ou nada; repetir é inofensivo). Os defaults só valem nesse caso.
+    Retorna True se criou/atualizou o esquema.
     """
-    criar_tabela_militares()
-    criar_tabela_catalogos()
-    criar_tabela_soldos_por_posto()
-
-    try:
-        garantir_catalogos(postos_default or [
-            "Capitão", "1º Tenente", "2º Tenente", "Subtenente",
-            "1º Sargento", "2º Sargento", "3º Sargento",
-            "Cabo Efetivo Profissional", "Soldado Efetivo Profissional", "Soldado Efetivo Variável"
-        ], bancos_default or [
-            "001 - Banco do Brasil S.A", "341 - Itaú Unibanco S.A",
-            "033 - Banco Santander (Brasil) S.A", "237 - Banco Bradesco S.A",
-            "104 - Caixa Econômica Federal"
-        ])
-    except Exception:
-        pass
-
-    # garantir soldos zerados para todos os postos existentes
+    global FTS_DISPONIVEL
+    con = conectar()
+    if migracoes.versao(con) >= migracoes.VERSAO_ATUAL:
+        return False
     try:
-        garantir_soldos_para_postos(listar_postos())
-    except Exception:
-        pass
+        # bases antigas: backup + conversão (ver migracoes.py)
+        migracoes.migrar(con, CONFIG.caminho, lambda cur: _criar_esquema(cur, postos_default, bancos_default))
+    except BaseException:
+        FTS_DISPONIVEL = None  # criar_busca_texto() pode ter marcado algo que foi desfeito
+        raise
+    finally:
+        _invalidar_cache()
+    return True
+
+# Medição opcional (database/diagnostico.py): troca as funções públicas deste módulo
+# por versões que contam chamadas, tempo e linhas quando a medição está ligada.
+diagnostico.instrumentar(globals(), __name__, excluir=("conectar", "fechar_conexao", "transacao"))
@@ -0,0 +1,201 @@
+# database/diagnostico.py
+# Medição opcional da camada de banco: quantas vezes cada função pública de db.py
+# foi chamada, quanto tempo levou (total e percentis), quantas linhas devolveu e
+# quais instruções SQL executou (via Connection.set_trace_callback).
+#
+# Desligado por padrão; o custo com a medição desligada é um teste de flag por chamada.
+#     from database import diagnostico
+#     diagnostico.ativar()
+#     ...                                  # usar as telas
+#     diagnostico.exportar_json("diag.json")
+#     diagnostico.zerar()
+# Também liga com a variável de ambiente CADASTRO_DIAGNOSTICO=1.
+
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+AMOSTRAS_POR_FUNCAO = 5000  # latências guardadas por função (percentis sobre as mais recentes)
+SQL_POR_FUNCAO = 50         # instruções distintas guardadas por função
+
+ATIVO = os.environ.get("CADASTRO_DIAGNOSTICO", "") not in ("", "0")
+
+_trava = threading.Lock()
+_local = threading.local()
+_conexoes = set()  # conexões abertas por db.py (sqlite3.Connection não aceita weakref)
+_funcoes: Dict[str, dict] = {}
+_sql: Dict[str, int] = {}
+
+def _nova_entrada() -> dict:
+    return {"chamadas": 0, "erros": 0, "total": 0.0, "max": 0.0, "linhas": 0,
+            "amostras": deque(maxlen=AMOSTRAS_POR_FUNCAO), "sql": {}}
+
+# =========================
+# Liga/desliga
+# =========================
+def ativar():
+    global ATIVO
+    ATIVO = True
+    for con in list(_conexoes):
+        _ligar_trace(con)
+
+def desativar():
+    global ATIVO
+    ATIVO = False
+    for con in list(_conexoes):
+        try:
+            con.set_trace_callback(None)
+        except Exception:  # conexão já fechada
+            _conexoes.discard(con)
+
+def zerar():
+    """Apaga os contadores (para medir um cenário de cada vez)."""
+    with _trava:
+        _funcoes.clear()
+        _sql.clear()
+
+def registrar_conexao(con):
+    """Chamado por db._abrir_conexao(): a conexão passa a ser rastreada quando a medição ligar."""
+    _conexoes.add(con)
+    if ATIVO:
+        _ligar_trace(con)
+
+def esquecer_conexao(con):
+    """Chamado por db.fechar_conexao()."""
+    _conexoes.discard(con)
+
+# =========================
+# SQL (trace callback)
+# =========================
+_RE_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_RE_ESPACOS = re.compile(r"\s+")
+
+def _normalizar_sql(sql: str) -> str:
+    # o trace recebe a instrução com os parâmetros já expandidos: volta a "?"
+    return _RE_ESPACOS.sub(" ", _RE_LITERAIS.sub("?", sql)).strip()
+
+def _ao_executar(sql: str):
+    texto = _normalizar_sql(sql)
+    funcao = getattr(_local, "pilha", None)
+    with _trava:
+        _sql[texto] = _sql.get(texto, 0) + 1
+        if funcao:
+            por_funcao = _funcoes.setdefault(funcao[-1], _nova_entrada())["sql"]
+            if texto in por_funcao or len(por_funcao) < SQL_POR_FUNCAO:
+                por_funcao[texto] = por_funcao.get(texto, 0) + 1
+
+def _ligar_trace(con):
+    try:
+        con.set_trace_callback(_ao_executar)
+    except Exception:  # conexão já fechada
+        _conexoes.discard(con)
+
+# =========================
+# Tempo por função
+# =========================
+def _linhas(resultado) -> int:
+    if isinstance(resultado, (list, set, frozenset, dict)):
+        return len(resultado)
+    if isinstance(resultado, tuple) and resultado and isinstance(resultado[0], list):
+        return len(resultado[0])  # (registros, chave/erros...)
+    return 0
+
+def medir(nome: str, fn: Callable) -> Callable:
+    """Envolve `fn`: com a medição ligada, registra tempo, linhas e erros sob `nome`."""
+    @functools.wraps(fn)
+    def medida(*args, **kwargs):
+        if not ATIVO:
+            return fn(*args, **kwargs)
+        pilha = getattr(_local, "pilha", None)
+        if pilha is None:
+            pilha = _local.pilha = []
+        pilha.append(nome)
+        t0 = time.perf_counter()
+        erro = False
+        resultado = None
+        try:
+            resultado = fn(*args, **kwargs)
+            return resultado
+        except BaseException:
+            erro = True
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            pilha.pop()
+            with _trava:
+                e = _funcoes.setdefault(nome, _nova_entrada())
+                e["chamadas"] += 1
+                e["erros"] += erro
+                e["total"] += dt
+                e["max"] = max(e["max"], dt)
+                e["linhas"] += _linhas(resultado)
+                e["amostras"].append(dt)
+    medida.__wrapped_diagnostico__ = True
+    return medida
+
+def instrumentar(namespace: dict, modulo: str, excluir: Iterable[str] = ()):
+    """Troca, em `namespace`, cada função pública definida em `modulo` pela versão medida."""
+    excluir = set(excluir)
+    for nome, obj in list(namespace.items()):
+        if (nome.startswith("_") or nome in excluir or not callable(obj) or isinstance(obj, type)
+                or getattr(obj, "__module__", None) != modulo
+                or getattr(obj, "__wrapped_diagnostico__", False)):
+            continue
+        namespace[nome] = medir(nome, obj)
+
+# =========================
+# Leitura / exportação
+# =========================
+def _percentil(ordenadas: List[float], p: float) -> float:
+    if not ordenadas:
+        return 0.0
+    i = min(len(ordenadas) - 1, max(0, int(round(p / 100.0 * (len(ordenadas) - 1)))))
+    return ordenadas[i]
+
+def estatisticas() -> Dict[str, dict]:
+    """
+    {função: {chamadas, erros, total_ms, media_ms, p50_ms, p95_ms, p99_ms, max_ms, linhas, sql}},
+    da que mais consumiu tempo para a que menos. sql: {instrução: execuções}.
+    """
+    with _trava:
+        copia = {n: dict(e, amostras=sorted(e["amostras"]), sql=dict(e["sql"])) for n, e in _funcoes.items()}
+    res = {}
+    for nome, e in sorted(copia.items(), key=lambda kv: -kv[1]["total"]):
+        a = e["amostras"]
+        res[nome] = {
+            "chamadas": e["chamadas"],
+            "erros": e["erros"],
+            "total_ms": round(e["total"] * 1e3, 3),
+            "media_ms": round(e["total"] * 1e3 / e["chamadas"], 3) if e["chamadas"] else 0.0,
+            "p50_ms": round(_percentil(a, 50) * 1e3, 3),
+            "p95_ms": round(_percentil(a, 95) * 1e3, 3),
+            "p99_ms": round(_percentil(a, 99) * 1e3, 3),
+            "max_ms": round(e["max"] * 1e3, 3),
+            "linhas": e["linhas"],
+            "sql": dict(sorted(e["sql"].items(), key=lambda kv: -kv[1])),
+        }
+    return res
+
+def instrucoes_sql() -> Dict[str, int]:
+    """{instrução normalizada: execuções} de todas as conexões rastreadas."""
+    with _trava:
+        return dict(sorted(_sql.items(), key=lambda kv: -kv[1]))
+
+def exportar_json(caminho: Optional[str] = None) -> str:
+    """Grava (ou só devolve, se caminho=None) o JSON com funções e instruções SQL."""
+    dados = {
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ativo": ATIVO,
+        "funcoes": estatisticas(),
+        "sql": instrucoes_sql(),
+    }
+    texto = json.dumps(dados, ensure_ascii=False, indent=2)
+    if caminho:
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(texto)
+    return texto
@@ -0,0 +1,42 @@
+# database/executor.py
+# Uma thread só para o banco: as telas enviam funções de db.py para cá e recebem
+# um Future, em vez de esperar a consulta na thread do Tk (que congela a janela).
+#
+#     from database.executor import enviar
+#     fut = enviar(buscar_pagina, None, 200, filtros)
+#     ...
+#     pagina, chave = fut.result()
+#
+# A thread tem a própria conexão (db.conectar() é por thread) e roda os trabalhos
+# em ordem de chegada. Nas telas Tk use interface/tarefas.py, que devolve o
+# resultado na thread do Tk.
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from database import db
+
+_trava = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+def executor() -> ThreadPoolExecutor:
+    """O executor do banco (criado na primeira chamada)."""
+    global _executor
+    with _trava:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banco")
+        return _executor
+
+def enviar(fn: Callable, *args, **kwargs) -> Future:
+    """Agenda fn(*args, **kwargs) na thread do banco. Exceções vão para o Future."""
+    return executor().submit(fn, *args, **kwargs)
+
+def encerrar(esperar: bool = True):
+    """Fecha a conexão da thread do banco e encerra o executor (o próximo enviar() recria)."""
+    global _executor
+    with _trava:
+        ex, _executor = _executor, None
+    if ex is not None:
+        ex.submit(db.fechar_conexao)
+        ex.shutdown(wait=esperar)
@@ -0,0 +1,145 @@
+# database/fotos.py
+# Acervo de fotos gerenciado pelo sistema, ao lado do banco:
+#     fotos/<2 primeiros hex>/<sha256>.<ext>        original (cópia)
+#     fotos/<2 primeiros hex>/<sha256>_<px>.png     miniaturas de TAMANHOS_MINIATURA
+#
+# militares.foto guarda só a chave ("<sha256>.<ext>"): a mesma imagem escolhida
+# para vários militares (ou duas vezes) vira um arquivo só. As miniaturas são
+# geradas uma vez, ao guardar a foto; as telas leem só o PNG pequeno (tk.PhotoImage),
+# sem abrir nem redimensionar o original.
+#
+#     chave = fotos.guardar("C:/Users/.../joao.jpg")
+#     png = fotos.miniatura(chave, 260)     # caminho do PNG ou None
+#
+# Valores antigos (um caminho qualquer na coluna foto) continuam funcionando:
+# miniatura() guarda o arquivo no acervo na primeira vez que ele é exibido.
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from database import db
+
+PASTA_FOTOS = "fotos"
+TAMANHOS_MINIATURA = (260, 280, 320, 340)  # prévia da lista, cadastro, carteira, edição
+EXTENSOES = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+_RE_CHAVE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+_trava = threading.Lock()
+_importadas: Dict[Tuple[str, int, int], str] = {}  # (caminho antigo, mtime, tamanho) -> chave
+
+def pasta_fotos() -> str:
+    """Pasta do acervo: fotos/ ao lado do arquivo do banco (db.CONFIG.pasta)."""
+    return os.path.join(db.CONFIG.pasta, PASTA_FOTOS)
+
+def eh_chave(valor: Optional[str]) -> bool:
+    """True se `valor` é uma chave do acervo (e não um caminho antigo)."""
+    return bool(valor) and _RE_CHAVE.match(valor) is not None
+
+def caminho_original(chave: str) -> str:
+    return os.path.join(pasta_fotos(), chave[:2], chave)
+
+def caminho_miniatura(chave: str, tamanho: int) -> str:
+    if tamanho not in TAMANHOS_MINIATURA:
+        raise ValueError(f"Tamanho de miniatura não suportado: {tamanho} (use {TAMANHOS_MINIATURA})")
+    return os.path.join(pasta_fotos(), chave[:2], f"{chave.split('.')[0]}_{tamanho}.png")
+
+def _sha256(caminho: str) -> str:
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _gravar_atomico(destino: str, escrever):
+    # arquivo temporário na mesma pasta + os.replace: outra estação nunca vê um arquivo pela metade
+    pasta = os.path.dirname(destino)
+    os.makedirs(pasta, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    os.close(fd)
+    try:
+        escrever(tmp)
+        os.replace(tmp, destino)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def gerar_miniaturas(chave: str, refazer: bool = False):
+    """Gera as miniaturas que faltam da foto `chave` (todas, com refazer=True)."""
+    faltam = [t for t in TAMANHOS_MINIATURA
+              if refazer or not os.path.exists(caminho_miniatura(chave, t))]
+    if not faltam:
+        return
+    with Image.open(caminho_original(chave)) as img:
+        img.load()
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        for tamanho in sorted(faltam, reverse=True):
+            img = img.copy()
+            img.thumbnail((tamanho, tamanho), Image.LANCZOS)
+            _gravar_atomico(caminho_miniatura(chave, tamanho),
+                            lambda tmp, im=img: im.save(tmp, format="PNG"))
+
+def guardar(caminho: str) -> str:
+    """
+    Copia a imagem `caminho` para o acervo (se ainda não estiver lá), gera as
+    miniaturas e devolve a chave para gravar em militares.foto.
+    ValueError se o arquivo não for uma imagem que o Pillow consiga abrir.
+    """
+    if eh_chave(caminho):
+        gerar_miniaturas(caminho)
+        return caminho
+    try:
+        with Image.open(caminho) as img:
+            img.verify()
+    except Exception as e:
+        raise ValueError(f"Arquivo não é uma imagem válida: {caminho}") from e
+    ext = os.path.splitext(caminho)[1].lower()
+    chave = f"{_sha256(caminho)}{ext if ext in EXTENSOES else '.img'}"
+    destino = caminho_original(chave)
+    if not os.path.exists(destino):  # mesmo conteúdo = mesma chave: não copia de novo
+        _gravar_atomico(destino, lambda tmp: shutil.copyfile(caminho, tmp))
+    gerar_miniaturas(chave)
+    return chave
+
+def miniatura(valor: Optional[str], tamanho: int) -> Optional[str]:
+    """
+    Caminho do PNG de `tamanho` px para o valor de militares.foto (chave ou caminho
+    antigo), ou None se não houver foto utilizável.
+    """
+    if not valor:
+        return None
+    try:
+        if not eh_chave(valor):
+            valor = _chave_de_caminho_antigo(valor)
+            if valor is None:
+                return None
+        png = caminho_miniatura(valor, tamanho)
+        if not os.path.exists(png):
+            if not os.path.exists(caminho_original(valor)):
+                return None
+            gerar_miniaturas(valor)
+        return png
+    except (OSError, ValueError):
+        return None
+
+def _chave_de_caminho_antigo(caminho: str) -> Optional[str]:
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    marca = (os.path.abspath(caminho), st.st_mtime_ns, st.st_size)
+    with _trava:
+        chave = _importadas.get(marca)
+    if chave is None:
+        chave = guardar(caminho)
+        with _trava:
+            _importadas[marca] = chave
+    return chave
@@ -0,0 +1,290 @@
+# database/migracoes.py
+# Migrações do esquema, numeradas por PRAGMA user_version.
+#
+# Cada migração recebe o cursor de uma transação já aberta; migrar() aplica
+# todas as pendentes numa transação só (tudo ou nada), depois de copiar o
+# arquivo do banco para <banco>.v<versão>.bak.
+#
+# Para mudar o esquema: acrescente (número, descrição, função) em MIGRACOES e
+# ajuste o CREATE TABLE correspondente em db.py (usado em bases novas).
+# O init() não refaz o DDL de bases que já estão em VERSAO_ATUAL: qualquer mudança
+# no DDL de db.py (tabela, índice, trigger, view) precisa de uma migração nova,
+# nem que seja vazia, para que as bases existentes o recebam.
+# Migrações antigas não devem ser editadas: o DDL delas é uma fotografia da época.
+import os
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+from database.modelos import centavos, data_iso
+
+# -------- 1: valores em centavos e datas ISO --------
+_DDL_MILITARES_V1 = """
+    CREATE TABLE militares_v1 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        posto TEXT NOT NULL,
+        nome TEXT NOT NULL,
+        nome_guerra TEXT NOT NULL,
+        cpf TEXT UNIQUE NOT NULL,
+        prec_cp TEXT UNIQUE NOT NULL,
+        idt TEXT UNIQUE NOT NULL,
+        banco TEXT,
+        agencia TEXT,
+        conta TEXT,
+        foto TEXT,
+        ano TEXT,
+        data_nascimento TEXT,
+        data_praca TEXT,
+        endereco TEXT,
+        cep TEXT,
+        recebe_pre_escolar TEXT,
+        valor_pre_escolar_centavos INTEGER NOT NULL DEFAULT 0,
+        recebe_aux_transporte TEXT,
+        valor_aux_transporte_centavos INTEGER NOT NULL DEFAULT 0,
+        pnr TEXT
+    )
+"""
+
+def _m1_centavos_e_datas_iso(cur: sqlite3.Cursor):
+    """
+    militares: valor_pre_escolar/valor_aux_transporte (TEXT "286.66") viram
+    *_centavos INTEGER; data_nascimento/data_praca passam de dd/mm/aaaa para ISO.
+    Texto que não for número/data é copiado como está.
+    A tabela é recriada (SQLite não muda tipo de coluna); índices e o índice de
+    texto (militares_fts) são recriados pelo init().
+    """
+    colunas = [r[1] for r in cur.execute("PRAGMA table_info(militares)")]
+    if "valor_aux_transporte_centavos" in colunas:
+        return
+    seq = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'militares'").fetchone()
+
+    cur.execute("DROP TABLE IF EXISTS militares_fts")
+    cur.execute(_DDL_MILITARES_V1)
+    linhas = cur.execute("""
+        SELECT id, posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
+               ano, data_nascimento, data_praca, endereco, cep,
+               recebe_pre_escolar, valor_pre_escolar, recebe_aux_transporte, valor_aux_transporte, pnr
+          FROM militares
+    """).fetchall()
+
+    def converter(r):
+        r = list(r)
+        r[12], r[13] = data_iso(r[12]), data_iso(r[13])
+        for i in (17, 19):
+            c = centavos(r[i])
+            r[i] = c if c is not None else r[i]
+        return r
+
+    cur.executemany("""
+        INSERT INTO militares_v1 (
+            id, posto, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
+            ano, data_nascimento, data_praca, endereco, cep,
+            recebe_pre_escolar, valor_pre_escolar_centavos,
+            recebe_aux_transporte, valor_aux_transporte_centavos, pnr
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, map(converter, linhas))
+    cur.execute("DROP TABLE militares")
+    cur.execute("ALTER TABLE militares_v1 RENAME TO militares")
+    if seq:  # ids de registros excluídos não voltam a ser usados
+        cur.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'militares'", (seq[0],))
+
+# -------- 2: hierarquia no catálogo de postos, militares.posto_id --------
+_DDL_MILITARES_V2 = """
+    CREATE TABLE militares_v2 (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        posto_id INTEGER NOT NULL REFERENCES postos (id),
+        nome TEXT NOT NULL,
+        nome_guerra TEXT NOT NULL,
+        cpf TEXT UNIQUE NOT NULL,
+        prec_cp TEXT UNIQUE NOT NULL,
+        idt TEXT UNIQUE NOT NULL,
+        banco TEXT,
+        agencia TEXT,
+        conta TEXT,
+        foto TEXT,
+        ano TEXT,
+        data_nascimento TEXT,
+        data_praca TEXT,
+        endereco TEXT,
+        cep TEXT,
+        recebe_pre_escolar TEXT,
+        valor_pre_escolar_centavos INTEGER NOT NULL DEFAULT 0,
+        recebe_aux_transporte TEXT,
+        valor_aux_transporte_centavos INTEGER NOT NULL DEFAULT 0,
+        pnr TEXT
+    )
+"""
+
+# (nome, abreviatura, sigla) na ordem hierárquica, como estava nesta versão
+_HIERARQUIA_V2 = (
+    ("Capitão", "Cap.", "CAP"),
+    ("1º Tenente", "1º Ten.", "1º TEN"),
+    ("2º Tenente", "2º Ten.", "2º TEN"),
+    ("Subtenente", "Sub Ten.", "ST"),
+    ("1º Sargento", "1º Sgt", "1º SGT"),
+    ("2º Sargento", "2º Sgt", "2º SGT"),
+    ("3º Sargento", "3º Sgt", "3º SGT"),
+    ("Aspirante", "Asp.", "ASP"),
+    ("Cabo Efetivo Profissional", "Cb EP", "CB EF PROFL"),
+    ("Soldado Efetivo Profissional", "Sd EP", "SD EF PROFL"),
+    ("Soldado Efetivo Variável", "Sd EV", "SD EF VRV"),
+)
+
+def _m2_postos_por_hierarquia(cur: sqlite3.Cursor):
+    """
+    postos ganha ordem (hierarquia), abreviatura e sigla; todo posto usado em
+    militares entra no catálogo. militares.posto (texto) vira posto_id -> postos.id.
+    Postos desconhecidos ficam depois dos conhecidos, na ordem em que foram cadastrados.
+    """
+    cur.execute("CREATE TABLE IF NOT EXISTS postos (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT UNIQUE NOT NULL)")
+    colunas = [r[1] for r in cur.execute("PRAGMA table_info(postos)")]
+    if "ordem" not in colunas:
+        cur.execute("ALTER TABLE postos ADD COLUMN ordem INTEGER NOT NULL DEFAULT 0")
+        cur.execute("ALTER TABLE postos ADD COLUMN abreviatura TEXT")
+        cur.execute("ALTER TABLE postos ADD COLUMN sigla TEXT")
+    cur.execute("INSERT OR IGNORE INTO postos (nome) SELECT DISTINCT posto FROM militares ORDER BY posto")
+
+    conhecidos = {nome: ((i + 1) * 10, abrev, sigla) for i, (nome, abrev, sigla) in enumerate(_HIERARQUIA_V2)}
+    proxima = 1000
+    for id_posto, nome in cur.execute("SELECT id, nome FROM postos ORDER BY id").fetchall():
+        if nome in conhecidos:
+            ordem, abrev, sigla = conhecidos[nome]
+        else:
+            ordem, abrev, sigla = proxima, nome, nome.upper()
+            proxima += 10
+        cur.execute("UPDATE postos SET ordem = ?, abreviatura = ?, sigla = ? WHERE id = ?",
+                    (ordem, abrev, sigla, id_posto))
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_postos_ordem ON postos (ordem)")
+
+    colunas = [r[1] for r in cur.execute("PRAGMA table_info(militares)")]
+    if "posto_id" in colunas:
+        return
+    seq = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'militares'").fetchone()
+    cur.execute("DROP TABLE IF EXISTS militares_fts")
+    cur.execute(_DDL_MILITARES_V2)
+    cur.execute("""
+        INSERT INTO militares_v2 (
+            id, posto_id, nome, nome_guerra, cpf, prec_cp, idt, banco, agencia, conta, foto,
+            ano, data_nascimento, data_praca, endereco, cep,
+            recebe_pre_escolar, valor_pre_escolar_centavos,
+            recebe_aux_transporte, valor_aux_transporte_centavos, pnr
+        )
+        SELECT m.id, p.id, m.nome, m.nome_guerra, m.cpf, m.prec_cp, m.idt, m.banco, m.agencia,
+               m.conta, m.foto, m.ano, m.data_nascimento, m.data_praca, m.endereco, m.cep,
+               m.recebe_pre_escolar, m.valor_pre_escolar_centavos,
+               m.recebe_aux_transporte, m.valor_aux_transporte_centavos, m.pnr
+          FROM militares m JOIN postos p ON p.nome = m.posto
+    """)
+    cur.execute("DROP TABLE militares")
+    cur.execute("ALTER TABLE militares_v2 RENAME TO militares")
+    if seq:
+        cur.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'militares'", (seq[0],))
+
+# -------- 3: row_version/updated_at --------
+def _m3_versao_das_linhas(cur: sqlite3.Cursor):
+    """
+    militares, postos, bancos e soldos_por_posto ganham row_version (0 nas linhas
+    existentes) e updated_at. O contador, a tabela de exclusões e as triggers são
+    criados pelo init() (criar_controle_versao), assim como a vw_militares nova.
+    """
+    cur.execute("DROP VIEW IF EXISTS vw_militares")
+    for tabela in ("militares", "postos", "bancos", "soldos_por_posto"):
+        if not _tem_tabela(cur.connection, tabela):
+            continue
+        colunas = [r[1] for r in cur.execute(f"PRAGMA table_info({tabela})")]
+        if "row_version" not in colunas:
+            cur.execute(f"ALTER TABLE {tabela} ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
+            cur.execute(f"ALTER TABLE {tabela} ADD COLUMN updated_at TEXT")
+
+# -------- 4: auditoria --------
+def _m4_auditoria(cur: sqlite3.Cursor):
+    """Só cria tabela nova: a auditoria (e suas triggers) vem do init() (criar_tabela_auditoria)."""
+
+# -------- 5: histórico de soldos --------
+def _m5_soldos_historico(cur: sqlite3.Cursor):
+    """Só cria tabela nova: soldos_historico vem do init(), que abre o histórico com os soldos atuais."""
+
+# -------- 6: soldo para postos incluídos depois do init() --------
+def _m6_soldo_dos_postos(cur: sqlite3.Cursor):
+    """
+    Postos incluídos pelo cadastro ou pela importação ficavam sem soldo: recebem
+    soldo 0. Posto sem histórico abre o histórico com o soldo gravado em
+    soldos_por_posto (nunca com 0 por cima de um valor). Bases anteriores à 5
+    ainda não têm soldos_historico: o init() abre o histórico da mesma forma.
+    """
+    if not _tem_tabela(cur.connection, "soldos_por_posto"):
+        return
+    cur.execute("INSERT OR IGNORE INTO soldos_por_posto (posto, soldo) SELECT nome, 0 FROM postos")
+    if _tem_tabela(cur.connection, "soldos_historico"):
+        cur.execute("""
+            INSERT INTO soldos_historico (posto, vigencia_inicio, soldo)
+            SELECT s.posto, '1900-01-01', s.soldo FROM soldos_por_posto s
+             WHERE NOT EXISTS (SELECT 1 FROM soldos_historico h WHERE h.posto = s.posto)
+        """)
+
+# =========================
+# Registro e execução
+# =========================
+MIGRACOES: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "valores em centavos e datas ISO em militares", _m1_centavos_e_datas_iso),
+    (2, "hierarquia em postos e militares.posto_id", _m2_postos_por_hierarquia),
+    (3, "row_version/updated_at nas tabelas de dados", _m3_versao_das_linhas),
+    (4, "tabela auditoria", _m4_auditoria),
+    (5, "histórico de soldos por vigência", _m5_soldos_historico),
+    (6, "soldo zerado para postos sem soldo", _m6_soldo_dos_postos),
+]
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+def versao(con: sqlite3.Connection) -> int:
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+def _tem_tabela(con: sqlite3.Connection, nome: str) -> bool:
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                       (nome,)).fetchone() is not None
+
+def backup(con: sqlite3.Connection, caminho_db: str, versao_atual: int) -> Optional[str]:
+    """Copia a base (API de backup do SQLite) para <banco>.v<versão>.bak. Retorna o caminho."""
+    if not caminho_db or caminho_db == ":memory:" or caminho_db.startswith("file:"):
+        return None
+    destino = f"{caminho_db}.v{versao_atual}.bak"
+    if os.path.exists(destino):
+        os.remove(destino)
+    copia = sqlite3.connect(destino)
+    try:
+        con.backup(copia)
+    finally:
+        copia.close()
+    return destino
+
+def migrar(con: sqlite3.Connection, caminho_db: Optional[str] = None,
+           criar_esquema: Optional[Callable[[sqlite3.Cursor], None]] = None) -> int:
+    """
+    Leva a base até VERSAO_ATUAL. Retorna a versão final.
+    Base antiga: backup e cada migração pendente; base nova (sem a tabela militares)
+    não tem o que migrar. Na mesma transação roda criar_esquema(cur) — o init() passa
+    o DDL atual e os dados iniciais — e só então grava user_version: base com
+    user_version em dia tem o esquema completo.
+    Se qualquer passo falhar, nada é aplicado e a exceção sobe.
+    """
+    atual = versao(con)
+    if atual >= VERSAO_ATUAL:
+        return atual
+    if _tem_tabela(con, "militares"):
+        backup(con, caminho_db, atual)
+
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        cur = con.cursor()
+        atual = versao(con)  # outro processo pode ter migrado enquanto esperávamos a trava
+        if atual < VERSAO_ATUAL:
+            if _tem_tabela(con, "militares"):
+                for numero, _descricao, aplicar in MIGRACOES:
+                    if numero > atual:
+                        aplicar(cur)
+            if criar_esquema is not None:
+                criar_esquema(cur)
+            cur.execute(f"PRAGMA user_version = {VERSAO_ATUAL}")
+    except BaseException:
+        con.rollback()
+        raise
+    con.commit()
+    return versao(con)
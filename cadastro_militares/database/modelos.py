@@ -0,0 +1,203 @@
+# database/modelos.py
+# Registro compacto devolvido pelas consultas de militares (row_factory)
+# e conversões entre o formato das telas/planilhas e o formato do banco.
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from sys import intern
+from typing import Optional
+
+# Colunas da tabela militares, na ordem do SELECT.
+# Valores em centavos (INTEGER); datas em ISO-8601 (AAAA-MM-DD).
+CAMPOS_MILITAR = (
+    "id", "posto", "nome", "nome_guerra", "cpf", "prec_cp", "idt", "banco", "agencia", "conta", "foto",
+    "ano", "data_nascimento", "data_praca", "endereco", "cep",
+    "recebe_pre_escolar", "valor_pre_escolar_centavos",
+    "recebe_aux_transporte", "valor_aux_transporte_centavos", "pnr",
+)
+
+# Ordem/nomes da tupla antiga de buscar_todos() (valores "286.66", datas dd/mm/aaaa).
+CAMPOS_LEGADO = tuple(c.replace("_centavos", "") for c in CAMPOS_MILITAR)
+_DATAS = frozenset({"data_nascimento", "data_praca"})
+
+# =========================
+# Conversões
+# =========================
+def centavos(valor) -> Optional[int]:
+    """
+    286.66 / "286.66" / "286,66" / "R$ 2.866,66" -> centavos (int).
+    Vazio -> 0; texto que não é número -> None.
+    """
+    if valor is None:
+        return 0
+    if isinstance(valor, int):
+        return valor * 100
+    if isinstance(valor, (float, Decimal)):
+        return int((Decimal(str(valor)) * 100).quantize(Decimal(1)))
+    s = re.sub(r"[^\d,.\-]", "", str(valor))
+    if not s:
+        return 0 if not str(valor).strip() else None
+    if "," in s and "." in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif "," in s:
+        s = s.replace(",", ".")
+    try:
+        return int((Decimal(s) * 100).quantize(Decimal(1)))
+    except InvalidOperation:
+        return None
+
+def reais_txt(valor_centavos) -> str:
+    """Centavos -> "286.66" (formato antigo das colunas de valor). Texto não convertido volta como está."""
+    if isinstance(valor_centavos, int):
+        sinal = "-" if valor_centavos < 0 else ""
+        return f"{sinal}{abs(valor_centavos) // 100}.{abs(valor_centavos) % 100:02d}"
+    return "0.00" if valor_centavos is None else str(valor_centavos)
+
+def reais(valor_centavos) -> float:
+    """Centavos -> float em reais (0.0 se o valor não for numérico)."""
+    if isinstance(valor_centavos, int):
+        return valor_centavos / 100
+    c = centavos(valor_centavos)
+    return c / 100 if c is not None else 0.0
+
+_RE_DATA_BR = re.compile(r"^(\d{1,2})[/.-](\d{1,2})[/.-](\d{2}|\d{4})$")
+_RE_DATA_ISO = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+
+def data_iso(valor) -> Optional[str]:
+    """
+    "05/03/1995", "5-3-95", "1995-03-05", date/datetime -> "1995-03-05".
+    Vazio -> None. Texto que não é data válida volta como está.
+    """
+    if valor is None:
+        return None
+    if isinstance(valor, (date, datetime)):
+        return valor.strftime("%Y-%m-%d")
+    s = str(valor).strip()
+    if not s:
+        return None
+    m = _RE_DATA_ISO.match(s)
+    if m:
+        a, mes, d = (int(x) for x in m.groups())
+    else:
+        m = _RE_DATA_BR.match(s)
+        if not m:
+            return s
+        d, mes, a = (int(x) for x in m.groups())
+        if a < 100:
+            a += 2000 if a <= date.today().year % 100 else 1900
+    try:
+        return date(a, mes, d).isoformat()
+    except ValueError:
+        return s
+
+def data_br(valor) -> str:
+    """"1995-03-05" -> "05/03/1995". None -> "". Texto fora do padrão ISO volta como está."""
+    if not valor:
+        return ""
+    m = _RE_DATA_ISO.match(str(valor))
+    return f"{m.group(3)}/{m.group(2)}/{m.group(1)}" if m else str(valor)
+
+def dados_para_banco(dados) -> tuple:
+    """
+    Tupla de gravação no formato antigo (posto, nome, ..., valor_pre_escolar, ...,
+    valor_aux_transporte, pnr) -> mesma tupla com valores em centavos e datas ISO.
+    O que não puder ser convertido é gravado como veio.
+    """
+    d = list(dados)
+    for i in (11, 12):          # data_nascimento, data_praca
+        d[i] = data_iso(d[i])
+    for i in (16, 18):          # valor_pre_escolar, valor_aux_transporte
+        c = centavos(d[i])
+        d[i] = c if c is not None else d[i]
+    return tuple(d)
+
+_CAMPOS_INTERNADOS = frozenset({
+    "posto", "banco", "ano", "recebe_pre_escolar", "recebe_aux_transporte", "pnr",
+})
+
+class Militar:
+    """
+    Uma linha da tabela militares, sem __dict__ (um slot por coluna).
+    Acesse por atributo: m.nome, m.prec_cp, m.valor_aux_transporte_centavos...
+    Datas ficam em ISO (m.data_praca == "2015-03-01"); use data_br() para exibir.
+    Colunas que a consulta não trouxe ficam None.
+
+    Compatibilidade com o formato antigo:
+      m.valor_pre_escolar / m.valor_aux_transporte -> "286.66";
+      m[i], len(m) e iteração seguem CAMPOS_LEGADO, com datas em dd/mm/aaaa.
+    """
+    __slots__ = CAMPOS_MILITAR
+
+    def __init__(self, id=None, posto=None, nome=None, nome_guerra=None, cpf=None, prec_cp=None,
+                 idt=None, banco=None, agencia=None, conta=None, foto=None,
+                 ano=None, data_nascimento=None, data_praca=None, endereco=None, cep=None,
+                 recebe_pre_escolar=None, valor_pre_escolar_centavos=None,
+                 recebe_aux_transporte=None, valor_aux_transporte_centavos=None, pnr=None):
+        self.id = id
+        self.posto = posto
+        self.nome = nome
+        self.nome_guerra = nome_guerra
+        self.cpf = cpf
+        self.prec_cp = prec_cp
+        self.idt = idt
+        self.banco = banco
+        self.agencia = agencia
+        self.conta = conta
+        self.foto = foto
+        self.ano = ano
+        self.data_nascimento = data_nascimento
+        self.data_praca = data_praca
+        self.endereco = endereco
+        self.cep = cep
+        self.recebe_pre_escolar = recebe_pre_escolar
+        self.valor_pre_escolar_centavos = valor_pre_escolar_centavos
+        self.recebe_aux_transporte = recebe_aux_transporte
+        self.valor_aux_transporte_centavos = valor_aux_transporte_centavos
+        self.pnr = pnr
+
+    # ---- compatibilidade com o formato antigo ----
+    @property
+    def valor_pre_escolar(self) -> str:
+        return reais_txt(self.valor_pre_escolar_centavos)
+
+    @property
+    def valor_aux_transporte(self) -> str:
+        return reais_txt(self.valor_aux_transporte_centavos)
+
+    def _legado(self, campo):
+        v = getattr(self, campo)
+        return data_br(v) if campo in _DATAS else v
+
+    def __iter__(self):
+        for campo in CAMPOS_LEGADO:
+            yield self._legado(campo)
+
+    def __len__(self):
+        return len(CAMPOS_LEGADO)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return tuple(self._legado(c) for c in CAMPOS_LEGADO[idx])
+        return self._legado(CAMPOS_LEGADO[idx])
+
+    def __repr__(self):
+        return f"Militar(id={self.id!r}, posto={self.posto!r}, nome={self.nome!r})"
+
+def _i(v):
+    return intern(v) if v.__class__ is str else v
+
+def militar_factory(cursor, row) -> Militar:
+    """
+    row_factory do sqlite3: linha completa (ordem de CAMPOS_MILITAR) ou projeção por nome.
+    Colunas de poucos valores distintos (posto, banco, Sim/Não, ano) são internadas:
+    milhares de registros passam a apontar para a mesma string.
+    """
+    if len(row) == len(CAMPOS_MILITAR):
+        (id_, posto, nome, ng, cpf, prec, idt, banco, ag, conta, foto, ano, nasc, praca,
+         end, cep, rpre, vpre, rat, vat, pnr) = row
+        return Militar(id_, _i(posto), nome, ng, cpf, prec, idt, _i(banco), ag, conta, foto,
+                       _i(ano), nasc, praca, end, cep, _i(rpre), vpre, _i(rat), vat, _i(pnr))
+    campos = {d[0]: v for d, v in zip(cursor.description, row)}
+    for c in _CAMPOS_INTERNADOS.intersection(campos):
+        campos[c] = _i(campos[c])
+    return Militar(**campos)
@@ -2,7 +2,15 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
 
-from database.db import buscar_todos, atualizar_aux_transporte, obter_soldo_por_posto
+from database.db import (
+    buscar_recebem_aux_transporte, listar_postos_em_uso, atualizar_aux_transporte, obter_soldo_por_posto,
+    ids_por_texto, abreviaturas_postos, versao_atual
+)
+from interface.tarefas import em_segundo_plano
+from servicos.auxilio_transporte import (
+    ajuste_despesa, boletim_despesa_a_anular, calcular_por_tarifas, linhas_auxilio, valor_dia
+)
+from servicos.formatos import money, para_float
 
 # --------- tema/estilo ----------
 BG_APP = "#e3f2fd"
@@ -25,58 +33,10 @@ ESTILO_BOTAO = {
 ESTILO_BOTAO_SM = {**ESTILO_BOTAO, "width": 10}
 ESTILO_BOTAO_TINY = {**ESTILO_BOTAO, "width": 2}
 
-ABREV_POSTOS = {
-    "Capitão": "Cap.",
-    "1º Tenente": "1º Ten.",
-    "2º Tenente": "2º Ten.",
-    "Subtenente": "Sub Ten.",
-    "1º Sargento": "1º Sgt",
-    "2º Sargento": "2º Sgt",
-    "3º Sargento": "3º Sgt",
-    "Cabo Efetivo Profissional": "Cb EP",
-    "Soldado Efetivo Profissional": "Sd EP",
-    "Soldado Efetivo Variável": "Sd EV",
-}
-
-# ORDEM HIERÁRQUICA 
-ORDER_POSTOS = [
-    "Capitão",
-    "1º Tenente",
-    "2º Tenente",
-    "Subtenente",
-    "1º Sargento",
-    "2º Sargento",
-    "3º Sargento",
-    "Cabo Efetivo Profissional",
-    "Soldado Efetivo Profissional",
-    "Soldado Efetivo Variável",
-]
-RANK_INDEX = {p: i for i, p in enumerate(ORDER_POSTOS)}
-
-def _posto_key(p):
-    return RANK_INDEX.get(p, 999)
-
 # --------- helpers de formato ----------
 import re as _re
 _RE_MONEY = _re.compile(r"^\s*(R\$)?\s*\d{0,9}([.,]\d{0,2})?\s*$")
 
-def _to_float(v, default=0.0):
-    try:
-        s = str(v).strip().replace("R$", "").replace(" ", "")
-        if "," in s:
-            s = s.replace(".", "").replace(",", ".")
-        return float(s) if s else default
-    except Exception:
-        return default
-
-def money(v) -> str:
-    try:
-        x = float(v)
-    except Exception:
-        x = 0.0
-    s = f"{x:,.2f}"
-    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
-
 def money_entry(parent, textvariable=None, width=12):
     var = textvariable or tk.StringVar()
     def _vcmd(newval):
@@ -84,33 +44,13 @@ def money_entry(parent, textvariable=None, width=12):
     def _fmt(_evt=None):
         if var.get().strip() == "":
             var.set("R$ 0,00"); return
-        var.set(money(_to_float(var.get(), 0.0)))
+        var.set(money(para_float(var.get(), 0.0)))
     vcmd = (parent.register(_vcmd), "%P")
     e = tk.Entry(parent, textvariable=var, width=width, validate="key",
                  validatecommand=vcmd, font=("Segoe UI", 11))
     e.bind("<FocusOut>", _fmt)
     return e, var
 
-# --------- cálculos ----------
-def calcular_por_total_mensal(total_mensal, soldo):
-    """Recebe TOTAL BRUTO (22d) e soldo; retorna líquido (aux) e cota.
-       Só é usada na calculadora quando houver tarifas."""
-    total = _to_float(total_mensal, 0.0)
-    sd = _to_float(soldo, 0.0)
-    cota30 = sd * 0.06
-    cota22 = cota30 * (22.0/30.0)
-    aux = max(0.0, total - cota22)  # líquido
-    return {"total_mes_22": total, "cota22": cota22, "aux": aux}
-
-def calcular_por_tarifas(lista_tarifas, soldo):
-    """Usada apenas na calculadora: tarifa x2 = valor do dia (BRUTO)"""
-    soma_tarifas = sum(_to_float(x, 0.0) for x in lista_tarifas)
-    valor_dia_bruto = soma_tarifas * 2.0
-    total_mes_22 = valor_dia_bruto * 22.0
-    r = calcular_por_total_mensal(total_mes_22, soldo)  # dá o líquido (aux)
-    r.update({"valor_dia": valor_dia_bruto})
-    return r
-
 # =========================
 #   Janela Auxílio
 # =========================
@@ -155,22 +95,10 @@ def abrir_auxilio_transporte(master):
     # ---------------- dados base ----------------
     def _carregar_militares():
         try:
-            lista = buscar_todos()
+            return buscar_recebem_aux_transporte()  # lista de Militar com recebe_aux_transporte = 'Sim'
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao buscar militares:\n{e}", parent=win)
             return []
-        out = []
-        for it in lista:
-            out.append({
-                "ID": it[0],
-                "Posto": it[1],
-                "Nome": it[2],
-                "CPF": it[4],
-                "PREC": it[5],
-                "recebe_aux_transporte": it[18] if len(it)>18 else "Não",
-                "valor_aux_transporte": it[19] if len(it)>19 else 0.0
-            })
-        return out
 
     # ============== ABA 1: RELATÓRIO ==============
     tab_rel = tk.Frame(nb, bg=BG_APP); nb.add(tab_rel, text="Relatório")
@@ -210,45 +138,40 @@ def abrir_auxilio_transporte(master):
     btn_atualizar.pack(side="left", padx=6)
     btn_editar.pack(side="left", padx=6)
 
+    cache_rel = {"versao": None, "regs": []}
+
     def _popular_relatorio():
+        # só relê do banco (na thread do banco) se algo foi gravado desde a última leitura
+        versao = versao_atual()
+        if versao == cache_rel["versao"]:
+            _preencher_relatorio()
+            return
+
+        def _concluir(regs):
+            cache_rel["regs"], cache_rel["versao"] = regs, versao
+            _preencher_relatorio()
+        em_segundo_plano(
+            win, buscar_recebem_aux_transporte, ao_concluir=_concluir, chave="relatorio",
+            ao_falhar=lambda e: messagebox.showerror("Erro", f"Erro ao buscar militares:\n{e}", parent=win),
+        )
+
+    def _preencher_relatorio():
         tree.delete(*tree.get_children())
         item_to_info.clear()
-        q = (busca_var.get() or "").strip().lower()
-        regs = _carregar_militares()
-
-        linhas = []
-        for d in regs:
-            if not str(d.get("recebe_aux_transporte","Não")).lower().startswith("s"):
-                continue
-            nome = str(d["Nome"])
-            if q and q not in nome.lower():
-                continue
-            posto = str(d["Posto"])
-
-            total_liq = _to_float(d.get("valor_aux_transporte", 0.0), 0.0)  # JÁ é líquido
-            valor_dia_liq = total_liq / 22.0 if total_liq else 0.0
-
-            linhas.append({
-                "ID": int(d["ID"]), "nome": nome, "posto": posto,
-                "valor_dia": valor_dia_liq, "total_liquido": total_liq
-            })
-
-        # ordena por hierarquia e depois por nome
-        linhas.sort(key=lambda x: (_posto_key(x["posto"]), x["nome"].lower()))
-
-        for i, row in enumerate(linhas):
+        q = (busca_var.get() or "").strip()
+        regs = cache_rel["regs"]
+        if q:
+            ids = ids_por_texto(q)
+            regs = [m for m in regs if m.id in ids]
+
+        for i, row in enumerate(linhas_auxilio(regs)):
             tag = "odd" if i % 2 else "even"
             item = tree.insert(
                 "", "end",
-                values=(
-                    row["nome"],
-                    row["posto"],
-                    money(row["valor_dia"]),      
-                    money(row["total_liquido"])   
-                ),
+                values=(str(row.nome), str(row.posto), money(row.valor_dia), money(row.liquido_base)),
                 tags=(tag,)
             )
-            item_to_info[item] = (row["ID"], row["nome"], row["posto"], row["total_liquido"])
+            item_to_info[item] = (int(row.id), str(row.nome), str(row.posto), row.liquido_base)
 
     btn_atualizar.config(command=_popular_relatorio)
     _popular_relatorio()
@@ -271,7 +194,7 @@ def abrir_auxilio_transporte(master):
     tk.Label(topo, text="Posto (para calcular cota quando houver tarifas):",
              bg=BG_APP, font=("Segoe UI", 12, "bold")).grid(row=0, column=0, sticky="e", padx=6)
 
-    postos_usados = sorted({d["Posto"] for d in _carregar_militares()}, key=_posto_key)
+    postos_usados = listar_postos_em_uso()  # já na ordem hierárquica
     posto_calc = tk.StringVar(value=postos_usados[0] if postos_usados else "")
     cb_calc = ttk.Combobox(topo, values=postos_usados, textvariable=posto_calc, state="readonly", width=36)
     cb_calc.grid(row=0, column=1, sticky="w")
@@ -358,22 +281,22 @@ def abrir_auxilio_transporte(master):
 
     def _linha_da(parent, base):
         row_data = {
-            **base,
+            "base": base,
             "preta": 0,
             "vermelha": 0,
             "ajuste": 0.0,
-            "novo_liquido": base["liquido_base"]
+            "novo_liquido": base.liquido_base
         }
 
         row = tk.Frame(parent, bg=BG_APP, bd=0)
         row.pack(fill="x", pady=4)
 
-        tk.Label(row, text=f"{row_data['Nome']}  |  {row_data['Posto']}",
+        tk.Label(row, text=f"{base.nome}  |  {base.posto}",
                  bg=BG_APP, font=("Segoe UI", 11, "bold")).grid(row=0, column=0, columnspan=6, sticky="w")
 
-        tk.Label(row, text=f"Valor dia: {money(row_data['valor_dia'])}", bg=BG_APP)\
+        tk.Label(row, text=f"Valor dia: {money(base.valor_dia)}", bg=BG_APP)\
             .grid(row=1, column=0, sticky="w", padx=2)
-        tk.Label(row, text=f"Total (LÍQ.) base: {money(row_data['liquido_base'])}", bg=BG_APP)\
+        tk.Label(row, text=f"Total (LÍQ.) base: {money(base.liquido_base)}", bg=BG_APP)\
             .grid(row=1, column=1, sticky="w", padx=(12,2))
 
         tk.Label(row, text="Preta:", bg=BG_APP).grid(row=1, column=2, sticky="e", padx=(16,2))
@@ -395,14 +318,14 @@ def abrir_auxilio_transporte(master):
             .grid(row=1, column=9, sticky="w")
 
         lbl_aj = tk.Label(row, text="Ajuste: R$ 0,00", bg=BG_APP, font=("Segoe UI", 10, "bold"))
-        lbl_nv = tk.Label(row, text=f"Novo Total (LÍQ.): {money(row_data['liquido_base'])}",
+        lbl_nv = tk.Label(row, text=f"Novo Total (LÍQ.): {money(base.liquido_base)}",
                           bg=BG_APP, font=("Segoe UI", 10, "bold"))
         lbl_aj.grid(row=1, column=10, sticky="w", padx=(18,2))
         lbl_nv.grid(row=1, column=11, sticky="w", padx=(12,2))
 
         def _recalc():
-            row_data["ajuste"] = (row_data["vermelha"] - row_data["preta"]) * row_data["valor_dia"]
-            row_data["novo_liquido"] = max(0.0, row_data["liquido_base"] + row_data["ajuste"])
+            row_data["ajuste"], row_data["novo_liquido"] = ajuste_despesa(
+                base, row_data["preta"], row_data["vermelha"])
             lbl_aj.config(text=f"Ajuste: {money(row_data['ajuste'])}")
             lbl_nv.config(text=f"Novo Total (LÍQ.): {money(row_data['novo_liquido'])}")
 
@@ -434,32 +357,13 @@ def abrir_auxilio_transporte(master):
                 pass
         linhas_da.clear()
 
-        regs = _carregar_militares()
-        linhas_ins = []
-        for d in regs:
-            if not str(d.get("recebe_aux_transporte","Não")).lower().startswith("s"):
-                continue
-            posto = d["Posto"]
-
-            total_liq = _to_float(d.get("valor_aux_transporte",0.0), 0.0)  # JÁ é líquido
-            valor_dia_liq = total_liq / 22.0 if total_liq else 0.0
-
-            linhas_ins.append({
-                "ID": d["ID"], "Nome": d["Nome"], "Posto": posto,
-                "CPF": d["CPF"], "PREC": d["PREC"],
-                "valor_dia": valor_dia_liq, "liquido_base": total_liq
-            })
-
-        # ordena por hierarquia e nome
-        linhas_ins.sort(key=lambda x: (_posto_key(x["Posto"]), x["Nome"].lower()))
-
-        for base in linhas_ins:
+        for base in linhas_auxilio(_carregar_militares()):
             _linha_da(inner, base)
 
     def _filtrar_da(_=None):
         termo = (busca_da.get() or "").strip().lower()
         for it in linhas_da:
-            visivel = (termo in str(it["Nome"]).lower()) if termo else True
+            visivel = (termo in str(it["base"].nome).lower()) if termo else True
             it["row"].pack_forget()
             if visivel:
                 it["row"].pack(fill="x", pady=4)
@@ -468,26 +372,9 @@ def abrir_auxilio_transporte(master):
     ent_da.bind("<KeyRelease>", _filtrar_da)  # busca em tempo real
     _load_da()
 
-    def _formatar_cpf(cpf: str) -> str:
-        s = "".join(ch for ch in str(cpf) if ch.isdigit())
-        if len(s) == 11:
-            return f"{s[0:3]}.{s[3:6]}.{s[6:9]}-{s[9:11]}"
-        return cpf
-
     def _gerar_boletim():
-        texto = ""
-        for it in linhas_da:
-            desconto = max(0.0, (it["preta"] - it["vermelha"]) * it["valor_dia"])
-            if desconto <= 0:
-                continue
-            abrev = ABREV_POSTOS.get(it["Posto"], it["Posto"])
-            nome_up = str(it["Nome"]).upper()
-            prec = it["PREC"]
-            cpf_fmt = _formatar_cpf(it["CPF"])
-            texto += f"{abrev} {nome_up}\n"
-            texto += f"Prec-CP {prec} CPF {cpf_fmt}\n"
-            texto += f"Valor: {money(desconto)}\n\n"
-
+        texto = boletim_despesa_a_anular(((it["base"], it["preta"], it["vermelha"]) for it in linhas_da),
+                                         abreviaturas_postos())
         if not texto:
             messagebox.showinfo("Info", "Nenhum desconto a anular encontrado.", parent=win)
             return
@@ -571,12 +458,12 @@ def _abrir_dialog_calculadora(parent, militar_id, nome, posto, total_inicial=0.0
         tarifas = [v.get() for _,v in linhas if v.get().strip()!=""]
         soldo = obter_soldo_por_posto(posto) or 0.0
         if not tarifas:
-            valor_dia_liq = _to_float(total_inicial) / 22.0 if _to_float(total_inicial) else 0.0
+            valor_dia_liq = valor_dia(para_float(total_inicial))
             lbl_dia.config(text="Valor do dia (BRUTO pelas tarifas): —")
             lbl_tot.config(text=f"Total mensal (atual LÍQ.): {money(total_inicial)}")
             lbl_cota.config(text="Cota-parte (22d): —")
             lbl_aux.config(text=f"Auxílio Transporte (LÍQ. calculado): {money(total_inicial)}")
-            return {"valor_dia": valor_dia_liq, "aux": _to_float(total_inicial, 0.0)}
+            return {"valor_dia": valor_dia_liq, "aux": para_float(total_inicial, 0.0)}
         else:
             r = calcular_por_tarifas(tarifas, soldo)
             lbl_dia.config(text=f"Valor do dia (BRUTO pelas tarifas): {money(r.get('valor_dia',0.0))}")
@@ -592,7 +479,7 @@ def _abrir_dialog_calculadora(parent, militar_id, nome, posto, total_inicial=0.0
     def _salvar():
         r = _calc_preview()
         # GRAVA SEMPRE O LÍQUIDO (coerente com importação)
-        total_liquido = _to_float(r.get("aux", total_inicial), 0.0)
+        total_liquido = para_float(r.get("aux", total_inicial), 0.0)
         try:
             atualizar_aux_transporte(int(militar_id), float(total_liquido))
             messagebox.showinfo("OK", "Auxílio (LÍQ.) atualizado no banco.", parent=dlg)
@@ -0,0 +1,51 @@
+# interface/backup.py
+import os
+import time
+from tkinter import filedialog, messagebox
+
+from database import db
+from interface.tarefas import em_segundo_plano
+
+INTERVALO_PROGRESSO_MS = 100
+
+def fazer_backup(janela, status_var=None, escolher_destino: bool = False):
+    """
+    Backup do banco com o app aberto, na thread do banco (db.backup).
+    Sem escolher_destino: vai para backups/ e mantém os últimos db.BACKUPS_MANTIDOS.
+    O andamento aparece em status_var.
+    """
+    destino = None
+    if escolher_destino:
+        destino = filedialog.asksaveasfilename(
+            parent=janela, title="Salvar backup como", defaultextension=".db",
+            initialfile=f"militares-{time.strftime('%Y%m%d-%H%M%S')}.db",
+            filetypes=[("Banco SQLite", "*.db")])
+        if not destino:
+            return
+
+    andamento = {"copiadas": 0, "total": 0}
+
+    def _progresso(copiadas, total):  # thread do banco: só guarda; a tela lê em _mostrar()
+        andamento["copiadas"], andamento["total"] = copiadas, total
+
+    def _mostrar():
+        if fut.done():
+            return
+        if status_var is not None and andamento["total"]:
+            status_var.set(f"Backup: {andamento['copiadas'] * 100 // andamento['total']}%")
+        janela.after(INTERVALO_PROGRESSO_MS, _mostrar)
+
+    def _concluido(caminho):
+        if status_var is not None:
+            status_var.set(f"Backup salvo: {os.path.basename(caminho)}")
+        messagebox.showinfo("Backup", f"Backup salvo em:\n{caminho}", parent=janela)
+
+    def _falhou(erro):
+        if status_var is not None:
+            status_var.set("Falha no backup.")
+        messagebox.showerror("Erro", f"Falha ao fazer o backup:\n{erro}", parent=janela)
+
+    fut = em_segundo_plano(janela, db.backup, destino, progresso=_progresso,
+                           ao_concluir=_concluido, ao_falhar=_falhou,
+                           status_var=status_var, mensagem="Fazendo backup…")
+    janela.after(INTERVALO_PROGRESSO_MS, _mostrar)
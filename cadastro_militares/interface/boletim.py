@@ -1,22 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from database.db import buscar_todos
+from database.db import buscar_campos, ids_por_texto, abreviaturas_postos, ORDEM_HIERARQUIA
+from servicos.boletim import BOLETINS_PADRAO, texto_boletim
 import json
 import os
 import time
 
 ARQUIVO_BOLETINS = "boletins.json"
 
-BOLETINS_PADRAO = {
-    "Férias - Ordem de Saque": (
-        "Seja sacado o adicional de férias, relativo ao ano de 2024, "
-        "de acordo com o que prescreve a alínea “d” do inciso II do art. 2º da MP nº 2.215-10, "
-        "de 31 AGO 01, em favor dos militares abaixo relacionados, em virtude de estar previsto para gozar férias "
-        "(30 dias) no mês de SET 25, no 7º período (15 SE25 a 12 AGO 25), conforme publicado no BI Nr 219, "
-        "de 14 NOV 2024, da 4ª Cia PE."
-    ),
-}
-
 # ------------------- Estilo / Tema -------------------
 BG_APP = "#f4f7fb"
 FG_TIT = "#0d47a1"
@@ -122,35 +113,11 @@ class SistemaBoletim:
         style.configure("Treeview.Heading", font=self.FONT_BOLD, foreground=FG_TIT)
 
         # Dados
-        self.militares = buscar_todos()
+        self.militares = buscar_campos(("id", "posto", "nome"), order=ORDEM_HIERARQUIA)  # a busca por nome de guerra é no índice FTS
         self.militares_selecionados = []
         self.militares_filtrados = []
 
-        self.ordem_postos = {
-            "Capitão": 1,
-            "1º Tenente": 2,
-            "2º Tenente": 3,
-            "Subtenente": 4,
-            "1º Sargento": 5,
-            "2º Sargento": 6,
-            "3º Sargento": 7,
-            "Cabo Efetivo Profissional": 8,
-            "Soldado Efetivo Profissional": 9,
-            "Soldado Efetivo Variável": 10
-        }
-
-        self.abreviacoes_postos = {
-            "Capitão": "Cap.",
-            "1º Tenente": "1º Ten.",
-            "2º Tenente": "2º Ten.",
-            "Subtenente": "Sub Ten.",
-            "1º Sargento": "1º Sgt",
-            "2º Sargento": "2º Sgt",
-            "3º Sargento": "3º Sgt",
-            "Cabo Efetivo Profissional": "Cb EP",
-            "Soldado Efetivo Profissional": "Sd EP",
-            "Soldado Efetivo Variável": "Sd EV",
-        }
+        self.abreviacoes_postos = abreviaturas_postos()  # "Cap.", "3º Sgt"... do catálogo de postos
 
         self.textos_boletins = {}
         self.carregar_boletins()
@@ -406,21 +373,21 @@ class SistemaBoletim:
 
     # ------------------- Fluxo Militares -------------------
     def atualizar_lista_militares(self, event=None):
-        termo = (self.entrada_busca.get() or "").strip().upper()
-        filtrados = [
-            m for m in self.militares
-            if termo in (m[2] or "").upper() or termo in (m[3] or "").upper()
-        ]
-        filtrados.sort(key=lambda x: self.ordem_postos.get(x[1], 999))
+        termo = (self.entrada_busca.get() or "").strip()
+        if termo:
+            ids = ids_por_texto(termo)
+            filtrados = [m for m in self.militares if m.id in ids]
+        else:
+            filtrados = list(self.militares)
         self.militares_filtrados = filtrados
 
         # repopula disponíveis
         for i in self.tree_disp.get_children():
             self.tree_disp.delete(i)
         for m in filtrados:
-            posto = m[1] or ""
-            nome = (m[2] or "").upper()
-            iid = f"disp_{m[0]}"
+            posto = m.posto or ""
+            nome = (m.nome or "").upper()
+            iid = f"disp_{m.id}"
             self.tree_disp.insert("", "end", iid=iid, values=(posto, nome))
 
         self._set_status(f"{len(filtrados)} militar(es) encontrado(s).")
@@ -439,26 +406,28 @@ class SistemaBoletim:
 
     def _find_militar_by_id(self, mid):
         for m in self.militares:
-            if m[0] == mid:
+            if m.id == mid:
                 return m
         return None
 
     def adicionar_militares(self):
         ids = self._sel_ids_from_tree(self.tree_disp)
         count = 0
+        selecionados = {m.id for m in self.militares_selecionados}
         for mid in ids:
             mil = self._find_militar_by_id(mid)
-            if mil and (mil not in self.militares_selecionados):
-                self.militares_selecionados.append(mil)
+            if mil and mil.id not in selecionados:
+                selecionados.add(mil.id)
                 count += 1
-        self.militares_selecionados.sort(key=lambda x: (self.ordem_postos.get(x[1], 999), (x[2] or "").upper()))
+        # self.militares já vem na ordem hierárquica do banco
+        self.militares_selecionados = [m for m in self.militares if m.id in selecionados]
         self._rebuild_tree_selected()
         self._set_status(f"{count} adicionado(s). Total: {len(self.militares_selecionados)}.")
 
     def remover_militares(self):
         ids = self._sel_ids_from_tree(self.tree_sel)
         before = len(self.militares_selecionados)
-        self.militares_selecionados = [m for m in self.militares_selecionados if m[0] not in ids]
+        self.militares_selecionados = [m for m in self.militares_selecionados if m.id not in ids]
         self._rebuild_tree_selected()
         removed = before - len(self.militares_selecionados)
         self._set_status(f"{removed} removido(s). Total: {len(self.militares_selecionados)}.")
@@ -467,9 +436,9 @@ class SistemaBoletim:
         for i in self.tree_sel.get_children():
             self.tree_sel.delete(i)
         for m in self.militares_selecionados:
-            posto = m[1] or ""
-            nome = (m[2] or "").upper()
-            iid = f"sel_{m[0]}"
+            posto = m.posto or ""
+            nome = (m.nome or "").upper()
+            iid = f"sel_{m.id}"
             self.tree_sel.insert("", "end", iid=iid, values=(posto, nome))
         self.label_sel.config(text=f"Selecionados ({len(self.militares_selecionados)})")
 
@@ -574,13 +543,8 @@ class SistemaBoletim:
             messagebox.showwarning("Atenção", "Selecione um tipo de boletim.", parent=self.janela)
             return
 
-        texto = self.textos_boletins.get(tipo, f"Modelo de boletim '{tipo}' não definido.\n\n")
-        texto += "\n\n"
-
-        for m in self.militares_selecionados:
-            abreviacao = self.abreviacoes_postos.get(m[1], m[1])
-            nome = (m[2] or "").upper()
-            texto += f"{abreviacao} {nome}\n\n"
+        modelo = self.textos_boletins.get(tipo, f"Modelo de boletim '{tipo}' não definido.\n\n")
+        texto = texto_boletim(modelo, self.militares_selecionados, self.abreviacoes_postos)
 
         self._abrir_preview(titulo=f"Prévia do Boletim — {tipo}", conteudo=texto)
         self._set_status(f"Boletim gerado ({len(self.militares_selecionados)} militar(es)).")
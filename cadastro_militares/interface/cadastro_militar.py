@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-from PIL import Image, ImageTk
 import unicodedata
 import os
 
+from database.fotos import guardar as guardar_foto, miniatura
 from database.db import (
     inserir_militar,
     garantir_catalogos, listar_postos, listar_bancos,
@@ -23,12 +23,6 @@ bancos_default = [
 ]
 
 # ---------- helpers ----------
-def ordenar_postos(seq):
-    def key(s):
-        s = str(s)
-        return (0, postos_default.index(s)) if s in postos_default else (1, s.lower())
-    return sorted(seq, key=key)
-
 def ordenar_bancos(seq):
     return sorted(seq, key=lambda s: str(s).lower())
 
@@ -159,10 +153,9 @@ def abrir_cadastro():
     section_title(r, "Identificação"); r += 2
 
     try:
-        postos_opcoes = listar_postos() or postos_default[:]
+        postos_opcoes = listar_postos() or postos_default[:]  # listar_postos() já vem na ordem hierárquica
     except Exception:
         postos_opcoes = postos_default[:]
-    postos_opcoes = ordenar_postos(postos_opcoes)
 
     def _add_posto():
         nome = simpledialog.askstring("Novo Posto/Graduação", "Digite o nome do posto/graduação:", parent=janela)
@@ -173,7 +166,7 @@ def abrir_cadastro():
         try:
             ok = inserir_posto(nome)
             if not ok: messagebox.showinfo("Info", "Este posto já existe.", parent=janela)
-            novas = ordenar_postos(listar_postos())
+            novas = listar_postos()
             cb_posto['values'] = novas
             if nome in novas: cb_posto.set(nome)
         except Exception as e:
@@ -256,15 +249,18 @@ def abrir_cadastro():
     label_foto_nome.grid(row=r, column=0, columnspan=3, sticky="w", pady=(0, 4))
 
     def carregar_imagem_preview(caminho):
-        if caminho and os.path.exists(caminho):
+        if caminho:
             try:
-                img = Image.open(caminho); img.thumbnail((280, 280))
-                img_tk = ImageTk.PhotoImage(img)
+                # copia para o acervo (database/fotos.py) e mostra a miniatura já pronta
+                chave = guardar_foto(caminho)
+                img_tk = tk.PhotoImage(file=miniatura(chave, 280))
                 label_foto_preview.config(image=img_tk); label_foto_preview.image = img_tk
                 label_foto_nome.config(text=os.path.basename(caminho), fg="#8796a5")
-            except Exception:
+                foto_path.set(chave)
+            except (OSError, ValueError, tk.TclError):
                 label_foto_nome.config(text="Erro ao carregar imagem", fg="#d32f2f")
                 label_foto_preview.config(image=""); label_foto_preview.image = None
+                foto_path.set("")
         else:
             label_foto_preview.config(image=""); label_foto_preview.image = None
             label_foto_nome.config(text="", fg="#8796a5")
@@ -272,7 +268,7 @@ def abrir_cadastro():
     def selecionar_foto():
         caminho = filedialog.askopenfilename(filetypes=[("Imagens", "*.jpg *.png *.jpeg *.bmp *.gif")])
         if caminho:
-            foto_path.set(caminho); carregar_imagem_preview(caminho)
+            carregar_imagem_preview(caminho)
         else:
             foto_path.set(""); carregar_imagem_preview("")
 
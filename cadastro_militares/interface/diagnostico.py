@@ -0,0 +1,117 @@
+# interface/diagnostico.py
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from database import diagnostico
+
+BG_APP = "#e3f2fd"
+FG_TIT = "#0d47a1"
+BTN_BG = "#1976d2"
+BTN_BG_ACTIVE = "#1565c0"
+BTN_FG = "white"
+
+ESTILO_BOTAO = {
+    "font": ("Segoe UI", 11),
+    "bg": BTN_BG,
+    "fg": BTN_FG,
+    "activebackground": BTN_BG_ACTIVE,
+    "activeforeground": BTN_FG,
+    "width": 14,
+    "height": 1,
+    "bd": 0,
+    "cursor": "hand2"
+}
+
+COLUNAS = (
+    ("funcao", "Função", 220, "w"),
+    ("chamadas", "Chamadas", 80, "center"),
+    ("total_ms", "Total (ms)", 90, "e"),
+    ("media_ms", "Média", 70, "e"),
+    ("p50_ms", "p50", 70, "e"),
+    ("p95_ms", "p95", 70, "e"),
+    ("p99_ms", "p99", 70, "e"),
+    ("max_ms", "Máx", 70, "e"),
+    ("linhas", "Linhas", 80, "center"),
+)
+
+def exportar_diagnostico(master=None):
+    caminho = filedialog.asksaveasfilename(
+        parent=master, title="Exportar diagnóstico", defaultextension=".json",
+        initialfile="diagnostico_db.json", filetypes=[("JSON", "*.json")])
+    if not caminho:
+        return
+    try:
+        diagnostico.exportar_json(caminho)
+        messagebox.showinfo("Diagnóstico", f"Arquivo salvo em:\n{caminho}", parent=master)
+    except Exception as e:
+        messagebox.showerror("Erro", f"Falha ao exportar:\n{e}", parent=master)
+
+def abrir_diagnostico(master):
+
+    win = tk.Toplevel(master)
+    win.title("Diagnóstico do banco de dados")
+    win.geometry("920x620")
+    win.configure(bg=BG_APP)
+
+    tk.Label(win, text="TEMPO POR FUNÇÃO DO BANCO",
+             font=("Segoe UI", 16, "bold"), bg=BG_APP, fg=FG_TIT).pack(pady=(18, 4))
+    estado_var = tk.StringVar()
+    tk.Label(win, textvariable=estado_var, font=("Segoe UI", 10), bg=BG_APP, fg="#37474f").pack()
+
+    frame = tk.Frame(win, bg=BG_APP); frame.pack(fill="both", expand=True, padx=16, pady=8)
+    tree = ttk.Treeview(frame, columns=[c[0] for c in COLUNAS], show="headings", height=14)
+    for chave, titulo, largura, ancora in COLUNAS:
+        tree.heading(chave, text=titulo)
+        tree.column(chave, width=largura, anchor=ancora)
+    ysb = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+    tree.configure(yscrollcommand=ysb.set)
+    tree.pack(side="left", fill="both", expand=True)
+    ysb.pack(side="right", fill="y")
+
+    tk.Label(win, text="SQL executado pela função selecionada (execuções):",
+             font=("Segoe UI", 10, "bold"), bg=BG_APP, anchor="w").pack(fill="x", padx=16)
+    txt_sql = tk.Text(win, height=8, font=("Consolas", 9), wrap="none")
+    txt_sql.pack(fill="x", padx=16, pady=(2, 8))
+
+    dados = {}
+
+    def _popular():
+        dados.clear()
+        dados.update(diagnostico.estatisticas())
+        tree.delete(*tree.get_children())
+        for nome, e in dados.items():
+            tree.insert("", "end", iid=nome, values=(nome, *(e[c[0]] for c in COLUNAS[1:])))
+        estado_var.set("Medição LIGADA" if diagnostico.ATIVO else
+                       "Medição desligada — ligue, use as telas e clique em Atualizar")
+        btn_ativar.config(text="Desligar" if diagnostico.ATIVO else "Ligar")
+        txt_sql.delete("1.0", "end")
+
+    def _mostrar_sql(_=None):
+        sel = tree.selection()
+        txt_sql.delete("1.0", "end")
+        if not sel or sel[0] not in dados:
+            return
+        for texto, n in dados[sel[0]]["sql"].items():
+            txt_sql.insert("end", f"{n:>6}  {texto}\n")
+
+    def _alternar():
+        if diagnostico.ATIVO:
+            diagnostico.desativar()
+        else:
+            diagnostico.ativar()
+        _popular()
+
+    def _zerar():
+        diagnostico.zerar()
+        _popular()
+
+    tree.bind("<<TreeviewSelect>>", _mostrar_sql)
+
+    barra = tk.Frame(win, bg=BG_APP); barra.pack(pady=(0, 14))
+    btn_ativar = tk.Button(barra, text="Ligar", command=_alternar, **ESTILO_BOTAO)
+    btn_ativar.pack(side="left", padx=5)
+    tk.Button(barra, text="Atualizar", command=_popular, **ESTILO_BOTAO).pack(side="left", padx=5)
+    tk.Button(barra, text="Zerar", command=_zerar, **ESTILO_BOTAO).pack(side="left", padx=5)
+    tk.Button(barra, text="Exportar JSON", command=lambda: exportar_diagnostico(win),
+              **ESTILO_BOTAO).pack(side="left", padx=5)
+
+    _popular()
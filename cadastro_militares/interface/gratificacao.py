@@ -3,7 +3,11 @@ from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 
 # DB
-from database.db import buscar_todos, obter_soldo_por_posto
+from database.db import (
+    buscar_campos, obter_soldos_em, obter_soldos_dict, ids_por_texto, siglas_postos, versao_atual, ORDEM_HIERARQUIA
+)
+from servicos.formatos import money, dias_periodo
+from servicos.gratificacao import boletim_gratificacao, calcular_gratificacao, valor_dia
 
 # ---------- tema/estilo ----------
 BG_APP = "#e3f2fd"
@@ -13,138 +17,14 @@ CARD_BG = "#ffffff"
 PRIMARY = "#1976d2"
 PRIMARY_HOVER = "#1565c0"
 
-# ---------- abreviações P/G (MAIÚSCULO) ----------
-ABREV_PG = {
-    "Capitão": "CAP",
-    "1º Tenente": "1º TEN",
-    "2º Tenente": "2º TEN",
-    "Subtenente": "ST",
-    "1º Sargento": "1º SGT",
-    "2º Sargento": "2º SGT",
-    "3º Sargento": "3º SGT",
-    "Aspirante": "ASP",
-    "Cabo Efetivo Profissional": "CB EF PROFL",
-    "Soldado Efetivo Profissional": "SD EF PROFL",
-    "Soldado Efetivo Variável": "SD EF VRV",
-}
-
-# ---------- hierarquia (ordem) ----------
-ORDEM_HIERARQUIA = [
-    "Capitão", "1º Tenente", "2º Tenente", "Subtenente",
-    "1º Sargento", "2º Sargento", "3º Sargento",
-    "Aspirante",
-    "Cabo Efetivo Profissional", "Soldado Efetivo Profissional", "Soldado Efetivo Variável",
-]
-ORD_IDX = {p: i for i, p in enumerate(ORDEM_HIERARQUIA)}
-
-# ---------- helpers ----------
-def money(v) -> str:
-    try:
-        x = float(v)
-    except Exception:
-        x = 0.0
-    s = f"{x:,.2f}"
-    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
-
-def digitos(s: str) -> str:
-    return "".join(ch for ch in str(s) if ch.isdigit())
-
-def formatar_cpf(cpf: str) -> str:
-    s = digitos(cpf)
-    return f"{s[0:3]}.{s[3:6]}.{s[6:9]}-{s[9:11]}" if len(s) == 11 else cpf
-
-MESES_ABR = ["JAN","FEV","MAR","ABR","MAI","JUN","JUL","AGO","SET","OUT","NOV","DEZ"]
-def fmt_data_abrev(dt: datetime) -> str:
-    return f"{dt.day:02d} {MESES_ABR[dt.month-1]} {str(dt.year)[-2:]}"
-
-def dias_periodo(d1: str, d2: str) -> int:
-    """Datas em dd/mm/aaaa. Conta inclusivo (ex.: 05 a 13 -> 9)."""
-    try:
-        a = datetime.strptime(d1.strip(), "%d/%m/%Y")
-        b = datetime.strptime(d2.strip(), "%d/%m/%Y")
-        if b < a:
-            a, b = b, a
-        return (b - a).days + 1
-    except Exception:
-        return 0
-
-# ----- número por extenso (pt-BR) p/ dinheiro (simples) -----
-_UN = ["zero","um","dois","três","quatro","cinco","seis","sete","oito","nove"]
-_DEZ = ["dez","onze","doze","treze","catorze","quinze","dezesseis","dezessete","dezoito","dezenove"]
-_DZ = ["", "", "vinte","trinta","quarenta","cinquenta","sessenta","setenta","oitenta","noventa"]
-_CN = ["","cento","duzentos","trezentos","quatrocentos","quinhentos","seiscentos","setecentos","oitocentos","novecentos"]
-
-def _centena_por_extenso(n):
-    n = int(n)
-    if n == 0: return ""
-    if n == 100: return "cem"
-    c = n // 100
-    r = n % 100
-    partes = []
-    if c: partes.append(_CN[c])
-    if r:
-        if r < 10: partes.append(_UN[r])
-        elif 10 <= r < 20: partes.append(_DEZ[r-10])
-        else:
-            d = r // 10
-            u = r % 10
-            if u: partes.append(f"{_DZ[d]} e {_UN[u]}")
-            else: partes.append(_DZ[d])
-    return " e ".join(p for p in partes if p)
-
-def _milhares(n):
-    if n == 0: return ""
-    if n == 1: return "mil"
-    return f"{_centena_por_extenso(n)} mil"
-
-def numero_em_reais_extenso(valor: float) -> str:
-    valor = round(float(valor) + 1e-9, 2)
-    inteiro = int(valor)
-    cent = int(round((valor - inteiro) * 100))
-
-    partes = []
-    milhoes = inteiro // 1_000_000
-    resto = inteiro % 1_000_000
-    milhares = resto // 1000
-    centenas = resto % 1000
-
-    if milhoes:
-        partes.append("um milhão" if milhoes == 1 else f"{_centena_por_extenso(milhoes)} milhões")
-    if milhares:
-        partes.append(_milhares(milhares))
-    if centenas:
-        partes.append(_centena_por_extenso(centenas))
-    if not (milhoes or milhares or centenas):
-        partes.append("zero")
-
-    reais = "real" if inteiro == 1 else "reais"
-    frase = " ".join(partes) + f" {reais}"
-
-    if cent:
-        centavos = "centavo" if cent == 1 else "centavos"
-        frase += f" e {_centena_por_extenso(cent)} {centavos}"
-    return frase
-
 # ---------- dados base ----------
 def _carregar_militares():
-    regs = []
     try:
-        lista = buscar_todos()
+        # só o que a tela e o boletim usam; os demais atributos do Militar ficam None
+        return buscar_campos(("id", "posto", "nome", "cpf", "prec_cp"), order=ORDEM_HIERARQUIA)
     except Exception as e:
         messagebox.showerror("Erro", f"Erro ao buscar militares:\n{e}")
-        return regs
-    for it in lista:
-        # (id, posto, nome, nome_guerra, cpf, prec, idt, banco, ag, conta, foto, ...)
-        regs.append({
-            "ID": it[0],
-            "Posto": it[1],
-            "Nome": it[2],
-            "CPF": it[4],
-            "PREC": it[5],
-        })
-    # ordena por hierarquia + nome
-    regs.sort(key=lambda d: (ORD_IDX.get(d["Posto"], 999), str(d["Nome"] or "").lower()))
-    return regs
+        return []
 
 # =========================
 #   Janela Gratificação 2%
@@ -292,21 +172,35 @@ def abrir_gratificacao_representacao(master):
     tree.tag_configure("even", background="#ffffff")
 
     # carrega base + popular
+    versao_base = versao_atual()
     base_regs = _carregar_militares()
+    siglas = siglas_postos()  # P/G em maiúsculas, do catálogo de postos
+
+    def _soldos_na_saida():
+        # soldo vigente na data de saída (histórico de soldos); data incompleta: o de hoje
+        try:
+            return obter_soldos_em(ent_saida.get())  # cache de db.py: não relê a tabela a cada tecla
+        except ValueError:
+            return obter_soldos_dict()
+
+    soldos_lista = {}  # soldos usados na última pintura da lista
 
     def _popular_lista():
+        nonlocal soldos_lista
         tree.delete(*tree.get_children())
-        q = (busca_var.get() or "").strip().lower()
+        q = (busca_var.get() or "").strip()
+        ids = ids_por_texto(q) if q else None
+        soldos = soldos_lista = _soldos_na_saida()
         count = 0
-        for i, d in enumerate(base_regs):
-            if q and q not in str(d["Nome"]).lower():
+        for i, m in enumerate(base_regs):
+            if ids is not None and m.id not in ids:
                 continue
-            soldo = float(obter_soldo_por_posto(d["Posto"]) or 0.0)
-            vdia = soldo * 0.02
+            soldo = soldos.get(m.posto, 0.0)
+            vdia = valor_dia(soldo)
             tag = "even" if i % 2 == 0 else "odd"
             tree.insert("", "end",
-                        values=(d["Nome"], d["Posto"], money(soldo), money(vdia)),
-                        iid=str(d["ID"]), tags=(tag,))
+                        values=(m.nome, m.posto, money(soldo), money(vdia)),
+                        iid=str(m.id), tags=(tag,))
             count += 1
         if count == 0:
             tree.insert("", "end",
@@ -321,8 +215,12 @@ def abrir_gratificacao_representacao(master):
         return [iid for iid in tree.get_children("") if iid != "__vazio__"]
 
     def _recarregar():
-        nonlocal base_regs
-        base_regs = _carregar_militares()
+        nonlocal base_regs, siglas, versao_base
+        versao = versao_atual()
+        if versao != versao_base:  # nada gravado desde a última carga: só refaz a lista
+            versao_base = versao
+            base_regs = _carregar_militares()
+            siglas = siglas_postos()
         _popular_lista()
 
     btn_reload.config(command=_recarregar)
@@ -369,44 +267,53 @@ def abrir_gratificacao_representacao(master):
             dline["total"] = total
             dline["dias"] = dd
 
+    def _atualiza_soldos():
+        """Outra data de saída pode cair em outra vigência: refaz lista e 2%/dia se o soldo mudou."""
+        soldos = _soldos_na_saida()
+        if soldos == soldos_lista:
+            return
+        _popular_lista()
+        for dline in linhas.values():
+            vdia = valor_dia(soldos.get(dline["dados"].posto, 0.0))
+            dline["val_dia"] = vdia
+            dline["lbl_vdia"]["text"] = money(vdia)
+
     def _atualiza_resumo():
         d = dias_periodo(ent_saida.get(), ent_retorno.get())
         dias_top_var.set(d)
         resumo_var.set(f"Período comum: {ent_saida.get()} a {ent_retorno.get()}  •  Dias (inclusivo): {d}")
+        _atualiza_soldos()
         _recalc_all_totais()
 
     def _add_rows(ids):
         dd = dias_top_var.get()
-        for iid in ids:
-            if iid in linhas:
-                continue
-            d = next((x for x in base_regs if str(x["ID"]) == iid), None)
-            if not d:
-                continue
-            soldo = float(obter_soldo_por_posto(d["Posto"]) or 0.0)
-            vdia = soldo * 0.02
+        por_id = {str(x.id): x for x in base_regs}
+        novos = [por_id[iid] for iid in dict.fromkeys(ids) if iid not in linhas and iid in por_id]
+        for linha in calcular_gratificacao(novos, _soldos_na_saida(), dd):
+            d, vdia, iid = linha.militar, linha.valor_dia, str(linha.militar.id)
 
             row = ttk.Frame(inner, style="Card.TFrame")
             row.pack(fill="x", pady=4)
             row_inner = tk.Frame(row, bg="#fafafa", highlightbackground=BORDER, highlightthickness=1)
             row_inner.pack(fill="x", padx=2, pady=2)
 
-            tk.Label(row_inner, text=str(d["Nome"]).upper(), bg="#fafafa",
+            tk.Label(row_inner, text=str(d.nome).upper(), bg="#fafafa",
                      font=("Segoe UI", 10, "bold"), width=34, anchor="w").grid(row=0, column=0, padx=6, pady=6, sticky="w")
-            tk.Label(row_inner, text=ABREV_PG.get(d["Posto"], d["Posto"].upper()),
+            tk.Label(row_inner, text=siglas.get(d.posto, d.posto.upper()),
                      bg="#fafafa", width=8, font=("Segoe UI", 10)).grid(row=0, column=1, padx=6, pady=6, sticky="w")
 
-            ttk.Label(row_inner, text=money(vdia), width=14).grid(row=0, column=2, padx=6, pady=6, sticky="w")
+            lbl_vdia = ttk.Label(row_inner, text=money(vdia), width=14)
+            lbl_vdia.grid(row=0, column=2, padx=6, pady=6, sticky="w")
             lbl_dias = ttk.Label(row_inner, text=str(dd), width=16)
             lbl_dias.grid(row=0, column=3, padx=6, pady=6, sticky="w")
-            lbl_total = ttk.Label(row_inner, text=money(vdia * dd))
+            lbl_total = ttk.Label(row_inner, text=money(linha.total))
             lbl_total.grid(row=0, column=4, padx=6, pady=6, sticky="w")
             lbl_total.configure(font=("Segoe UI", 10, "bold"))
 
             linhas[iid] = {
                 "row": row, "dados": d,
-                "lbl_dias": lbl_dias, "lbl_total": lbl_total,
-                "val_dia": vdia, "total": vdia * dd, "dias": dd
+                "lbl_vdia": lbl_vdia, "lbl_dias": lbl_dias, "lbl_total": lbl_total,
+                "val_dia": vdia, "total": linha.total, "dias": dd
             }
 
     def _remove_selected_rows():
@@ -450,36 +357,11 @@ def abrir_gratificacao_representacao(master):
             messagebox.showerror("Erro", "Datas do cabeçalho inválidas. Use dd/mm/aaaa.", parent=win)
             return
 
-        local = ent_local.get().strip()
-        finalidade = ent_finalidade.get().strip()
-        bi = ent_bi.get().strip()
         dias_comuns = dias_top_var.get()
-
-        header = (
-            f"Seja sacada a gratificação de representação normal (2%), dos seguintes militares abaixo relacionados, "
-            f"referente ao deslocamento a serviço, para a {local}, em {fmt_data_abrev(dt_saida)}, "
-            f"com a finalidade de {finalidade}, tendo retornado em {fmt_data_abrev(dt_retorno)}, "
-            f"que teve seu deslocamento autorizado pelo {bi}.\n\n"
-        )
-
-        corpo = ""
-        for iid, dline in linhas.items():
-            d = dline["dados"]
-            total = dline["val_dia"] * dias_comuns
-            total_ext = numero_em_reais_extenso(total)
-            abrev = ABREV_PG.get(d["Posto"], d["Posto"].upper())
-            nome_up = str(d["Nome"] or "").upper()
-            prec = str(d["PREC"] or "")
-            cpf_fmt = formatar_cpf(d["CPF"])
-            dias_ext = numero_em_reais_extenso(dias_comuns).replace(" reais","").replace(" real","")
-
-            corpo += f"{abrev} {nome_up}\n"
-            corpo += f"Prec-CP {prec} CPF {cpf_fmt}\n"
-            corpo += f"Valor solicitado: {money(total)} ({total_ext});\n"
-            corpo += f"Período: {fmt_data_abrev(dt_saida)} a {fmt_data_abrev(dt_retorno)};\n"
-            corpo += f"Quantidade de dias: {dias_comuns} ({dias_ext}) dias\n\n"
-
-        texto = header + corpo
+        selecionados = calcular_gratificacao([dline["dados"] for dline in linhas.values()],
+                                             _soldos_na_saida(), dias_comuns)
+        texto = boletim_gratificacao(selecionados, dt_saida, dt_retorno, siglas,
+                                     ent_local.get().strip(), ent_finalidade.get().strip(), ent_bi.get().strip())
 
         # diálogo de prévia (com botões sempre visíveis)
         dlg = tk.Toplevel(win)
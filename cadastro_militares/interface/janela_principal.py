@@ -8,6 +8,9 @@ from interface.soldos import abrir_soldos
 from interface.auxilio_transporte import abrir_auxilio_transporte
 from relatorios.relacao_pessoal import gerar_relacao_pessoal
 from interface.gratificacao import abrir_gratificacao_representacao
+from interface.diagnostico import abrir_diagnostico, exportar_diagnostico
+from interface.backup import fazer_backup
+from database import diagnostico
 
 # ---------- Paleta/estilo ----------
 BG_APP = "#e3f2fd"
@@ -123,6 +126,9 @@ def iniciar_sistema():
     m_arq.add_command(label="Cadastrar Militar\t Ctrl+N", command=abrir_cadastro)
     m_arq.add_command(label="Listar Militares\t Ctrl+L", command=abrir_listagem)
     m_arq.add_separator()
+    m_arq.add_command(label="Fazer backup agora", command=lambda: fazer_backup(janela, status_var))
+    m_arq.add_command(label="Salvar backup como...", command=lambda: fazer_backup(janela, status_var, True))
+    m_arq.add_separator()
     m_arq.add_command(label="Sair\t Esc", command=janela.destroy)
     menubar.add_cascade(label="Arquivo", menu=m_arq)
 
@@ -134,6 +140,20 @@ def iniciar_sistema():
     m_tools.add_command(label="Relação Pessoal\t Ctrl+R", command=lambda: gerar_relacao_pessoal(janela))
     menubar.add_cascade(label="Ferramentas", menu=m_tools)
 
+    medicao_var = tk.BooleanVar(value=diagnostico.ATIVO)
+    def alternar_medicao():
+        diagnostico.ativar() if medicao_var.get() else diagnostico.desativar()
+    def zerar_medicao():
+        diagnostico.zerar()
+        status_var.set("Contadores de diagnóstico zerados.")
+
+    m_diag = tk.Menu(menubar, tearoff=0)
+    m_diag.add_checkbutton(label="Medir tempo do banco", variable=medicao_var, command=alternar_medicao)
+    m_diag.add_command(label="Tempo por função...", command=lambda: abrir_diagnostico(janela))
+    m_diag.add_command(label="Exportar JSON...", command=lambda: exportar_diagnostico(janela))
+    m_diag.add_command(label="Zerar contadores", command=zerar_medicao)
+    menubar.add_cascade(label="Diagnóstico", menu=m_diag)
+
     def sobre():
         messagebox.showinfo(
             "Sobre",
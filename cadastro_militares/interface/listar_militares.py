@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-from database.db import buscar_todos, excluir_militar, atualizar_militar
+from database.db import (
+    buscar_pagina, contar_militares, contar_por_posto, excluir_militar, atualizar_militar,
+    buscar_para_edicao, ConflitoDeEdicao, BancoOcupado, historico_militar
+)
+from database.fotos import guardar as guardar_foto, miniatura
+from database.modelos import CAMPOS_MILITAR, data_br, reais_txt
+from interface.tarefas import avisar_erro, em_segundo_plano
 from impor_export import exportar_para_excel, importar_de_excel
-import os
 import re
 
 # ---- colunas completas (do banco) ----
@@ -13,27 +17,16 @@ COLS_FULL = [
     "Endereço", "CEP", "Recebe Pré Escolar", "Valor Pré Escolar",
     "Recebe Auxílio Transporte", "Valor Auxílio Transporte", "Possui PNR"
 ]
+ROTULO_COLUNA = dict(zip(CAMPOS_MILITAR, COLS_FULL))  # coluna do banco -> rótulo (histórico)
 
 # ---- colunas visíveis na lista ----
 COLS_VIEW = ["Posto", "Ano", "Nome", "Nome de Guerra", "CPF", "PREC-CP", "IDT Militar"]
 
-# mapeamento (índices do registro completo -> ordem das colunas visíveis)
-IDX_ID    = 0
-IDX_POSTO = 1
-IDX_NOME  = 2
-IDX_NG    = 3
-IDX_CPF   = 4
-IDX_PREC  = 5
-IDX_IDT   = 6
-IDX_FOTO  = 10
-IDX_ANO   = 11
-
 postos = [
     "Capitão", "1º Tenente", "2º Tenente", "Subtenente",
     "1º Sargento", "2º Sargento", "3º Sargento",
     "Cabo Efetivo Profissional", "Soldado Efetivo Profissional", "Soldado Efetivo Variável"
 ]
-ordem_postos = {posto: i+1 for i, posto in enumerate(postos)}
 
 cores_postos = {
     "Capitão": "#A5D6A7",
@@ -130,7 +123,7 @@ def abrir_listagem():
     tree = ttk.Treeview(frame_tree, columns=COLS_VIEW, show="headings", selectmode="browse")
     vsb = ttk.Scrollbar(frame_tree, orient="vertical", command=tree.yview)
     hsb = ttk.Scrollbar(frame_tree, orient="horizontal", command=tree.xview)
-    tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+    tree.configure(yscrollcommand=lambda a, b: _on_scroll(a, b), xscrollcommand=hsb.set)
 
     frame_tree.grid_columnconfigure(0, weight=1)
     frame_tree.grid_rowconfigure(0, weight=1)
@@ -186,8 +179,11 @@ def abrir_listagem():
              font=("Segoe UI", 9), bg="#eaf3ff", fg="#37474f").pack(fill="x", side="bottom")
 
     # ---------- Dados e estado ----------
-    dados_completos = []   # lista com as linhas do banco (completas)
-    item_full = {}         # iid -> linha completa
+    PAGINA = 200           # linhas buscadas por vez (o resto vem ao rolar)
+    filtros_atuais = {}    # {"posto": ..., "texto": ...} para buscar_pagina()
+    proxima_chave = None   # continuação da listagem; None = tudo carregado
+    pagina_agendada = False
+    item_full = {}         # iid -> Militar
 
     def formatar_cpf(cpf):
         cpf = str(cpf or "")
@@ -196,51 +192,102 @@ def abrir_listagem():
     def cpf_sem_pontuacao(cpf):
         return re.sub(r"\D+", "", str(cpf or ""))
 
-    def atualizar_status(lista):
-        status_var.set(f"Mostrando {len(lista)} de {len(dados_completos)} registros.")
+    def _contagens(filtros):
+        filtrados = contar_militares(filtros)
+        return filtrados, (contar_militares() if filtros else filtrados)
+
+    def mostrar_status(contagens):
+        filtrados, total = contagens
+        status_var.set(f"Mostrando {filtrados} de {total} registros.")
 
     def carregar_militares():
-        nonlocal dados_completos
-        dados_completos = sorted(
-            buscar_todos(),
-            key=lambda m: (ordem_postos.get(m[IDX_POSTO], 999), str(m[IDX_NOME] or "").lower())
-        )
-        aplicar_filtro()
-        auto_resize()
+        aplicar_filtro(depois=auto_resize)
 
-    def montar_linha_visivel(full_row):
+    def montar_linha_visivel(full):
         return (
-            full_row[IDX_POSTO],
-            full_row[IDX_ANO],
-            (full_row[IDX_NOME] or "").upper(),
-            (full_row[IDX_NG] or "").upper(),
-            formatar_cpf(full_row[IDX_CPF]),
-            full_row[IDX_PREC],
-            full_row[IDX_IDT],
+            full.posto,
+            full.ano,
+            (full.nome or "").upper(),
+            (full.nome_guerra or "").upper(),
+            formatar_cpf(full.cpf),
+            full.prec_cp,
+            full.idt,
         )
 
-    def atualizar_treeview(lista_full):
-        tree.delete(*tree.get_children())
-        item_full.clear()
+    def inserir_linhas(lista_full):
         for full in lista_full:
             vis = montar_linha_visivel(full)
-            cor = cores_postos.get(full[IDX_POSTO], "#FFFFFF")
+            cor = cores_postos.get(full.posto, "#FFFFFF")
             iid = tree.insert("", "end", values=vis, tags=(cor,))
             tree.tag_configure(cor, background=cor)
             item_full[iid] = full
-        atualizar_status(lista_full)
 
-    def aplicar_filtro(_event=None):
-        termo = entrada_busca.get().strip().lower()
+    # As consultas rodam na thread do banco (interface/tarefas.py); todas usam a chave
+    # "lista", então um filtro novo descarta páginas ainda em andamento do anterior.
+    def _mostrar_pagina(resultado):
+        nonlocal proxima_chave, pagina_agendada
+        pagina, proxima_chave = resultado
+        pagina_agendada = False
+        inserir_linhas(pagina)
+
+    def carregar_mais():
+        """Acrescenta a próxima página (chamada ao rolar perto do fim)."""
+        if proxima_chave is None:
+            return
+        em_segundo_plano(janela, buscar_pagina, proxima_chave, PAGINA, dict(filtros_atuais),
+                         ao_concluir=_mostrar_pagina, chave="lista")
+
+    def _paginas_restantes(chave, filtros):
+        resto = []
+        while chave is not None:
+            pagina, chave = buscar_pagina(chave, PAGINA * 10, filtros)
+            resto.extend(pagina)
+        return resto, None
+
+    def carregar_tudo(depois=None):
+        """Busca todas as páginas que faltam e chama depois() com a lista completa na tela."""
+        def _concluir(resultado):
+            _mostrar_pagina(resultado)
+            if depois:
+                depois()
+        if proxima_chave is None:
+            if depois:
+                depois()
+            return
+        em_segundo_plano(janela, _paginas_restantes, proxima_chave, dict(filtros_atuais),
+                         ao_concluir=_concluir, status_var=status_var, chave="lista")
+
+    def _on_scroll(primeiro, ultimo):
+        nonlocal pagina_agendada
+        vsb.set(primeiro, ultimo)
+        if proxima_chave is not None and not pagina_agendada and float(ultimo) > 0.9:
+            pagina_agendada = True
+            janela.after_idle(carregar_mais)
+
+    def _primeira_pagina(filtros):
+        return buscar_pagina(None, PAGINA, filtros), _contagens(filtros)
+
+    def aplicar_filtro(_event=None, depois=None):
+        nonlocal proxima_chave
+        termo = entrada_busca.get().strip()
         filtro_posto = combo_postos.get()
-        filtrado = dados_completos
+        filtros_atuais.clear()
         if termo:
-            filtrado = [m for m in filtrado
-                        if termo in (str(m[IDX_NOME] or "").lower())
-                        or termo in (str(m[IDX_NG] or "").lower())]
+            filtros_atuais["texto"] = termo  # índice FTS: ignora acentos e maiúsculas
         if filtro_posto != "Todos":
-            filtrado = [m for m in filtrado if m[IDX_POSTO] == filtro_posto]
-        atualizar_treeview(filtrado)
+            filtros_atuais["posto"] = filtro_posto
+        proxima_chave = None  # até a primeira página chegar, rolar não pede mais nada
+
+        def _concluir(resultado):
+            resultado_pagina, contagens = resultado
+            tree.delete(*tree.get_children())
+            item_full.clear()
+            _mostrar_pagina(resultado_pagina)
+            mostrar_status(contagens)
+            if depois:
+                depois()
+        em_segundo_plano(janela, _primeira_pagina, dict(filtros_atuais),
+                         ao_concluir=_concluir, status_var=status_var, chave="lista")
 
     def limpar_filtros():
         entrada_busca.delete(0, "end")
@@ -253,9 +300,23 @@ def abrir_listagem():
 
     # ---------- Ordenação ----------
     def ordenar_coluna(col, reverso=False):
+        if col == "Posto":
+            # o banco já entrega na ordem hierárquica (postos.ordem); decrescente inverte os blocos
+            if reverso:
+                aplicar_filtro(depois=lambda: carregar_tudo(lambda: _ordenar(col, reverso)))
+            else:
+                aplicar_filtro()
+                tree.heading(col, command=lambda: ordenar_coluna(col, True))
+            return
+        carregar_tudo(lambda: _ordenar(col, reverso))  # ordena a lista inteira, não só as páginas já vistas
+
+    def _ordenar(col, reverso):
         dados = [(tree.set(k, col), k) for k in tree.get_children("")]
         if col == "Posto":
-            dados.sort(key=lambda x: ordem_postos.get(x[0], 999), reverse=reverso)
+            posicao = {}
+            for posto, _ in dados:
+                posicao.setdefault(posto, len(posicao))
+            dados.sort(key=lambda x: posicao[x[0]], reverse=True)
         elif col == "Ano":
             def ano_key(v):
                 try:
@@ -282,17 +343,17 @@ def abrir_listagem():
             preview.withdraw()
             return
         full = item_full[iid]
-        caminho_foto = full[IDX_FOTO]
-        if caminho_foto and os.path.exists(caminho_foto):
+        png = miniatura(full.foto, 260)  # miniatura pronta do acervo (database/fotos.py)
+        if png:
             try:
-                img = Image.open(caminho_foto)
-                img.thumbnail((260, 260), Image.LANCZOS)
-                foto_tk = ImageTk.PhotoImage(img)
-                label_preview.configure(image=foto_tk)
-                label_preview.image = foto_tk
+                if getattr(label_preview, "png", None) != png:  # mesmo militar: só acompanha o mouse
+                    foto_tk = tk.PhotoImage(file=png)
+                    label_preview.configure(image=foto_tk)
+                    label_preview.image = foto_tk
+                    label_preview.png = png
                 preview.geometry(f"+{event.x_root+20}+{event.y_root}")
                 preview.deiconify()
-            except Exception:
+            except tk.TclError:
                 preview.withdraw()
         else:
             preview.withdraw()
@@ -355,7 +416,7 @@ def abrir_listagem():
         if not full:
             return
         janela.clipboard_clear()
-        janela.clipboard_append(cpf_sem_pontuacao_local(full[IDX_CPF]))
+        janela.clipboard_append(cpf_sem_pontuacao_local(full.cpf))
         status_var.set("CPF (sem pontuação) copiado.")
 
     def copiar_prec():
@@ -366,7 +427,7 @@ def abrir_listagem():
         if not full:
             return
         janela.clipboard_clear()
-        janela.clipboard_append(str(full[IDX_PREC] or ""))
+        janela.clipboard_append(str(full.prec_cp or ""))
         status_var.set("PREC-CP copiado.")
 
     def copiar_idt():
@@ -377,7 +438,7 @@ def abrir_listagem():
         if not full:
             return
         janela.clipboard_clear()
-        janela.clipboard_append(str(full[IDX_IDT] or ""))
+        janela.clipboard_append(str(full.idt or ""))
         status_var.set("IDT copiado.")
 
     # atalhos
@@ -400,14 +461,16 @@ def abrir_listagem():
         if not full:
             return
         if messagebox.askyesno("Confirmar", "Tem certeza que deseja excluir o militar selecionado?", parent=janela):
-            excluir_militar(full[IDX_ID])
+            try:
+                excluir_militar(full.id)
+            except BancoOcupado as e:
+                avisar_erro(janela, e)
+                return
             carregar_militares()
 
     def mostrar_quantidade():
-        contagem = {posto: 0 for posto in postos}
-        for m in dados_completos:
-            if m[IDX_POSTO] in contagem:
-                contagem[m[IDX_POSTO]] += 1
+        por_posto = contar_por_posto()
+        contagem = {posto: por_posto.get(posto, 0) for posto in postos}
         total = sum(contagem.values())
 
         winq = tk.Toplevel(janela)
@@ -431,6 +494,48 @@ def abrir_listagem():
             tree_qtd.insert("", "end", values=(posto, qtd))
         tree_qtd.insert("", "end", values=("TOTAL", total))
 
+    def _valor_historico(coluna, valor):
+        if valor is None:
+            return ""
+        if coluna and coluna.endswith("_centavos"):
+            return reais_txt(valor)
+        if coluna in ("data_nascimento", "data_praca"):
+            return data_br(valor)
+        return str(valor)
+
+    def mostrar_historico():
+        full = _get_full_selected()
+        if not full:
+            return
+
+        winh = tk.Toplevel(janela)
+        winh.title(f"Histórico de alterações – {full.nome or ''}")
+        winh.geometry("900x480")
+        winh.configure(bg="#f5f5f5")
+        winh.transient(janela)
+
+        colunas = ("Quando", "Usuário", "Campo", "Antes", "Depois")
+        tree_h = ttk.Treeview(winh, columns=colunas, show="headings")
+        for col, larg in zip(colunas, (170, 170, 190, 170, 170)):
+            tree_h.heading(col, text=col)
+            tree_h.column(col, anchor="w", width=larg)
+        tree_h.pack(padx=15, pady=15, fill="both", expand=True)
+
+        def _mostrar(registros):
+            for r in registros:
+                if r.operacao == "alterar":
+                    campo = ROTULO_COLUNA.get(r.coluna, r.coluna)
+                else:
+                    campo = "(inclusão)" if r.operacao == "inserir" else "(exclusão)"
+                tree_h.insert("", "end", values=(
+                    r.quando[:19], r.usuario or "", campo,
+                    _valor_historico(r.coluna, r.valor_antigo), _valor_historico(r.coluna, r.valor_novo)))
+            if not registros:
+                tree_h.insert("", "end", values=("", "", "Nenhuma alteração registrada.", "", ""))
+
+        em_segundo_plano(winh, historico_militar, full.id, ao_concluir=_mostrar,
+                         status_var=status_var, mensagem="Carregando histórico…")
+
     # ======== CARTEIRA ========
     def mostrar_carteira():
         full = _get_full_selected()
@@ -440,7 +545,7 @@ def abrir_listagem():
 
         # ------- janela -------
         win = tk.Toplevel(janela)
-        win.title(f"Carteira – {dados[IDX_NOME] or ''}")
+        win.title(f"Carteira – {dados.nome or ''}")
         win.geometry("1200x900")
         win.configure(bg="#e3f2fd")
         win.transient(janela)
@@ -543,17 +648,16 @@ def abrir_listagem():
         foto_wrap.pack(padx=8, pady=8)
         lbl_foto = tk.Label(foto_wrap, bg="#f1f5fb"); lbl_foto.pack(padx=10, pady=10)
 
-        caminho_foto = dados[IDX_FOTO]
-        def _load_photo(path):
-            if path and os.path.exists(path):
+        caminho_foto = dados.foto
+        def _load_photo(valor):
+            png = miniatura(valor, 320)
+            if png:
                 try:
-                    img = Image.open(path)
-                    img.thumbnail((320, 320), Image.LANCZOS)
-                    ph = ImageTk.PhotoImage(img)
+                    ph = tk.PhotoImage(file=png)
                     lbl_foto.configure(image=ph, text="")
                     lbl_foto.image = ph
                     return
-                except Exception:
+                except tk.TclError:
                     pass
             lbl_foto.configure(image="", text="Sem foto", font=("Segoe UI", 12, "bold"))
             lbl_foto.image = None
@@ -564,13 +668,13 @@ def abrir_listagem():
         id_card.grid_columnconfigure(0, weight=0); id_card.grid_columnconfigure(1, weight=1)
 
         coletor = []
-        coletor.append(make_line(id_card, 0, "Posto/Graduação:", dados[IDX_POSTO]))
-        coletor.append(make_line(id_card, 1, "Ano de Formação:", dados[IDX_ANO]))
-        coletor.append(make_line(id_card, 2, "Nome:", dados[IDX_NOME], copy_btn=True))
-        coletor.append(make_line(id_card, 3, "Nome de Guerra:", dados[IDX_NG], copy_btn=True))
-        coletor.append(make_line(id_card, 4, "CPF:", dados[IDX_CPF], copy_btn=True))
-        coletor.append(make_line(id_card, 5, "PREC-CP:", dados[IDX_PREC], copy_btn=True))
-        coletor.append(make_line(id_card, 6, "IDT Militar:", dados[IDX_IDT], copy_btn=True))
+        coletor.append(make_line(id_card, 0, "Posto/Graduação:", dados.posto))
+        coletor.append(make_line(id_card, 1, "Ano de Formação:", dados.ano))
+        coletor.append(make_line(id_card, 2, "Nome:", dados.nome, copy_btn=True))
+        coletor.append(make_line(id_card, 3, "Nome de Guerra:", dados.nome_guerra, copy_btn=True))
+        coletor.append(make_line(id_card, 4, "CPF:", dados.cpf, copy_btn=True))
+        coletor.append(make_line(id_card, 5, "PREC-CP:", dados.prec_cp, copy_btn=True))
+        coletor.append(make_line(id_card, 6, "IDT Militar:", dados.idt, copy_btn=True))
 
         ttk.Separator(inner).pack(fill="x", padx=8, pady=8)
 
@@ -583,35 +687,35 @@ def abrir_listagem():
         card1 = ttk.Frame(grid, style="Card.TFrame"); card1.grid(row=0, column=0, sticky="nsew", padx=(0,6))
         ttk.Label(card1, text="Dados Bancários e Endereço", style="Sub.TLabel").pack(anchor="w", padx=10, pady=(10,0))
         wrap1 = ttk.Frame(card1, style="Card.TFrame"); wrap1.pack(fill="x", padx=8, pady=8)
-        coletor.append(make_line(wrap1, 0, "Banco:", dados[7]))
-        coletor.append(make_line(wrap1, 1, "Agência:", dados[8]))
-        coletor.append(make_line(wrap1, 2, "Conta:", dados[9]))
-        coletor.append(make_line(wrap1, 3, "Endereço:", dados[14], copy_btn=True))
-        coletor.append(make_line(wrap1, 4, "CEP:", dados[15], copy_btn=True))
+        coletor.append(make_line(wrap1, 0, "Banco:", dados.banco))
+        coletor.append(make_line(wrap1, 1, "Agência:", dados.agencia))
+        coletor.append(make_line(wrap1, 2, "Conta:", dados.conta))
+        coletor.append(make_line(wrap1, 3, "Endereço:", dados.endereco, copy_btn=True))
+        coletor.append(make_line(wrap1, 4, "CEP:", dados.cep, copy_btn=True))
 
         card2 = ttk.Frame(grid, style="Card.TFrame"); card2.grid(row=0, column=1, sticky="nsew", padx=(6,0))
         ttk.Label(card2, text="Benefícios", style="Sub.TLabel").pack(anchor="w", padx=10, pady=(10,0))
         wrap2 = ttk.Frame(card2, style="Card.TFrame"); wrap2.pack(fill="x", padx=8, pady=8)
-        coletor.append(make_line(wrap2, 0, "Recebe Pré-Escolar:", dados[16]))
-        coletor.append(make_line(wrap2, 1, "Valor Pré-Escolar:", dados[17]))
-        coletor.append(make_line(wrap2, 2, "Recebe Auxílio Transp.:", dados[18]))
-        coletor.append(make_line(wrap2, 3, "Valor Auxílio Transp.:", dados[19]))
-        coletor.append(make_line(wrap2, 4, "Possui PNR:", dados[20]))
+        coletor.append(make_line(wrap2, 0, "Recebe Pré-Escolar:", dados.recebe_pre_escolar))
+        coletor.append(make_line(wrap2, 1, "Valor Pré-Escolar:", dados.valor_pre_escolar))
+        coletor.append(make_line(wrap2, 2, "Recebe Auxílio Transp.:", dados.recebe_aux_transporte))
+        coletor.append(make_line(wrap2, 3, "Valor Auxílio Transp.:", dados.valor_aux_transporte))
+        coletor.append(make_line(wrap2, 4, "Possui PNR:", dados.pnr))
 
         card3 = ttk.Frame(inner, style="Card.TFrame"); card3.pack(fill="x", padx=8, pady=(0,8))
         ttk.Label(card3, text="Datas", style="Sub.TLabel").pack(anchor="w", padx=10, pady=(10,0))
         wrap3 = ttk.Frame(card3, style="Card.TFrame"); wrap3.pack(fill="x", padx=8, pady=8)
-        coletor.append(make_line(wrap3, 0, "Data de Nascimento:", dados[12]))
-        coletor.append(make_line(wrap3, 1, "Data de Praça:", dados[13]))
+        coletor.append(make_line(wrap3, 0, "Data de Nascimento:", data_br(dados.data_nascimento)))
+        coletor.append(make_line(wrap3, 1, "Data de Praça:", data_br(dados.data_praca)))
 
         # rodapé
         footer = ttk.Frame(win, style="Card.TFrame"); footer.pack(fill="x", padx=16, pady=(0,8))
         ttk.Button(footer, text="Copiar CPF", style="Ghost.TButton",
-                   command=lambda: copy_text(dados[IDX_CPF], "CPF")).pack(side="left", padx=(0,6))
+                   command=lambda: copy_text(dados.cpf, "CPF")).pack(side="left", padx=(0,6))
         ttk.Button(footer, text="Copiar PREC-CP", style="Ghost.TButton",
-                   command=lambda: copy_text(dados[IDX_PREC], "PREC-CP")).pack(side="left", padx=6)
+                   command=lambda: copy_text(dados.prec_cp, "PREC-CP")).pack(side="left", padx=6)
         ttk.Button(footer, text="Copiar IDT", style="Ghost.TButton",
-                   command=lambda: copy_text(dados[IDX_IDT], "IDT")).pack(side="left", padx=6)
+                   command=lambda: copy_text(dados.idt, "IDT")).pack(side="left", padx=6)
 
         def copiar_tudo():
             txt = "\n".join(coletor)
@@ -638,11 +742,16 @@ def abrir_listagem():
             messagebox.showwarning("Atenção", "Selecione um militar para editar.", parent=janela)
             return
         iid = sel[0]
-        full = item_full.get(iid)
+        if iid not in item_full:
+            return
+        # relê do banco: a edição parte do estado atual e da versão dele (ver salvar_edicao)
+        full, versao_base = buscar_para_edicao(item_full[iid].id)
         if not full:
+            messagebox.showwarning("Atenção", "Este militar foi excluído por outra estação.", parent=janela)
+            carregar_militares()
             return
-        id_militar = full[IDX_ID]
-        caminho_foto_atual = full[IDX_FOTO] if (full[IDX_FOTO] and os.path.exists(full[IDX_FOTO])) else ""
+        id_militar = full.id
+        caminho_foto_atual = full.foto or ""  # chave do acervo (ou caminho antigo)
 
         # ------- janela -------
         win = tk.Toplevel(janela)
@@ -687,14 +796,14 @@ def abrir_listagem():
         foto_box.pack(padx=8, pady=8)
         lbl_foto = tk.Label(foto_box, bg="#f1f5fb"); lbl_foto.pack(padx=12, pady=12)
 
-        def carregar_preview_foto(caminho):
-            if caminho and os.path.exists(caminho):
+        def carregar_preview_foto(valor):
+            png = miniatura(valor, 340)
+            if png:
                 try:
-                    img = Image.open(caminho); img.thumbnail((340, 340), Image.LANCZOS)
-                    ph = ImageTk.PhotoImage(img)
+                    ph = tk.PhotoImage(file=png)
                     lbl_foto.configure(image=ph, text=""); lbl_foto.image = ph
                     return
-                except Exception:
+                except tk.TclError:
                     pass
             lbl_foto.configure(image="", text="Sem foto", font=("Segoe UI", 11, "bold")); lbl_foto.image = None
 
@@ -708,8 +817,12 @@ def abrir_listagem():
                 filetypes=[("Imagens", "*.png;*.jpg;*.jpeg;*.bmp;*.gif")]
             )
             if path:
-                nova_foto["caminho"] = path
-                carregar_preview_foto(path)
+                try:
+                    nova_foto["caminho"] = guardar_foto(path)  # copia p/ o acervo e gera as miniaturas
+                except (OSError, ValueError) as e:
+                    messagebox.showerror("Erro", f"Não foi possível usar a foto:\n{e}", parent=win)
+                    return
+                carregar_preview_foto(nova_foto["caminho"])
 
         ttk.Button(btns_foto, text="Selecionar Foto", style="Primary.TButton",
                 command=_selecionar_foto).pack(fill="x", padx=4, pady=2)
@@ -752,39 +865,39 @@ def abrir_listagem():
                 return ent
 
         # linha 0
-        campos["Posto"] = add_input(0, 0, "Posto", dados_antigos[IDX_POSTO], "combo")
-        campos["Nome"] = add_input(0, 1, "Nome", dados_antigos[IDX_NOME])
+        campos["Posto"] = add_input(0, 0, "Posto", dados_antigos.posto, "combo")
+        campos["Nome"] = add_input(0, 1, "Nome", dados_antigos.nome)
         campos["Posto"]["values"] = postos
         # linha 1
-        campos["Nome de Guerra"] = add_input(1, 0, "Nome de Guerra", dados_antigos[IDX_NG])
-        campos["CPF"] = add_input(1, 1, "CPF", dados_antigos[IDX_CPF])
+        campos["Nome de Guerra"] = add_input(1, 0, "Nome de Guerra", dados_antigos.nome_guerra)
+        campos["CPF"] = add_input(1, 1, "CPF", dados_antigos.cpf)
         # linha 2
-        campos["PREC-CP"] = add_input(2, 0, "PREC-CP", dados_antigos[IDX_PREC])
-        campos["IDT"] = add_input(2, 1, "IDT", dados_antigos[IDX_IDT])
+        campos["PREC-CP"] = add_input(2, 0, "PREC-CP", dados_antigos.prec_cp)
+        campos["IDT"] = add_input(2, 1, "IDT", dados_antigos.idt)
         # linha 3
-        campos["Banco"] = add_input(3, 0, "Banco", dados_antigos[7], "combo")
-        campos["Agência"] = add_input(3, 1, "Agência", dados_antigos[8])
+        campos["Banco"] = add_input(3, 0, "Banco", dados_antigos.banco, "combo")
+        campos["Agência"] = add_input(3, 1, "Agência", dados_antigos.agencia)
         campos["Banco"]["values"] = bancos
         # linha 4
-        campos["Conta"] = add_input(4, 0, "Conta", dados_antigos[9])
-        campos["Foto"] = add_input(4, 1, "Foto", dados_antigos[IDX_FOTO], "label")
+        campos["Conta"] = add_input(4, 0, "Conta", dados_antigos.conta)
+        campos["Foto"] = add_input(4, 1, "Foto", dados_antigos.foto, "label")
         # linha 5
-        campos["Ano de Formação"] = add_input(5, 0, "Ano de Formação", dados_antigos[IDX_ANO])
-        campos["Data de Nascimento"] = add_input(5, 1, "Data de Nascimento", dados_antigos[12])
+        campos["Ano de Formação"] = add_input(5, 0, "Ano de Formação", dados_antigos.ano)
+        campos["Data de Nascimento"] = add_input(5, 1, "Data de Nascimento", data_br(dados_antigos.data_nascimento))
         # linha 6
-        campos["Data de Praça"] = add_input(6, 0, "Data de Praça", dados_antigos[13])
-        campos["Endereço"] = add_input(6, 1, "Endereço", dados_antigos[14])
+        campos["Data de Praça"] = add_input(6, 0, "Data de Praça", data_br(dados_antigos.data_praca))
+        campos["Endereço"] = add_input(6, 1, "Endereço", dados_antigos.endereco)
         # linha 7
-        campos["CEP"] = add_input(7, 0, "CEP", dados_antigos[15])
-        campos["Recebe Pré Escolar"] = add_input(7, 1, "Recebe Pré Escolar", dados_antigos[16], "combo")
+        campos["CEP"] = add_input(7, 0, "CEP", dados_antigos.cep)
+        campos["Recebe Pré Escolar"] = add_input(7, 1, "Recebe Pré Escolar", dados_antigos.recebe_pre_escolar, "combo")
         campos["Recebe Pré Escolar"]["values"] = ["Sim", "Não"]
         # linha 8
-        campos["Valor Pré Escolar"] = add_input(8, 0, "Valor Pré Escolar", dados_antigos[17])
-        campos["Recebe Auxílio Transporte"] = add_input(8, 1, "Recebe Auxílio Transporte", dados_antigos[18], "combo")
+        campos["Valor Pré Escolar"] = add_input(8, 0, "Valor Pré Escolar", dados_antigos.valor_pre_escolar)
+        campos["Recebe Auxílio Transporte"] = add_input(8, 1, "Recebe Auxílio Transporte", dados_antigos.recebe_aux_transporte, "combo")
         campos["Recebe Auxílio Transporte"]["values"] = ["Sim", "Não"]
         # linha 9
-        campos["Valor Auxílio Transporte"] = add_input(9, 0, "Valor Auxílio Transporte", dados_antigos[19])
-        campos["Possui PNR"] = add_input(9, 1, "Possui PNR", dados_antigos[20], "combo")
+        campos["Valor Auxílio Transporte"] = add_input(9, 0, "Valor Auxílio Transporte", dados_antigos.valor_aux_transporte)
+        campos["Possui PNR"] = add_input(9, 1, "Possui PNR", dados_antigos.pnr, "combo")
         campos["Possui PNR"]["values"] = ["Sim", "Não"]
 
         # rodapé fixo
@@ -799,7 +912,22 @@ def abrir_listagem():
                     valores.append(nova_foto["caminho"])
                 else:
                     valores.append(widget.get() if hasattr(widget, "get") else widget.cget("text"))
-            atualizar_militar(id_militar, tuple(valores))
+            try:
+                atualizar_militar(id_militar, tuple(valores), original=dados_antigos, versao=versao_base)
+            except ConflitoDeEdicao as e:
+                if e.atual is None:
+                    messagebox.showerror("Conflito", str(e), parent=win)
+                else:
+                    messagebox.showwarning(
+                        "Conflito de edição",
+                        "Outra estação alterou este militar enquanto ele estava aberto aqui:\n"
+                        f"{', '.join(e.colunas)}\n\n"
+                        "Nada foi gravado. Feche e abra a edição de novo para ver os dados atuais.",
+                        parent=win)
+                return
+            except BancoOcupado as e:
+                avisar_erro(win, e)
+                return
             messagebox.showinfo("Sucesso", "Militar atualizado com sucesso.", parent=win)
             win.destroy()
             carregar_militares()
@@ -827,6 +955,7 @@ def abrir_listagem():
     menu.add_separator()
     menu.add_command(label="✏️ Editar", command=editar)
     menu.add_command(label="👤 Carteira", command=mostrar_carteira)
+    menu.add_command(label="🕘 Histórico de alterações", command=mostrar_historico)
     menu.add_separator()
     menu.add_command(label="❌ Excluir", command=excluir)
 
@@ -1,7 +1,9 @@
 # interface/soldos.py
 import tkinter as tk
+from datetime import date
 from tkinter import ttk, messagebox
-from database.db import listar_postos, obter_soldos_dict, atualizar_soldo_posto
+from database.db import listar_postos, obter_soldos_dict, atualizar_soldo_posto, historico_soldos, VIGENCIA_INICIAL
+from database.modelos import data_br
 
 BG_APP = "#e3f2fd"
 FG_TIT = "#0d47a1"
@@ -25,7 +27,7 @@ def abrir_soldos(master):
 
     win = tk.Toplevel(master)
     win.title("Soldos")
-    win.geometry("700x520")
+    win.geometry("700x600")
     win.configure(bg=BG_APP)
     win.resizable(False, False)
     win.grab_set()
@@ -36,11 +38,14 @@ def abrir_soldos(master):
     topo = tk.Frame(win, bg=BG_APP); topo.pack(pady=6)
     tk.Label(topo, text="Posto:", bg=BG_APP, font=("Segoe UI", 11)).grid(row=0, column=0, sticky="e", padx=6)
     tk.Label(topo, text="Soldo (R$):", bg=BG_APP, font=("Segoe UI", 11)).grid(row=0, column=2, sticky="e", padx=6)
+    tk.Label(topo, text="A partir de:", bg=BG_APP, font=("Segoe UI", 11)).grid(row=1, column=2, sticky="e", padx=6, pady=(6, 0))
 
-    # lista de postos na ORDEM DO BANCO (id ASC)
+    # lista de postos na ORDEM DO BANCO (hierarquia: postos.ordem)
     postos = listar_postos()
     posto_var = tk.StringVar(value=postos[0] if postos else "")
     soldo_var = tk.StringVar(value="0,00")
+    vigencia_var = tk.StringVar(value=date.today().strftime("%d/%m/%Y"))
+    vigencias_var = tk.StringVar()
 
     cb = ttk.Combobox(topo, values=postos, textvariable=posto_var, state="readonly", width=35)
     cb.grid(row=0, column=1, sticky="w", padx=4)
@@ -49,6 +54,10 @@ def abrir_soldos(master):
 
     ent = tk.Entry(topo, textvariable=soldo_var, width=14, font=("Segoe UI", 11))
     ent.grid(row=0, column=3, sticky="w", padx=4)
+    tk.Entry(topo, textvariable=vigencia_var, width=14, font=("Segoe UI", 11)).grid(
+        row=1, column=3, sticky="w", padx=4, pady=(6, 0))
+    tk.Label(win, textvariable=vigencias_var, bg=BG_APP, fg="#37474f", font=("Segoe UI", 10),
+             wraplength=660, justify="left").pack(padx=12)
 
     def _format_in(v):
         s = str(v).strip().replace("R$", "").replace(" ", "")
@@ -63,6 +72,9 @@ def abrir_soldos(master):
         d = obter_soldos_dict()
         val = d.get(posto_var.get(), 0.0)
         soldo_var.set(f"{val:.2f}".replace(".", ","))
+        vigencias = [f"{'início' if v == VIGENCIA_INICIAL else 'desde ' + data_br(v)}: {s:.2f}".replace(".", ",")
+                     for v, s in historico_soldos(posto_var.get())]
+        vigencias_var.set("Vigências: " + "  •  ".join(vigencias) if vigencias else "")
 
     cb.bind("<<ComboboxSelected>>", _carregar_soldo_evt)
     _carregar_soldo_evt()
@@ -72,13 +84,16 @@ def abrir_soldos(master):
             messagebox.showwarning("Atenção", "Selecione um posto.", parent=win)
             return
         try:
-            ok = atualizar_soldo_posto(posto_var.get(), float(_format_in(soldo_var.get())))
+            ok = atualizar_soldo_posto(posto_var.get(), float(_format_in(soldo_var.get())),
+                                       vigencia=vigencia_var.get())
             if ok:
                 _popular()           # recarrega tabela mantendo ORDEM DO BANCO
                 _carregar_soldo_evt()
                 messagebox.showinfo("OK", "Soldo atualizado.", parent=win)
             else:
                 messagebox.showwarning("Atenção", "Não foi possível atualizar o soldo.", parent=win)
+        except ValueError:
+            messagebox.showwarning("Atenção", "Informe a data de início da vigência (dd/mm/aaaa).", parent=win)
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao salvar: {e}", parent=win)
 
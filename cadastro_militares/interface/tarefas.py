@@ -0,0 +1,103 @@
+# interface/tarefas.py
+# Consultas ao banco fora da thread do Tk, com o resultado entregue de volta nela.
+#
+#     em_segundo_plano(janela, buscar_pagina, None, 200, filtros,
+#                      ao_concluir=mostrar, status_var=status_var, chave="lista")
+#
+# O trabalho roda no executor do banco (database/executor.py). Quando termina, o
+# Future entra numa fila que a janela principal esvazia com after(); ao_concluir /
+# ao_falhar rodam então na thread do Tk, onde é seguro mexer nos widgets.
+# Enquanto houver trabalho pendente, a janela fica no estado "carregando":
+# cursor de espera e, se status_var for passado, a mensagem na barra de status.
+
+import queue
+import tkinter as tk
+from concurrent.futures import Future
+from tkinter import messagebox
+from typing import Callable, Dict, Optional
+
+from database.db import MENSAGEM_BANCO_OCUPADO, banco_ocupado
+from database.executor import enviar
+
+INTERVALO_MS = 30           # período da verificação da fila enquanto há pendências
+MENSAGEM_CARREGANDO = "Carregando…"
+
+_prontos: "queue.Queue[tuple]" = queue.Queue()
+_pendentes: Dict[str, int] = {}          # janela (nome Tk) -> trabalhos em andamento
+_ultimos: Dict[tuple, Future] = {}       # (janela, chave) -> trabalho mais recente
+_verificando = set()                     # raízes Tk com a verificação agendada
+
+def _carregando(janela, status_var, mensagem, ativo: bool):
+    nome = str(janela)
+    n = _pendentes.get(nome, 0) + (1 if ativo else -1)
+    _pendentes[nome] = max(0, n)
+    try:
+        janela.config(cursor="watch" if n > 0 else "")
+        if status_var is not None:
+            if ativo:
+                status_var.set(mensagem)
+            elif status_var.get() == mensagem:
+                status_var.set("")
+    except tk.TclError:  # janela fechada
+        _pendentes.pop(nome, None)
+
+def avisar_erro(janela, erro, mensagem="Falha ao consultar o banco de dados"):
+    """messagebox de um erro do banco; banco ocupado por outra estação tem aviso próprio."""
+    if banco_ocupado(erro):
+        messagebox.showerror("Banco ocupado", MENSAGEM_BANCO_OCUPADO, parent=janela)
+    else:
+        messagebox.showerror("Erro", f"{mensagem}:\n{erro}", parent=janela)
+
+def _erro_padrao(janela, erro):
+    avisar_erro(janela, erro)
+
+def _drenar(raiz):
+    while True:
+        try:
+            janela, chave, fut, ao_concluir, ao_falhar, status_var, mensagem = _prontos.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            existe = bool(janela.winfo_exists())
+        except tk.TclError:
+            existe = False
+        if not existe:
+            _pendentes.pop(str(janela), None)
+            continue
+        _carregando(janela, status_var, mensagem, False)
+        if chave is not None:
+            if _ultimos.get((str(janela), chave)) is not fut:
+                continue  # já foi pedido algo mais novo com a mesma chave
+            del _ultimos[(str(janela), chave)]
+        erro = fut.exception()
+        if erro is not None:
+            (ao_falhar or (lambda e: _erro_padrao(janela, e)))(erro)
+        elif ao_concluir is not None:
+            ao_concluir(fut.result())
+    if any(_pendentes.values()):
+        raiz.after(INTERVALO_MS, _drenar, raiz)
+    else:
+        _verificando.discard(str(raiz))
+
+def em_segundo_plano(janela, fn: Callable, *args, ao_concluir: Optional[Callable] = None,
+                     ao_falhar: Optional[Callable] = None, status_var: Optional[tk.StringVar] = None,
+                     mensagem: str = MENSAGEM_CARREGANDO, chave: Optional[str] = None,
+                     **kwargs) -> Future:
+    """
+    Roda fn(*args, **kwargs) na thread do banco e chama ao_concluir(resultado) — ou
+    ao_falhar(exceção); sem ele, mostra uma messagebox — na thread do Tk.
+    chave: trabalhos da mesma janela com a mesma chave se substituem; só o resultado
+    do último pedido é entregue (ex.: busca refeita a cada tecla).
+    Se a janela for fechada antes, o resultado é descartado.
+    """
+    _carregando(janela, status_var, mensagem, True)
+    fut = enviar(fn, *args, **kwargs)
+    if chave is not None:
+        _ultimos[(str(janela), chave)] = fut
+    fut.add_done_callback(
+        lambda f: _prontos.put((janela, chave, f, ao_concluir, ao_falhar, status_var, mensagem)))
+    raiz = janela._root()
+    if str(raiz) not in _verificando:
+        _verificando.add(str(raiz))
+        raiz.after(INTERVALO_MS, _drenar, raiz)
+    return fut
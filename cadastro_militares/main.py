@@ -1,7 +1,38 @@
+import argparse
+import sys
+
+from database import db
 from database.db import init
-from interface.janela_principal import iniciar_sistema
+
+def _argumentos(argv=None):
+    p = argparse.ArgumentParser(description="Sistema de Cadastro de Militares")
+    p.add_argument("--banco", metavar="CAMINHO",
+                   help="arquivo do banco (padrão: variável CADASTRO_BANCO ou militares.db na pasta "
+                        "atual); ':memory:' abre um banco vazio em memória, descartado ao sair")
+    p.add_argument("--backup", nargs="?", const="", metavar="DESTINO",
+                   help="faz backup do banco sem abrir a janela e sai; DESTINO é um arquivo ou "
+                        "pasta (padrão: backups/ ao lado do banco)")
+    p.add_argument("--manter", type=int, default=db.BACKUPS_MANTIDOS, metavar="N",
+                   help="com --backup para pasta: backups mais recentes mantidos (padrão: %(default)s)")
+    return p.parse_args(argv)
+
+def _backup(destino, manter) -> int:
+    def progresso(copiadas, total):
+        if not total:  # banco vazio
+            return
+        print(f"\rBackup: {copiadas * 100 // total}%", end="", file=sys.stderr, flush=True)
+    caminho = db.backup(destino or None, progresso=progresso, manter=manter)
+    print(file=sys.stderr)
+    print(caminho)
+    return 0
 
 if __name__ == "__main__":
+    args = _argumentos()
+    if args.banco:
+        db.configurar(args.banco)
+    if args.backup is not None:
+        sys.exit(_backup(args.backup, args.manter))  # não mexe no esquema nem abre a UI
+
+    from interface.janela_principal import iniciar_sistema
     init()            # cria tabelas e semeia catálogos
     iniciar_sistema() # abre a UI
-
@@ -10,7 +10,8 @@ from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 
 # DB
-from database.db import buscar_todos
+from database.db import buscar_campos, siglas_postos, ORDEM_HIERARQUIA
+from database.modelos import CAMPOS_MILITAR
 
 # ------------------------------
 #  Configurações visuais
@@ -25,57 +26,12 @@ LEFT   = Alignment(horizontal="left", vertical="center")
 THIN   = Side(style="thin", color="BFBFBF")
 BORDER_ALL = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
 
-# ------------------------------
-#  Hierarquia e abreviações
-# ------------------------------
-# Ordem pedida (do mais antigo para o mais moderno), conforme usuário
-ORDEM_HIERARQUIA = [
-    "Capitão",
-    "1º Tenente",
-    "2º Tenente",
-    "Subtenente",
-    "3º Sargento",
-    "2º Sargento",
-    "1º Sargento",
-    "Aspirante",
-    "Soldado Efetivo Profissional",
-    "Soldado Efetivo Variável",
-    "Cabo Efetivo Profissional",
-]
-ORD_IDX = {p: i for i, p in enumerate(ORDEM_HIERARQUIA)}
-
-ABREV = {
-    "Capitão": "CAP",
-    "1º Tenente": "1º TEN",
-    "2º Tenente": "2º TEN",
-    "Subtenente": "ST",
-    "1º Sargento": "1º SGT",
-    "2º Sargento": "2º SGT",
-    "3º Sargento": "3º SGT",
-    "Aspirante": "ASP",
-    "Cabo Efetivo Profissional": "CB EF PROFL",
-    "Soldado Efetivo Profissional": "SD EF PROFL",
-    "Soldado Efetivo Variável": "SD EF VRV",
-}
-
 # ------------------------------
 #  Helpers
 # ------------------------------
 def _digits_only(s: str) -> str:
     return "".join(ch for ch in str(s) if ch.isdigit())
 
-def _abbr_posto(posto: str) -> str:
-    return ABREV.get(str(posto), str(posto).upper())
-
-def _ord_key(reg):
-    """
-    reg é a tupla/linha retornada por buscar_todos():
-    (0)ID, (1)Posto, (2)Nome, (3)NomeGuerra, (4)CPF, (5)PREC, ...
-    """
-    posto = reg[1]
-    nome  = str(reg[2] or "")
-    return (ORD_IDX.get(posto, 999), nome.lower())
-
 def _default_path() -> str:
     desk = os.path.join(os.path.expanduser("~"), "Desktop")
     base = "Relacao_Pessoal.xlsx"
@@ -92,10 +48,11 @@ def gerar_relacao_pessoal(parent=None, caminho_arquivo: str | None = None):
     - NR ORDEM em fonte cinza
     - Nomes e P/G em MAIÚSCULO
     - CPF só com dígitos (sem pontos/traço)
-    - Ordenado por hierarquia especificada e depois por nome
+    - Ordenado por hierarquia (catálogo de postos) e depois por nome
     """
-    # Carrega/ordena dados
-    regs = sorted(buscar_todos(), key=_ord_key)
+    # Carrega dados (já ordenados pelo banco)
+    regs = buscar_campos(CAMPOS_MILITAR, order=ORDEM_HIERARQUIA)
+    siglas = siglas_postos()
 
     # Monta workbook
     wb = Workbook()
@@ -116,11 +73,11 @@ def gerar_relacao_pessoal(parent=None, caminho_arquivo: str | None = None):
     ordem = 1
     row_idx = 2
     for it in regs:
-        posto = it[1]
-        nome  = (it[2] or "").upper().strip()
-        prec  = _digits_only(it[5])
-        cpf   = _digits_only(it[4])
-        pg    = _abbr_posto(posto)
+        posto = it.posto
+        nome  = (it.nome or "").upper().strip()
+        prec  = _digits_only(it.prec_cp)
+        cpf   = _digits_only(it.cpf)
+        pg    = siglas.get(posto, str(posto).upper())
 
         ws.cell(row=row_idx, column=1, value=ordem)        # NR ORDEM
         ws.cell(row=row_idx, column=2, value=prec)         # PREC-CP
@@ -0,0 +1,88 @@
+# servicos/auxilio_transporte.py
+# Auxílio-transporte: valor líquido a partir das tarifas ou do total mensal
+# (descontada a cota-parte de 6% do soldo), valor do dia (líquido / 22),
+# ajustes da despesa a anular e o texto do boletim. Sem Tk: a janela
+# (interface/auxilio_transporte.py) e rotinas em lote usam as mesmas funções.
+#
+# O valor gravado no banco (valor_aux_transporte) já é o LÍQUIDO.
+
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from database.modelos import reais
+from servicos.formatos import formatar_cpf, money, para_float
+
+DIAS_UTEIS = 22        # o auxílio é pago por 22 dias no mês
+COTA_PARTE = 0.06      # sobre o soldo de 30 dias
+
+# --------- cálculos ----------
+def calcular_por_total_mensal(total_mensal, soldo):
+    """Recebe TOTAL BRUTO (22d) e soldo; retorna líquido (aux) e cota.
+       Só é usada na calculadora quando houver tarifas."""
+    total = para_float(total_mensal, 0.0)
+    sd = para_float(soldo, 0.0)
+    cota30 = sd * COTA_PARTE
+    cota22 = cota30 * (DIAS_UTEIS/30.0)
+    aux = max(0.0, total - cota22)  # líquido
+    return {"total_mes_22": total, "cota22": cota22, "aux": aux}
+
+def calcular_por_tarifas(lista_tarifas, soldo):
+    """Usada apenas na calculadora: tarifa x2 = valor do dia (BRUTO)"""
+    soma_tarifas = sum(para_float(x, 0.0) for x in lista_tarifas)
+    valor_dia_bruto = soma_tarifas * 2.0
+    total_mes_22 = valor_dia_bruto * DIAS_UTEIS
+    r = calcular_por_total_mensal(total_mes_22, soldo)  # dá o líquido (aux)
+    r.update({"valor_dia": valor_dia_bruto})
+    return r
+
+def valor_dia(total_liquido: float) -> float:
+    """Diária do auxílio: líquido / 22."""
+    return total_liquido / DIAS_UTEIS if total_liquido else 0.0
+
+# --------- relatório / despesa a anular ----------
+class LinhaAuxilio(NamedTuple):
+    id: int
+    nome: str
+    posto: str
+    cpf: str
+    prec_cp: str
+    valor_dia: float      # líquido / 22
+    liquido_base: float   # valor gravado (líquido)
+
+def linhas_auxilio(militares: Iterable) -> List[LinhaAuxilio]:
+    """Uma linha por militar (Militar de buscar_recebem_aux_transporte()), com o valor do dia."""
+    linhas = []
+    for m in militares:
+        total_liq = reais(m.valor_aux_transporte_centavos)  # JÁ é líquido
+        linhas.append(LinhaAuxilio(m.id, m.nome, m.posto, m.cpf, m.prec_cp,
+                                   valor_dia(total_liq), total_liq))
+    return linhas
+
+def ajuste_despesa(linha: LinhaAuxilio, preta: int, vermelha: int) -> Tuple[float, float]:
+    """
+    Dias de PRETA (−1 dia) e VERMELHA (+1 dia) sobre a diária líquida.
+    Retorna (ajuste, novo líquido); o novo líquido não fica negativo.
+    """
+    ajuste = (vermelha - preta) * linha.valor_dia
+    return ajuste, max(0.0, linha.liquido_base + ajuste)
+
+def desconto_a_anular(linha: LinhaAuxilio, preta: int, vermelha: int) -> float:
+    """Valor que volta como despesa a anular (só quando há mais PRETA que VERMELHA)."""
+    return max(0.0, (preta - vermelha) * linha.valor_dia)
+
+def boletim_despesa_a_anular(itens: Iterable[Tuple[LinhaAuxilio, int, int]],
+                             abreviaturas: Dict[str, str]) -> str:
+    """
+    itens: (linha, preta, vermelha). Um parágrafo por militar com desconto;
+    texto vazio se ninguém tiver desconto.
+    """
+    partes = []
+    for linha, preta, vermelha in itens:
+        desconto = desconto_a_anular(linha, preta, vermelha)
+        if desconto <= 0:
+            continue
+        partes.append(
+            f"{abreviaturas.get(linha.posto, linha.posto)} {str(linha.nome).upper()}\n"
+            f"Prec-CP {linha.prec_cp} CPF {formatar_cpf(linha.cpf)}\n"
+            f"Valor: {money(desconto)}\n\n"
+        )
+    return "".join(partes)
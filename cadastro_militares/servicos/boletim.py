@@ -0,0 +1,21 @@
+# servicos/boletim.py
+# Texto dos boletins por modelo (interface/boletim.py): os modelos padrão, o
+# modelo escolhido e a relação dos militares. Sem Tk.
+
+from typing import Dict, Iterable
+
+# modelos que vêm com o programa; os do usuário ficam em boletins.json (interface/boletim.py)
+BOLETINS_PADRAO = {
+    "Férias - Ordem de Saque": (
+        "Seja sacado o adicional de férias, relativo ao ano de 2024, "
+        "de acordo com o que prescreve a alínea “d” do inciso II do art. 2º da MP nº 2.215-10, "
+        "de 31 AGO 01, em favor dos militares abaixo relacionados, em virtude de estar previsto para gozar férias "
+        "(30 dias) no mês de SET 25, no 7º período (15 SE25 a 12 AGO 25), conforme publicado no BI Nr 219, "
+        "de 14 NOV 2024, da 4ª Cia PE."
+    ),
+}
+
+def texto_boletim(modelo: str, militares: Iterable, abreviacoes: Dict[str, str]) -> str:
+    """Texto do boletim: o modelo e, abaixo, um militar por parágrafo (abreviatura do posto e nome)."""
+    linhas = [f"{abreviacoes.get(m.posto, m.posto)} {(m.nome or '').upper()}\n\n" for m in militares]
+    return modelo + "\n\n" + "".join(linhas)
@@ -0,0 +1,186 @@
+# servicos/folha.py
+# Folha do efetivo inteiro de uma vez: soldo, gratificação de representação,
+# auxílio-transporte (valor do dia, cota-parte, ajuste PRETA/VERMELHA e despesa
+# a anular), com totais por posto e por banco. Tudo em centavos inteiros: o
+# total é a soma exata das linhas. Mesmas regras de servicos/gratificacao.py e
+# servicos/auxilio_transporte.py; meio centavo arredonda para longe do zero.
+#
+#     efetivo = carregar_efetivo("05/06/2025")          # uma consulta, em colunas
+#     folha = calcular_folha(efetivo, dias=9, preta=..., vermelha=...)
+#     totais_por_posto(folha)  ->  {"Capitão": {"militares": 12, "gratificacao": 1234567, ...}, ...}
+#
+# Com NumPy instalado, cada valor é calculado numa passada sobre a coluna inteira;
+# sem ele, as mesmas contas inteiras rodam linha a linha (mesmo resultado).
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
+
+from database import db
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_DISPONIVEL = np is not None
+
+# valores por militar (centavos) somados em totais_por_posto()/totais_por_banco()
+COLUNAS_TOTAIS = ("soldo", "gratificacao", "aux_transporte", "cota_parte",
+                  "ajuste_at", "at_ajustado", "despesa_anular")
+
+Coluna = Union[Sequence[int], "np.ndarray"]
+
+class Efetivo(NamedTuple):
+    """Uma posição por militar em cada coluna (ordem do banco); postos na ordem hierárquica."""
+    ids: List[int]
+    postos: List[str]          # nomes; posto_idx aponta para cá
+    bancos: List[str]          # idem, banco_idx
+    posto_idx: List[int]
+    banco_idx: List[int]
+    soldo: List[int]           # centavos, vigente na data da folha
+    aux_transporte: List[int]  # líquido gravado, em centavos (0 para quem não recebe)
+
+class Folha(NamedTuple):
+    efetivo: Efetivo
+    soldo: Coluna
+    gratificacao_dia: Coluna   # 2% do soldo
+    gratificacao: Coluna       # 2% do soldo x dias
+    aux_transporte: Coluna     # líquido gravado
+    at_dia: Coluna             # líquido / 22
+    cota_parte: Coluna         # 6% do soldo, proporcional a 22 de 30 dias
+    ajuste_at: Coluna          # (VERMELHA − PRETA) x valor do dia
+    at_ajustado: Coluna        # líquido + ajuste, nunca negativo
+    despesa_anular: Coluna     # (PRETA − VERMELHA) x valor do dia, quando positivo
+
+def _indices(valores, chaves: List) -> List[int]:
+    posicao = {c: i for i, c in enumerate(chaves)}
+    return [posicao[v] for v in valores]
+
+def carregar_efetivo(data=None) -> Efetivo:
+    """
+    Todos os militares, numa consulta, com o soldo vigente em `data`
+    (date, "dd/mm/aaaa" ou ISO; None = hoje). ValueError se a data for inválida.
+    """
+    ids, posto_ids, bancos, recebe, at = db.buscar_colunas(
+        ("id", "posto_id", "banco", "recebe_aux_transporte", "valor_aux_transporte_centavos"))
+    soldos = db.obter_soldos_em(data) if data is not None else db.obter_soldos_dict()
+    em_uso = set(posto_ids)
+    postos = {pid: nome for pid, nome in db.nomes_postos().items() if pid in em_uso}  # hierarquia
+    nomes_bancos = sorted({b or "" for b in bancos})
+    posto_idx = _indices(posto_ids, list(postos))
+    soldo_posto = [round(soldos.get(p, 0.0) * 100) for p in postos.values()]
+    return Efetivo(
+        ids=list(ids), postos=list(postos.values()), bancos=nomes_bancos,
+        posto_idx=posto_idx, banco_idx=_indices((b or "" for b in bancos), nomes_bancos),
+        soldo=[soldo_posto[i] for i in posto_idx],
+        aux_transporte=[v if r == "Sim" and isinstance(v, int) else 0 for r, v in zip(recebe, at)],
+    )
+
+# ==============================================
+# Cálculo
+# ==============================================
+def _dividir(n, d: int):
+    """n / d arredondado (meio para longe do zero), para inteiros ou colunas NumPy."""
+    if np is not None and isinstance(n, np.ndarray):
+        return np.sign(n) * ((2 * np.abs(n) + d) // (2 * d))
+    return (1 if n >= 0 else -1) * ((2 * abs(n) + d) // (2 * d))
+
+def _por_militar(valor, n: int) -> List[int]:
+    if valor is None:
+        return [0] * n
+    if isinstance(valor, int):
+        return [valor] * n
+    valor = list(valor)
+    if len(valor) != n:
+        raise ValueError(f"Esperados {n} valores (um por militar), recebidos {len(valor)}")
+    return [int(v) for v in valor]
+
+def calcular_folha(efetivo: Efetivo, dias=0, preta=None, vermelha=None,
+                   vetorizado: Optional[bool] = None) -> Folha:
+    """
+    dias (gratificação), preta e vermelha (dias a descontar/acrescentar no AT):
+    um inteiro para todos ou um por militar, na ordem de efetivo.ids.
+    vetorizado: None = NumPy se disponível; False força o cálculo linha a linha.
+    """
+    n = len(efetivo.ids)
+    dias, preta, vermelha = (_por_militar(v, n) for v in (dias, preta, vermelha))
+    if vetorizado is None:
+        vetorizado = NUMPY_DISPONIVEL
+    elif vetorizado and not NUMPY_DISPONIVEL:
+        raise RuntimeError("NumPy não está instalado")
+    if vetorizado:
+        return _calcular_numpy(efetivo, dias, preta, vermelha)
+    return _calcular_python(efetivo, dias, preta, vermelha)
+
+def _calcular_numpy(efetivo, dias, preta, vermelha) -> Folha:
+    def coluna(valores):
+        return np.asarray(valores, dtype=np.int64)
+    soldo, at = coluna(efetivo.soldo), coluna(efetivo.aux_transporte)
+    dias, saldo_dias = coluna(dias), coluna(vermelha) - coluna(preta)
+    ajuste = _dividir(saldo_dias * at, 22)
+    return Folha(
+        efetivo=efetivo, soldo=soldo,
+        gratificacao_dia=_dividir(soldo * 2, 100),
+        gratificacao=_dividir(soldo * 2 * dias, 100),
+        aux_transporte=at,
+        at_dia=_dividir(at, 22),
+        cota_parte=_dividir(soldo * 132, 3000),
+        ajuste_at=ajuste,
+        at_ajustado=np.maximum(at + ajuste, 0),
+        despesa_anular=np.maximum(-ajuste, 0),
+    )
+
+def _calcular_python(efetivo, dias, preta, vermelha) -> Folha:
+    soldo, at = efetivo.soldo, efetivo.aux_transporte
+    ajuste = [_dividir((v - p) * a, 22) for a, p, v in zip(at, preta, vermelha)]
+    return Folha(
+        efetivo=efetivo, soldo=list(soldo),
+        gratificacao_dia=[_dividir(s * 2, 100) for s in soldo],
+        gratificacao=[_dividir(s * 2 * d, 100) for s, d in zip(soldo, dias)],
+        aux_transporte=list(at),
+        at_dia=[_dividir(a, 22) for a in at],
+        cota_parte=[_dividir(s * 132, 3000) for s in soldo],
+        ajuste_at=ajuste,
+        at_ajustado=[max(a + j, 0) for a, j in zip(at, ajuste)],
+        despesa_anular=[max(-j, 0) for j in ajuste],
+    )
+
+# ==============================================
+# Totais
+# ==============================================
+def _totais(folha: Folha, indices, nomes: List[str]) -> Dict[str, Dict[str, int]]:
+    if np is not None and isinstance(folha.soldo, np.ndarray):
+        idx = np.asarray(indices, dtype=np.intp)
+        contagem = np.bincount(idx, minlength=len(nomes))
+        somas = {}
+        for campo in COLUNAS_TOTAIS:
+            soma = np.zeros(len(nomes), dtype=np.int64)
+            np.add.at(soma, idx, getattr(folha, campo))  # inteiro: bincount somaria em float
+            somas[campo] = soma.tolist()
+        contagem = contagem.tolist()
+    else:
+        contagem = [0] * len(nomes)
+        for i in indices:
+            contagem[i] += 1
+        somas = {}
+        for campo in COLUNAS_TOTAIS:
+            soma = [0] * len(nomes)
+            for i, v in zip(indices, getattr(folha, campo)):
+                soma[i] += v
+            somas[campo] = soma
+    return {
+        nome: {"militares": contagem[i], **{campo: somas[campo][i] for campo in COLUNAS_TOTAIS}}
+        for i, nome in enumerate(nomes) if contagem[i]
+    }
+
+def totais_por_posto(folha: Folha) -> Dict[str, Dict[str, int]]:
+    """posto -> {"militares": n, e a soma em centavos de cada coluna de COLUNAS_TOTAIS}, por hierarquia."""
+    return _totais(folha, folha.efetivo.posto_idx, folha.efetivo.postos)
+
+def totais_por_banco(folha: Folha) -> Dict[str, Dict[str, int]]:
+    """banco -> {"militares": n, e as somas de COLUNAS_TOTAIS}, por nome do banco ("" = sem banco)."""
+    return _totais(folha, folha.efetivo.banco_idx, folha.efetivo.bancos)
+
+def total_geral(folha: Folha) -> Dict[str, int]:
+    """Soma de cada coluna de COLUNAS_TOTAIS sobre o efetivo inteiro (centavos)."""
+    return {campo: int(c.sum() if hasattr(c, "sum") else sum(c))
+            for campo, c in ((campo, getattr(folha, campo)) for campo in COLUNAS_TOTAIS)}
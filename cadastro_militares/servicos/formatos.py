@@ -0,0 +1,106 @@
+# servicos/formatos.py
+# Formatação dos valores que aparecem nas telas e nos boletins: dinheiro,
+# CPF, datas abreviadas e valores por extenso. Sem Tk.
+
+from datetime import datetime
+
+def money(v) -> str:
+    try:
+        x = float(v)
+    except Exception:
+        x = 0.0
+    s = f"{x:,.2f}"
+    return "R$ " + s.replace(",", "X").replace(".", ",").replace("X", ".")
+
+def para_float(v, default=0.0) -> float:
+    """ "R$ 1.234,56" / "5,75" / 5.75 -> float; vazio ou inválido -> default."""
+    try:
+        s = str(v).strip().replace("R$", "").replace(" ", "")
+        if "," in s:
+            s = s.replace(".", "").replace(",", ".")
+        return float(s) if s else default
+    except Exception:
+        return default
+
+def digitos(s: str) -> str:
+    return "".join(ch for ch in str(s) if ch.isdigit())
+
+def formatar_cpf(cpf: str) -> str:
+    s = digitos(cpf)
+    return f"{s[0:3]}.{s[3:6]}.{s[6:9]}-{s[9:11]}" if len(s) == 11 else cpf
+
+MESES_ABR = ["JAN","FEV","MAR","ABR","MAI","JUN","JUL","AGO","SET","OUT","NOV","DEZ"]
+def fmt_data_abrev(dt: datetime) -> str:
+    return f"{dt.day:02d} {MESES_ABR[dt.month-1]} {str(dt.year)[-2:]}"
+
+def dias_periodo(d1: str, d2: str) -> int:
+    """Datas em dd/mm/aaaa. Conta inclusivo (ex.: 05 a 13 -> 9)."""
+    try:
+        a = datetime.strptime(d1.strip(), "%d/%m/%Y")
+        b = datetime.strptime(d2.strip(), "%d/%m/%Y")
+        if b < a:
+            a, b = b, a
+        return (b - a).days + 1
+    except Exception:
+        return 0
+
+# ----- número por extenso (pt-BR) p/ dinheiro (simples) -----
+_UN = ["zero","um","dois","três","quatro","cinco","seis","sete","oito","nove"]
+_DEZ = ["dez","onze","doze","treze","catorze","quinze","dezesseis","dezessete","dezoito","dezenove"]
+_DZ = ["", "", "vinte","trinta","quarenta","cinquenta","sessenta","setenta","oitenta","noventa"]
+_CN = ["","cento","duzentos","trezentos","quatrocentos","quinhentos","seiscentos","setecentos","oitocentos","novecentos"]
+
+def _centena_por_extenso(n):
+    n = int(n)
+    if n == 0: return ""
+    if n == 100: return "cem"
+    c = n // 100
+    r = n % 100
+    partes = []
+    if c: partes.append(_CN[c])
+    if r:
+        if r < 10: partes.append(_UN[r])
+        elif 10 <= r < 20: partes.append(_DEZ[r-10])
+        else:
+            d = r // 10
+            u = r % 10
+            if u: partes.append(f"{_DZ[d]} e {_UN[u]}")
+            else: partes.append(_DZ[d])
+    return " e ".join(p for p in partes if p)
+
+def _milhares(n):
+    if n == 0: return ""
+    if n == 1: return "mil"
+    return f"{_centena_por_extenso(n)} mil"
+
+def numero_em_reais_extenso(valor: float) -> str:
+    valor = round(float(valor) + 1e-9, 2)
+    inteiro = int(valor)
+    cent = int(round((valor - inteiro) * 100))
+
+    partes = []
+    milhoes = inteiro // 1_000_000
+    resto = inteiro % 1_000_000
+    milhares = resto // 1000
+    centenas = resto % 1000
+
+    if milhoes:
+        partes.append("um milhão" if milhoes == 1 else f"{_centena_por_extenso(milhoes)} milhões")
+    if milhares:
+        partes.append(_milhares(milhares))
+    if centenas:
+        partes.append(_centena_por_extenso(centenas))
+    if not (milhoes or milhares or centenas):
+        partes.append("zero")
+
+    reais = "real" if inteiro == 1 else "reais"
+    frase = " ".join(partes) + f" {reais}"
+
+    if cent:
+        centavos = "centavo" if cent == 1 else "centavos"
+        frase += f" e {_centena_por_extenso(cent)} {centavos}"
+    return frase
+
+def numero_por_extenso(n: int) -> str:
+    """Inteiro por extenso, sem a moeda ("nove", "vinte e um")."""
+    return numero_em_reais_extenso(n).replace(" reais", "").replace(" real", "")
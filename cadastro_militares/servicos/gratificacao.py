@@ -0,0 +1,58 @@
+# servicos/gratificacao.py
+# Gratificação de representação (2% do soldo por dia de deslocamento) para
+# listas inteiras de militares, e o texto do boletim. Sem Tk: a janela
+# (interface/gratificacao.py) e rotinas em lote usam as mesmas funções.
+#
+#     linhas = calcular_gratificacao(militares, obter_soldos_em("05/06/2025"), dias=9)
+#     texto = boletim_gratificacao(linhas, saida, retorno, siglas_postos(), local, finalidade, bi)
+
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple
+
+from servicos.formatos import (
+    fmt_data_abrev, formatar_cpf, money, numero_em_reais_extenso, numero_por_extenso
+)
+
+PERCENTUAL = 0.02
+
+class LinhaGratificacao(NamedTuple):
+    militar: object   # Militar (usa id, posto, nome, cpf, prec_cp)
+    valor_dia: float  # 2% do soldo
+    dias: int
+    total: float
+
+def valor_dia(soldo: float) -> float:
+    return soldo * PERCENTUAL
+
+def calcular_gratificacao(militares: Iterable, soldos: Dict[str, float], dias: int) -> List[LinhaGratificacao]:
+    """Uma linha por militar: 2%/dia pelo soldo do posto (0 se o posto não tem soldo) e total dos `dias`."""
+    linhas = []
+    for m in militares:
+        vdia = valor_dia(soldos.get(m.posto, 0.0))
+        linhas.append(LinhaGratificacao(m, vdia, dias, vdia * dias))
+    return linhas
+
+def cabecalho_boletim(saida: datetime, retorno: datetime, local: str, finalidade: str, bi: str) -> str:
+    return (
+        f"Seja sacada a gratificação de representação normal (2%), dos seguintes militares abaixo relacionados, "
+        f"referente ao deslocamento a serviço, para a {local}, em {fmt_data_abrev(saida)}, "
+        f"com a finalidade de {finalidade}, tendo retornado em {fmt_data_abrev(retorno)}, "
+        f"que teve seu deslocamento autorizado pelo {bi}.\n\n"
+    )
+
+def paragrafo_boletim(linha: LinhaGratificacao, saida: datetime, retorno: datetime,
+                      siglas: Dict[str, str]) -> str:
+    d = linha.militar
+    return (
+        f"{siglas.get(d.posto, d.posto.upper())} {str(d.nome or '').upper()}\n"
+        f"Prec-CP {str(d.prec_cp or '')} CPF {formatar_cpf(d.cpf)}\n"
+        f"Valor solicitado: {money(linha.total)} ({numero_em_reais_extenso(linha.total)});\n"
+        f"Período: {fmt_data_abrev(saida)} a {fmt_data_abrev(retorno)};\n"
+        f"Quantidade de dias: {linha.dias} ({numero_por_extenso(linha.dias)}) dias\n\n"
+    )
+
+def boletim_gratificacao(linhas: Iterable[LinhaGratificacao], saida: datetime, retorno: datetime,
+                         siglas: Dict[str, str], local: str, finalidade: str, bi: str) -> str:
+    """Texto completo do boletim: cabeçalho do deslocamento e um parágrafo por militar."""
+    corpo = "".join(paragrafo_boletim(linha, saida, retorno, siglas) for linha in linhas)
+    return cabecalho_boletim(saida, retorno, local, finalidade, bi) + corpo
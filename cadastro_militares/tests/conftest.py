@@ -0,0 +1,28 @@
+# tests/conftest.py
+# Os módulos do app importam como no programa (from database import db): a pasta
+# cadastro_militares/ entra no caminho, de onde quer que o pytest seja chamado.
+#
+# Uso:
+#     python -m pytest cadastro_militares/tests
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import db  # noqa: E402
+
+@pytest.fixture
+def banco_em_arquivo(tmp_path):
+    """abrir(nome) troca para um arquivo em tmp_path; o banco anterior volta no fim."""
+    anterior = db.CONFIG
+
+    def abrir(nome="teste.db") -> str:
+        caminho = str(tmp_path / nome)
+        db.configurar(caminho)
+        return caminho
+
+    yield abrir
+    db.configurar(anterior)
@@ -0,0 +1,143 @@
+# tests/test_banco.py
+# database/db.py contra bancos isolados: em memória (benchmarks/fixtures.py) ou
+# num arquivo temporário, quando o caso é a atualização de uma base existente.
+
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from benchmarks.fixtures import banco_em_memoria
+from benchmarks.gerador import gerar_militares
+from database import db, migracoes
+
+PASTA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _com_nome(dados, nome: str) -> tuple:
+    """Tupla de inserir_militar() com outro nome completo."""
+    return (dados[0], nome) + tuple(dados[2:])
+
+@pytest.fixture
+def banco():
+    """Banco vazio em memória, com o esquema e os catálogos padrão."""
+    with banco_em_memoria() as config:
+        yield config
+
+# ==============================================
+# Planos de consulta (db.verificar_planos)
+# ==============================================
+def test_planos_com_base_vazia(banco):
+    db.verificar_planos()
+
+def test_planos_depois_de_carga_e_analyze():
+    with banco_em_memoria(militares=gerar_militares(2000)):
+        db.analisar()
+        planos = db.verificar_planos()
+        assert set(planos) == set(db.CONSULTAS_INDEXADAS)
+
+def test_planos_acusam_indice_ausente(banco):
+    db.conectar().execute("DROP INDEX idx_militares_posto")
+    with pytest.raises(AssertionError, match="idx_militares_posto"):
+        db.verificar_planos()
+
+# ==============================================
+# Paginação, busca textual e edição concorrente
+# ==============================================
+@pytest.mark.parametrize("quantidade", [0, 49, 50, 100, 101])
+def test_paginas_por_chave(quantidade):
+    with banco_em_memoria(militares=gerar_militares(quantidade)):
+        ids, consultas, chave = [], 0, None
+        while True:
+            pagina, chave = db.buscar_pagina(chave, limite=50)
+            consultas += 1
+            assert len(pagina) <= 50
+            ids += [m.id for m in pagina]
+            if chave is None:
+                break
+        esperado = [m.id for m in db.buscar_campos(("id",), order=db.ORDEM_HIERARQUIA)]
+        assert ids == esperado
+        # última página cheia: sem chave para uma consulta que voltaria vazia
+        assert consultas == max(1, -(-quantidade // 50))
+
+def test_busca_textual_ignora_acentos(banco):
+    base = list(gerar_militares(3))
+    db.inserir_militares_lote([_com_nome(base[0], "JOÃO DA SILVA"),
+                               _com_nome(base[1], "MARIA CONCEIÇÃO ARAÚJO"),
+                               _com_nome(base[2], "PEDRO SOUZA")])
+    assert [m.nome for m in db.buscar_texto("joao sil")] == ["JOÃO DA SILVA"]
+    assert [m.nome for m in db.buscar_texto("CONCEICAO araujo")] == ["MARIA CONCEIÇÃO ARAÚJO"]
+    assert [m.nome for m in db.buscar_texto("joão")] == ["JOÃO DA SILVA"]
+    assert db.buscar_texto("pedro silva") == []
+
+def test_conflito_de_edicao():
+    dados = next(gerar_militares(1))
+    with banco_em_memoria(militares=[dados]):
+        id_militar = db.buscar_campos(("id",))[0].id
+        original, versao = db.buscar_para_edicao(id_militar)
+
+        # outra estação muda o endereço depois que a edição abriu
+        db.atualizar_militar(id_militar, dados[:13] + ("Rua da Outra Estação, 1",) + dados[14:])
+
+        with pytest.raises(db.ConflitoDeEdicao) as erro:
+            db.atualizar_militar(id_militar, dados[:13] + ("Rua Desta Estação, 2",) + dados[14:],
+                                 original=original, versao=versao)
+        assert erro.value.colunas == ["endereco"]
+        assert db.buscar_por_id(id_militar).endereco == "Rua da Outra Estação, 1"
+
+        # coluna que a outra estação não mexeu: grava sem conflito
+        assert db.atualizar_militar(id_militar, dados[:14] + ("70000000",) + dados[15:],
+                                    original=original, versao=versao) == ["cep"]
+        atual = db.buscar_por_id(id_militar)
+        assert (atual.endereco, atual.cep) == ("Rua da Outra Estação, 1", "70000000")
+
+# ==============================================
+# Atualização de bases existentes
+# ==============================================
+SOLDOS = {"Capitão": 13471.0, "2º Sargento": 4985.0, "Soldado Efetivo Variável": 1177.0}
+
+def _base_antiga(caminho: str, versao: int) -> None:
+    """Base com o esquema atual rebaixada para `versao`, soldos gravados e um posto sem soldo."""
+    db.configurar(caminho)
+    db.init()
+    db.fechar_conexao()
+    con = sqlite3.connect(caminho)
+    con.executemany("UPDATE soldos_por_posto SET soldo = ? WHERE posto = ?",
+                    [(v, p) for p, v in SOLDOS.items()])
+    if versao < 5:  # soldos_historico veio com a migração 5
+        con.execute("DROP TABLE soldos_historico")
+    else:
+        con.executemany("UPDATE soldos_historico SET soldo = ? WHERE posto = ?",
+                        [(v, p) for p, v in SOLDOS.items()])
+    # incluído pelo cadastro antes da migração 6: no catálogo, sem soldo
+    con.execute("INSERT INTO postos (nome, ordem) VALUES ('Posto Sem Soldo', 9990)")
+    con.execute(f"PRAGMA user_version = {versao}")
+    con.commit()
+    con.close()
+    db.configurar(caminho)
+
+@pytest.mark.parametrize("versao", [4, 5])
+def test_atualizacao_mantem_soldos(banco_em_arquivo, versao):
+    _base_antiga(banco_em_arquivo(), versao)
+    antes = dict(sqlite3.connect(db.CONFIG.caminho).execute("SELECT posto, soldo FROM soldos_por_posto"))
+
+    assert db.init()
+    assert migracoes.versao(db.conectar()) == migracoes.VERSAO_ATUAL
+    soldos = db.obter_soldos_dict()
+    for posto, valor in antes.items():
+        assert soldos[posto] == valor
+        assert db.historico_soldos(posto) == [(db.VIGENCIA_INICIAL, valor)]
+    assert soldos["Posto Sem Soldo"] == 0.0
+    assert db.obter_soldos_em("05/06/2025")["2º Sargento"] == 4985.0
+
+def test_atualizacao_do_banco_distribuido(banco_em_arquivo):
+    """militares.db do repositório (base sem versão) chega à versão atual com os mesmos soldos."""
+    caminho = banco_em_arquivo()
+    shutil.copy(os.path.join(PASTA_APP, "militares.db"), caminho)
+    con = sqlite3.connect(caminho)
+    antes = dict(con.execute("SELECT posto, soldo FROM soldos_por_posto"))
+    con.close()
+
+    db.init()
+    soldos = db.obter_soldos_dict()
+    assert {p: soldos[p] for p in antes} == antes